@@ -3,16 +3,19 @@ from flask_cors import CORS
 from flask_restx import Api
 from datetime import datetime
 import os
+import atexit
 from sqlalchemy import text
 import logging
 from database import db
+from cache import cache
+from json_provider import ORJSON_AVAILABLE, ORJSONProvider, output_json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Configure logging early so we can use logger everywhere
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
@@ -95,6 +98,12 @@ api = Api(
     prefix='/api'
 )
 
+# Use orjson for request parsing, jsonify and Flask-RESTX responses when it is installed
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
+    api.representation('application/json')(output_json)
+    logger.info("JSON encoding: orjson")
+
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv(
     'DATABASE_URL', 
@@ -102,9 +111,45 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv(
 )
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Database connection pool configuration
+# Set DB_POOL_SIZE=0 when running behind PgBouncer in transaction pooling mode
+# A batch resume job holds up to AI_BULK_MAX_CONCURRENT_WORKERS worker connections plus one for its job
+# thread (a bulk AI regeneration job holds one), so the default pool leaves room for them beside requests
+background_job_connections = int(os.getenv('AI_BULK_MAX_CONCURRENT_WORKERS', 5)) + 1
+db_pool_size = int(os.getenv('DB_POOL_SIZE', max(10, background_job_connections)))
+if db_pool_size > 0:
+    if db_pool_size < background_job_connections:
+        logger.warning(
+            f"DB_POOL_SIZE={db_pool_size} is below the {background_job_connections} connections a batch "
+            f"job uses (AI_BULK_MAX_CONCURRENT_WORKERS + 1); it will rely on overflow connections"
+        )
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': db_pool_size,
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 300)),
+        'pool_pre_ping': True,
+        # Reuse the most recently returned connection so bursts of short list/lookup requests stay on
+        # warm connections and surplus ones go idle long enough to be recycled
+        'pool_use_lifo': True
+    }
+else:
+    from sqlalchemy.pool import NullPool
+    # Every checkout opens a fresh connection, so a liveness ping would only add a round-trip
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'poolclass': NullPool
+    }
+# psycopg2 fast execution helpers: multi-row VALUES for INSERT, execute_batch for UPDATE/DELETE executemany
+app.config['SQLALCHEMY_ENGINE_OPTIONS'].update({
+    'executemany_mode': 'values_plus_batch',
+    'insertmanyvalues_page_size': 500
+})
+logger.info(f"Database engine options: {app.config['SQLALCHEMY_ENGINE_OPTIONS']}")
+
 # Configure file upload limits for batch resume processing
 # Individual file size limit (used for validation in application logic)
 individual_file_limit = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB default
+app.config['MAX_UPLOAD_BYTES'] = individual_file_limit  # Per-resume limit enforced by the resume routes
 
 # Total batch upload size limit (used for validation in application logic)
 batch_upload_limit = int(os.getenv('BATCH_UPLOAD_LIMIT', 200 * 1024 * 1024))  # 200MB default
@@ -148,6 +193,18 @@ logger.info(f"  Batch upload limit: {batch_upload_limit / 1024 / 1024:.1f}MB")
 # Initialize SQLAlchemy with app
 db.init_app(app)
 
+# Response/query cache configuration
+# Defaults to an in-process SimpleCache; set CACHE_REDIS_URL to share the cache across Gunicorn workers
+cache_redis_url = os.getenv('CACHE_REDIS_URL', '').strip()
+cache_config = {
+    'CACHE_TYPE': 'RedisCache' if cache_redis_url else 'SimpleCache',
+    'CACHE_DEFAULT_TIMEOUT': int(os.getenv('CACHE_DEFAULT_TIMEOUT', 60))
+}
+if cache_redis_url:
+    cache_config['CACHE_REDIS_URL'] = cache_redis_url
+cache.init_app(app, config=cache_config)
+logger.info(f"Cache configured: {cache_config['CACHE_TYPE']}")
+
 # Add a before_request handler to help debug multipart parsing issues
 @app.before_request
 def before_request():
@@ -196,9 +253,18 @@ def bad_request(error):
 # Initialize bulk AI regeneration service with app context
 from services.bulk_ai_regeneration_service import bulk_ai_regeneration_service
 from services.batch_resume_parser import batch_resume_parser_service
+from services.resume_upload_service import resume_upload_service
+from services.ai_profile_processing_service import ai_profile_processing_service
+from services.ai_summary_service import ai_summary_service
 with app.app_context():
     bulk_ai_regeneration_service.set_app(app)
     batch_resume_parser_service.set_app(app)
+    resume_upload_service.set_app(app)
+    ai_profile_processing_service.set_app(app)
+# Exit handlers run in reverse, so the AI summary loop stops after the jobs that call into it
+atexit.register(ai_summary_service.shutdown)
+atexit.register(batch_resume_parser_service.shutdown)
+atexit.register(bulk_ai_regeneration_service.shutdown)
 
 # Logging already configured at the top of the file
 
@@ -211,6 +277,16 @@ if FLASK_ENV == 'development':
     app.config['DEBUG'] = True
     app.config['TESTING'] = False
     logger.info("Running in DEVELOPMENT mode")
+
+    # Surface lazy-loaded relationships (N+1 queries) during development (pip install nplusone)
+    try:
+        from nplusone.ext.flask_sqlalchemy import NPlusOne
+        app.config['NPLUSONE_LOGGER'] = logging.getLogger('nplusone')
+        app.config['NPLUSONE_LOG_LEVEL'] = logging.WARNING
+        NPlusOne(app)
+        logger.info("nplusone N+1 query detection enabled")
+    except ImportError:
+        logger.info("nplusone not installed - N+1 query detection disabled")
 else:
     app.config['DEBUG'] = False
     app.config['TESTING'] = False
@@ -328,7 +404,8 @@ def internal_error(error):
 
 # API documentation is now available at /swagger/
 
-if __name__ == '__main__':
+def run_development_server():
+    """Run the Flask development server (see run.py, the entry point that should start it)"""
     # Only run Flask development server in development mode
     if FLASK_ENV == 'development':
         logger.info("Starting Flask development server...")
@@ -341,4 +418,9 @@ if __name__ == '__main__':
         )
     else:
         logger.info("Production mode: Use Gunicorn or production WSGI server")
-        logger.info("Run with: gunicorn -w 4 -b 0.0.0.0:5000 app:app")
\ No newline at end of file
+        logger.info("Run with: gunicorn -w 4 -b 0.0.0.0:5000 app:app")
+
+if __name__ == '__main__':
+    # Still works, but resume parsing processes then re-import this module and build their own app;
+    # use python run.py instead
+    run_development_server()
\ No newline at end of file
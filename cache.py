@@ -0,0 +1,26 @@
+import uuid
+from flask_caching import Cache
+
+# Initialize Flask-Caching instance
+cache = Cache()
+
+# Cache entry holding the current generation of cached skills data (skill lists and popular skills)
+SKILLS_GENERATION_KEY = 'skills:generation'
+
+def skills_cache_generation():
+    """Current generation token, included in the key of every cached skills entry"""
+    generation = cache.get(SKILLS_GENERATION_KEY)
+    if generation is None:
+        cache.add(SKILLS_GENERATION_KEY, uuid.uuid4().hex, timeout=0)
+        generation = cache.get(SKILLS_GENERATION_KEY)
+    return generation
+
+def invalidate_skills_cache():
+    """
+    Drop every cached skills entry after a write to candidate_skills (including candidate inserts and
+    deletes that add or remove skills). Moving to a new generation orphans all entries at once; they
+    expire on their own TTL. The generation lives in the cache, so other Gunicorn workers only see
+    the change when CACHE_REDIS_URL is set; with the per-process default they keep serving their
+    entries until the TTL expires.
+    """
+    cache.set(SKILLS_GENERATION_KEY, uuid.uuid4().hex, timeout=0)
@@ -4,6 +4,9 @@
 -- Enable vector extension for embedding storage (pgvector)
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- Enable trigram extension for indexed substring (ILIKE '%...%') search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create AI recruitment prompt templates table for managing different versions of AI prompts
 CREATE TABLE ai_recruitment_prompt_templates (
     id SERIAL PRIMARY KEY,
@@ -43,6 +46,12 @@ CREATE TABLE candidate_master_profile (
     remarks TEXT,
     ai_short_summary TEXT,
     embedding_vector vector(1536), -- Vector embedding for AI/ML purposes using pgvector
+    -- SHA-256 hex of the summary the embedding was generated from
+    -- Existing databases: ALTER TABLE candidate_master_profile ADD COLUMN ai_summary_hash CHAR(64);
+    ai_summary_hash CHAR(64),
+    -- SHA-256 hex of the prompt (profile data and template) the summary was generated from
+    -- Existing databases: ALTER TABLE candidate_master_profile ADD COLUMN ai_summary_source_hash CHAR(64);
+    ai_summary_source_hash CHAR(64),
     metadata_json JSONB,
     created_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     last_modified_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -120,15 +129,29 @@ CREATE TABLE candidate_resume (
     id SERIAL PRIMARY KEY,
     candidate_id INTEGER NOT NULL REFERENCES candidate_master_profile(id) ON DELETE CASCADE,
     pdf_data BYTEA NOT NULL, -- PDF file stored as binary data
+    -- 'raw' or 'zstd' (compressed at write time when it saves >= 10%); 'base64' while an async upload is pending
+    -- Existing databases: ALTER TABLE candidate_resume ADD COLUMN pdf_data_encoding VARCHAR(10) NOT NULL DEFAULT 'raw';
+    pdf_data_encoding VARCHAR(10) NOT NULL DEFAULT 'raw',
+    -- 'ready', or 'pending'/'failed' for uploads accepted by POST /api/resumes/async
+    -- Existing databases: ALTER TABLE candidate_resume ADD COLUMN upload_status VARCHAR(20) NOT NULL DEFAULT 'ready';
+    upload_status VARCHAR(20) NOT NULL DEFAULT 'ready',
     file_name VARCHAR(255) NOT NULL,
     file_size BIGINT NOT NULL,
     content_type VARCHAR(100) DEFAULT 'application/pdf',
+    -- Lower-cased extension derived from file_name (NULL when there is no '.'); requires PostgreSQL 14+
+    -- Existing databases: ALTER TABLE candidate_resume ADD COLUMN file_extension VARCHAR(255) GENERATED ALWAYS AS (...) STORED;
+    file_extension VARCHAR(255) GENERATED ALWAYS AS (
+        CASE WHEN position('.' in file_name) > 0 THEN lower(split_part(file_name, '.', -1)) END
+    ) STORED,
     upload_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     is_active BOOLEAN DEFAULT true,
     created_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     last_modified_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Keep PDFs out-of-line but uncompressed so substring() reads for streamed downloads only fetch the needed TOAST chunks
+ALTER TABLE candidate_resume ALTER COLUMN pdf_data SET STORAGE EXTERNAL;
+
 -- Create AI recruitment communication codes lookup table
 CREATE TABLE ai_recruitment_com_code (
     id SERIAL PRIMARY KEY,
@@ -163,8 +186,19 @@ CREATE INDEX idx_candidate_licenses_certifications_is_active ON candidate_licens
 CREATE INDEX idx_candidate_languages_candidate_id ON candidate_languages(candidate_id);
 CREATE INDEX idx_candidate_languages_is_active ON candidate_languages(is_active);
 
-CREATE INDEX idx_candidate_resume_candidate_id ON candidate_resume(candidate_id);
+-- Serves the per-candidate resume list (WHERE candidate_id [AND is_active] ORDER BY upload_date DESC, id DESC)
+-- as an index-only scan, and candidate_id foreign key lookups via its leading column
+-- Existing databases: create it with CREATE INDEX CONCURRENTLY, then DROP INDEX idx_candidate_resume_candidate_id
+CREATE INDEX idx_candidate_resume_candidate_upload ON candidate_resume(candidate_id, upload_date DESC, id DESC)
+    INCLUDE (is_active, file_name, file_size, content_type, upload_status, created_date, last_modified_date);
 CREATE INDEX idx_candidate_resume_is_active ON candidate_resume(is_active);
+-- Partial covering index so resume stats (count/sum/extension breakdown) can use index-only scans
+CREATE INDEX idx_candidate_resume_active_partial ON candidate_resume(id) INCLUDE (file_size, file_name) WHERE is_active = true;
+CREATE INDEX idx_candidate_resume_file_extension ON candidate_resume(file_extension) WHERE is_active = true;
+CREATE INDEX idx_candidate_resume_last_modified_date ON candidate_resume(last_modified_date);
+CREATE INDEX idx_candidate_resume_upload_date ON candidate_resume(upload_date);
+-- Trigram index so the resume list file_name ILIKE filter can avoid a sequential scan
+CREATE INDEX idx_candidate_resume_file_name_trgm ON candidate_resume USING gin (file_name gin_trgm_ops);
 
 CREATE INDEX idx_ai_recruitment_com_code_category ON ai_recruitment_com_code(category);
 CREATE INDEX idx_ai_recruitment_com_code_is_active ON ai_recruitment_com_code(is_active);
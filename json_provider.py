@@ -0,0 +1,49 @@
+import decimal
+from datetime import date
+from flask import make_response
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    # Dates are passed through to _default so they keep Flask's HTTP date format
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(value):
+    """Encode the types Flask's default JSON provider supports but orjson does not (or does differently)"""
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def orjson_dumps(obj):
+    """Serialize obj to JSON bytes with orjson"""
+    return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider (jsonify, request.get_json) backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson_dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX representation for application/json responses backed by orjson"""
+    response = make_response(orjson_dumps(data), code)
+    response.headers.extend(headers or {})
+    response.mimetype = 'application/json'
+    return response
@@ -1,7 +1,17 @@
 from database import db
 from datetime import datetime
+from sqlalchemy import Computed
 from sqlalchemy.dialects.postgresql import JSONB
 from pgvector.sqlalchemy import Vector
+from pdf_storage import decode_pdf
+from cache import cache
+
+# Most recent error messages kept on a batch job record
+MAX_BATCH_JOB_ERRORS = 100
+
+# How long a positive candidate existence check is reused, and the prefix of its cache key
+CANDIDATE_EXISTS_TTL = 30
+CANDIDATE_EXISTS_CACHE_PREFIX = 'candidate_exists:'
 
 class CandidateMasterProfile(db.Model):
     __tablename__ = 'candidate_master_profile'
@@ -25,6 +35,11 @@ class CandidateMasterProfile(db.Model):
     remarks = db.Column(db.Text)
     ai_short_summary = db.Column(db.Text)
     embedding_vector = db.Column(Vector(1536))
+    # SHA-256 of the summary embedding_vector was computed from; lets unchanged summaries skip re-embedding
+    ai_summary_hash = db.Column(db.String(64))
+    # SHA-256 of the prompt (profile data and template) ai_short_summary was generated from; lets bulk
+    # regeneration skip profiles whose summary would be generated from the same input
+    ai_summary_source_hash = db.Column(db.String(64))
     metadata_json = db.Column(JSONB)
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
     last_modified_date = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -88,6 +103,23 @@ class CandidateMasterProfile(db.Model):
             })
         
         return data
+    
+    @staticmethod
+    def exists(candidate_id):
+        """
+        Check that a candidate exists without loading the profile row.
+        Only positive results are cached, so a newly created candidate is never reported missing;
+        writes still go through the candidate_id foreign key as the source of truth.
+        """
+        cache_key = f'{CANDIDATE_EXISTS_CACHE_PREFIX}{candidate_id}'
+        if cache.get(cache_key):
+            return True
+        exists = db.session.query(
+            db.session.query(CandidateMasterProfile.id).filter_by(id=candidate_id).exists()
+        ).scalar()
+        if exists:
+            cache.set(cache_key, True, timeout=CANDIDATE_EXISTS_TTL)
+        return exists
 
 class CandidateCareerHistory(db.Model):
     __tablename__ = 'candidate_career_history'
@@ -126,7 +158,8 @@ class CandidateSkills(db.Model):
     skills = db.Column(db.String(255), nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
-    last_modified_date = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Maintained by the database (column default + update_candidate_skills_last_modified_date trigger)
+    last_modified_date = db.Column(db.DateTime, server_default=db.func.now(), server_onupdate=db.FetchedValue())
     
     def to_dict(self):
         return {
@@ -228,10 +261,20 @@ class CandidateResume(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_master_profile.id'), nullable=False)
-    pdf_data = db.Column(db.LargeBinary, nullable=False)  # Store PDF as binary data
+    # Store PDF as binary data; deferred so metadata queries and relationship loads never pull the blob
+    pdf_data = db.deferred(db.Column(db.LargeBinary, nullable=False))
+    # How pdf_data is stored: 'raw', 'zstd' or 'base64' while an async upload is pending (see pdf_storage.py)
+    pdf_data_encoding = db.Column(db.String(10), nullable=False, default='raw', server_default='raw')
+    # 'ready', or 'pending'/'failed' for uploads processed by services/resume_upload_service.py
+    upload_status = db.Column(db.String(20), nullable=False, default='ready', server_default='ready')
     file_name = db.Column(db.String(255), nullable=False)
     file_size = db.Column(db.BigInteger, nullable=False)
     content_type = db.Column(db.String(100), default='application/pdf')
+    # Generated by the database from file_name (see database_schema.sql)
+    file_extension = db.Column(db.String(255), Computed(
+        "CASE WHEN position('.' in file_name) > 0 THEN lower(split_part(file_name, '.', -1)) END",
+        persisted=True
+    ))
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
@@ -244,6 +287,7 @@ class CandidateResume(db.Model):
             'file_name': self.file_name,
             'file_size': self.file_size,
             'content_type': self.content_type,
+            'upload_status': self.upload_status,
             'upload_date': self.upload_date.isoformat() if self.upload_date else None,
             'is_active': self.is_active,
             'created_date': self.created_date.isoformat() if self.created_date else None,
@@ -253,9 +297,13 @@ class CandidateResume(db.Model):
         # Only include PDF data if explicitly requested (for downloads)
         if include_pdf_data and self.pdf_data:
             import base64
-            data['pdf_data_base64'] = base64.b64encode(self.pdf_data).decode('utf-8')
+            data['pdf_data_base64'] = base64.b64encode(self.get_pdf_bytes()).decode('utf-8')
         
         return data
+    
+    def get_pdf_bytes(self):
+        """Original PDF bytes, decompressing pdf_data when it is stored compressed"""
+        return decode_pdf(self.pdf_data, self.pdf_data_encoding)
 
 class AiRecruitmentComCode(db.Model):
     __tablename__ = 'ai_recruitment_com_code'
@@ -384,7 +432,7 @@ class BatchJobStatus(db.Model):
             'ai_summaries_failed': self.ai_summaries_failed,
             'classifications_generated': self.classifications_generated,
             'classifications_failed': self.classifications_failed,
-            'progress_percentage': self.progress_percentage,
+            'progress_percentage': self.current_progress_percentage(),
             'processing_time_seconds': self.processing_time_seconds,
             'created_by': self.created_by,
             'last_modified_date': self.last_modified_date.isoformat() if self.last_modified_date else None
@@ -431,20 +479,28 @@ class BatchJobStatus(db.Model):
         
         db.session.commit()
     
+    def current_progress_percentage(self) -> float:
+        """Progress derived from the file counters, so processing doesn't have to keep writing it"""
+        if self.status == 'completed' or not self.total_files:
+            return self.progress_percentage
+        return round((self.processed_files or 0) / self.total_files * 100, 1)
+    
     def add_error(self, error_message: str):
-        """Add an error message to the job"""
-        if not self.errors:
-            self.errors = []
-        self.errors.append(error_message)
+        """Add an error message to the job, keeping the most recent MAX_BATCH_JOB_ERRORS"""
+        # Assign a new list: in-place changes to a plain JSONB column aren't detected
+        self.errors = ((self.errors or []) + [error_message])[-MAX_BATCH_JOB_ERRORS:]
         self.last_modified_date = datetime.utcnow()
         db.session.commit()
     
+    def add_results(self, results: list):
+        """Append processing results to the job (caller commits)"""
+        # Assign a new list: in-place changes to a plain JSONB column aren't detected
+        self.results = (self.results or []) + list(results)
+        self.last_modified_date = datetime.utcnow()
+    
     def add_result(self, result: dict):
         """Add a processing result to the job"""
-        if not self.results:
-            self.results = []
-        self.results.append(result)
-        self.last_modified_date = datetime.utcnow()
+        self.add_results([result])
         db.session.commit()
 
 class BatchJobFailedFile(db.Model):
@@ -0,0 +1,71 @@
+import base64
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+# Values stored in candidate_resume.pdf_data_encoding
+PDF_ENCODING_RAW = 'raw'
+PDF_ENCODING_ZSTD = 'zstd'
+# Staged asynchronous upload: pdf_data still holds the client's base64 text
+PDF_ENCODING_BASE64 = 'base64'
+
+# Magic bytes every PDF file starts with
+PDF_MAGIC = b'%PDF-'
+
+# zstd level 3 is the library default: fast to compress, cheap to decompress
+ZSTD_LEVEL = 3
+
+# Only keep the compressed form when it saves at least 10%
+MAX_COMPRESSION_RATIO = 0.9
+
+
+def b64decode_pdf(value):
+    """
+    Decode base64 PDF payloads, using the SIMD pybase64 codec when it is installed.
+    pybase64 decodes straight into a bytearray, which psycopg2 binds to BYTEA without another copy.
+    """
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64decode_as_bytearray(value, validate=False)
+    return base64.b64decode(value)
+
+
+def encode_pdf(pdf_data):
+    """
+    Prepare PDF bytes for storage in candidate_resume.pdf_data
+
+    Returns:
+        tuple: (bytes to store, pdf_data_encoding value)
+    """
+    if ZSTD_AVAILABLE and pdf_data:
+        compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(pdf_data)
+        if len(compressed) < len(pdf_data) * MAX_COMPRESSION_RATIO:
+            return compressed, PDF_ENCODING_ZSTD
+    return pdf_data, PDF_ENCODING_RAW
+
+
+def decode_pdf(stored_data, encoding):
+    """Return the original PDF bytes for a stored pdf_data value"""
+    if encoding == PDF_ENCODING_ZSTD and stored_data:
+        return zstandard.ZstdDecompressor().decompress(stored_data)
+    return stored_data
+
+
+def decode_pdf_stream(chunks, encoding):
+    """Yield the original PDF bytes for an iterable of stored pdf_data slices"""
+    if encoding != PDF_ENCODING_ZSTD:
+        yield from chunks
+        return
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
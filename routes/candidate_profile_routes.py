@@ -1,18 +1,20 @@
 import os
-from flask import request
+from flask import request, Response, stream_with_context
 from flask_restx import Namespace, Resource, fields
 from database import db
+from cache import cache, invalidate_skills_cache
 from models import (
     CandidateMasterProfile, CandidateCareerHistory, CandidateSkills,
     CandidateEducation, CandidateLicensesCertifications, CandidateLanguages,
-    CandidateResume, AiPromptTemplate, BatchJobStatus, BatchJobFailedFile
+    CandidateResume, AiPromptTemplate, BatchJobStatus, BatchJobFailedFile, CANDIDATE_EXISTS_CACHE_PREFIX
 )
 from datetime import datetime
 import json
 from werkzeug.datastructures import FileStorage
 from services.resume_parser import resume_parser, reset_resume_parser
-from services.ai_summary_service import ai_summary_service
+from services.ai_summary_service import ai_summary_service, apply_ai_processing_result
 from services.bulk_ai_regeneration_service import bulk_ai_regeneration_service
+from services.ai_profile_processing_service import ai_profile_processing_service, filter_active_relationships
 from services.semantic_search_service import semantic_search_service
 from services.batch_resume_parser import batch_resume_parser_service
 from flask import current_app
@@ -562,6 +564,7 @@ class Candidate(Resource):
 
     @candidate_profile_ns.doc('finalize_candidate_profile')
     @candidate_profile_ns.param('generate_ai_summary', 'Generate AI summary and embedding', type=bool, default=True)
+    @candidate_profile_ns.param('run_async', 'Generate the AI summary and embedding in the background and return 202 immediately', type=bool, default=False)
     def patch(self, candidate_id):
         """
         Finalize candidate profile update with AI summary generation and embedding
@@ -592,6 +595,7 @@ class Candidate(Resource):
             print(f"Request is_json: {request.is_json}")
             
             generate_ai_summary = request.args.get('generate_ai_summary', 'true').lower() == 'true'
+            run_async = request.args.get('run_async', 'false').lower() == 'true'
             
             # First, update the master profile if data is provided
             if data:
@@ -616,16 +620,22 @@ class Candidate(Resource):
                 candidate.last_modified_date = datetime.utcnow()
                 db.session.commit()
             
+            # Hand the slow LLM + embedding round-trips to the background pool; the client polls the candidate
+            if generate_ai_summary and run_async:
+                ai_profile_processing_service.submit(candidate_id)
+                return {
+                    'success': True,
+                    'message': 'Candidate profile saved; AI summary generation queued',
+                    'candidate': candidate.to_dict(include_relationships=True),
+                    'ai_processing': {
+                        'enabled': True,
+                        'status': 'queued',
+                        'status_url': f'/api/candidates/{candidate_id}'
+                    }
+                }, 202
+            
             # Fetch the complete candidate profile with all active relationships
-            candidate_with_relationships = candidate.to_dict(include_relationships=True)
-            
-            # Filter out inactive relationships
-            for relationship_key in ['career_history', 'skills', 'education', 'licenses_certifications', 'languages', 'resumes']:
-                if relationship_key in candidate_with_relationships:
-                    candidate_with_relationships[relationship_key] = [
-                        item for item in candidate_with_relationships[relationship_key] 
-                        if item.get('is_active', True)
-                    ]
+            candidate_with_relationships = filter_active_relationships(candidate.to_dict(include_relationships=True))
             
             # Generate AI summary and embedding if requested
             ai_processing_result = None
@@ -644,7 +654,9 @@ class Candidate(Resource):
                         asyncio.set_event_loop(loop)
                         try:
                             ai_processing_result = loop.run_until_complete(
-                                ai_summary_service.process_candidate_profile(candidate_with_relationships)
+                                ai_summary_service.process_candidate_profile(
+                                    candidate_with_relationships, candidate.ai_summary_hash
+                                )
                             )
                         finally:
                             loop.close()
@@ -658,8 +670,7 @@ class Candidate(Resource):
                     if ai_processing_result and ai_processing_result.get('processing_success'):
                         # Update the candidate with AI summary and embedding
                         print(f"Updating candidate with AI summary...")
-                        candidate.ai_short_summary = ai_processing_result['ai_summary']
-                        candidate.embedding_vector = ai_processing_result['embedding_vector']
+                        apply_ai_processing_result(candidate, ai_processing_result)
                         candidate.last_modified_date = datetime.utcnow()
                         db.session.commit()
                         print(f"AI summary and embedding saved successfully")
@@ -720,6 +731,8 @@ class CandidateHardDelete(Resource):
             # This will cascade delete all related records due to relationship configuration
             db.session.delete(candidate)
             db.session.commit()
+            cache.delete(f'{CANDIDATE_EXISTS_CACHE_PREFIX}{candidate_id}')
+            invalidate_skills_cache()
             
             return {'message': 'Candidate permanently deleted'}, 200
             
@@ -837,7 +850,8 @@ prompt_template_update_model = candidate_profile_ns.model('PromptTemplateUpdate'
 # Bulk regeneration models
 bulk_regeneration_request_model = candidate_profile_ns.model('BulkRegenerationRequest', {
     'prompt_template_id': fields.Integer(description='Template ID to activate (optional)', required=False),
-    'created_by': fields.String(description='User initiating the job', default='user')
+    'created_by': fields.String(description='User initiating the job', default='user'),
+    'force': fields.Boolean(description='Also regenerate profiles whose profile data and template are unchanged since their last summary', default=False)
 })
 
 bulk_regeneration_response_model = candidate_profile_ns.model('BulkRegenerationResponse', {
@@ -858,6 +872,7 @@ job_status_model = candidate_profile_ns.model('JobStatus', {
     'processed_profiles': fields.Integer(description='Profiles processed so far'),
     'successful_updates': fields.Integer(description='Successful updates'),
     'failed_updates': fields.Integer(description='Failed updates'),
+    'skipped_profiles': fields.Integer(description='Profiles skipped because their summary inputs are unchanged'),
     'current_profile_id': fields.Integer(description='Currently processing profile ID'),
     'estimated_completion': fields.String(description='Estimated completion time'),
     'errors': fields.List(fields.String, description='List of errors encountered')
@@ -947,6 +962,7 @@ class PromptTemplateList(Resource):
             
             db.session.add(new_template)
             db.session.commit()
+            ai_summary_service.clear_prompt_template_cache()
             
             return {
                 'success': True,
@@ -1001,6 +1017,7 @@ class PromptTemplate(Resource):
             template.last_modified_date = datetime.utcnow()
             
             db.session.commit()
+            ai_summary_service.clear_prompt_template_cache()
             
             return {
                 'success': True,
@@ -1043,6 +1060,7 @@ class PromptTemplateActivate(Resource):
             
             # Activate this template (method handles deactivating others)
             template.activate()
+            ai_summary_service.clear_prompt_template_cache()
             
             return {
                 'success': True,
@@ -1094,7 +1112,8 @@ class BulkRegenerateAISummaries(Resource):
         - It will consume significant Azure OpenAI credits/tokens
         - Rate limited to max 5 concurrent processes (configurable)
         - Cannot be easily stopped once started
-        - All existing AI summaries will be overwritten
+        - Existing AI summaries will be overwritten, except where the profile and template are unchanged
+          since the summary was generated (set force=true to regenerate those too)
         
         💡 Use this when:
         - You've updated the prompt template significantly
@@ -1108,6 +1127,7 @@ class BulkRegenerateAISummaries(Resource):
             
             prompt_template_id = data.get('prompt_template_id')
             created_by = data.get('created_by', 'user')
+            force = bool(data.get('force', False))
             
             # Validate template ID if provided
             if prompt_template_id:
@@ -1132,7 +1152,8 @@ class BulkRegenerateAISummaries(Resource):
             # Start the bulk regeneration job
             job_id = bulk_ai_regeneration_service.start_bulk_regeneration(
                 prompt_template_id=prompt_template_id,
-                created_by=created_by
+                created_by=created_by,
+                force=force
             )
             
             warning_message = (
@@ -1204,6 +1225,46 @@ class BulkRegenerationJobStatus(Resource):
         except Exception as e:
             candidate_profile_ns.abort(500, str(e))
 
+@candidate_profile_ns.route('/ai-summary/bulk-regenerate/jobs/<string:job_id>/stream')
+class BulkRegenerationJobStream(Resource):
+    @candidate_profile_ns.doc('stream_bulk_regeneration_job_progress')
+    @candidate_profile_ns.produces(['text/event-stream'])
+    def get(self, job_id):
+        """
+        Stream a bulk regeneration job's progress as Server-Sent Events
+        
+        Sends the job's current progress, then an event whenever it changes, until the job finishes.
+        A comment line is sent as a heartbeat after 30 seconds without changes. Each stream closes after
+        AI_BULK_PROGRESS_STREAM_SECONDS; EventSource clients reconnect automatically.
+        """
+        progress = bulk_ai_regeneration_service.stream_job_progress(job_id)
+        try:
+            first_event = next(progress, None)
+        except Exception as e:
+            candidate_profile_ns.abort(500, str(e))
+        if first_event is None:
+            candidate_profile_ns.abort(404, f'Job with ID {job_id} not found')
+        
+        def events():
+            yield f"data: {json.dumps(first_event)}\n\n"
+            try:
+                for event in progress:
+                    yield f"data: {json.dumps(event)}\n\n" if event is not None else ": heartbeat\n\n"
+            except Exception as e:
+                logger.error(f"Progress stream for job {job_id} failed: {str(e)}")
+            finally:
+                progress.close()
+        
+        return Response(
+            stream_with_context(events()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                # Stop nginx from buffering the stream
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
 @candidate_profile_ns.route('/ai-summary/bulk-regenerate/stats')
 class BulkRegenerationStats(Resource):
     @candidate_profile_ns.doc('get_bulk_regeneration_stats')
@@ -1744,6 +1805,8 @@ class CandidateCreateWithPDF(Resource):
                 
                 # Commit all changes
                 db.session.commit()
+                if creation_stats['records_created']['skills']:
+                    invalidate_skills_cache()
                 
                 # Calculate success metrics
                 total_records_created = sum(creation_stats['records_created'].values()) + 1  # +1 for candidate
@@ -2247,6 +2310,8 @@ class CandidateBulkCreate(Resource):
                 
                 # Commit all changes
                 db.session.commit()
+                if creation_stats['records_created']['skills']:
+                    invalidate_skills_cache()
                 
                 # Calculate success metrics
                 total_records_created = sum(creation_stats['records_created'].values()) + 1  # +1 for candidate
@@ -2293,7 +2358,9 @@ class CandidateResumeDownload(Resource):
         try:
             from flask import Response
             
-            resume = CandidateResume.query.filter_by(id=resume_id, is_active=True).first()
+            resume = CandidateResume.query.options(
+                db.undefer(CandidateResume.pdf_data)
+            ).filter_by(id=resume_id, is_active=True).first()
             if not resume:
                 candidate_profile_ns.abort(404, 'Resume not found')
             
@@ -2301,12 +2368,13 @@ class CandidateResumeDownload(Resource):
                 candidate_profile_ns.abort(404, 'PDF data not found')
             
             # Return PDF as binary response
+            pdf_bytes = resume.get_pdf_bytes()
             response = Response(
-                resume.pdf_data,
+                pdf_bytes,
                 mimetype=resume.content_type or 'application/pdf',
                 headers={
                     'Content-Disposition': f'attachment; filename="{resume.file_name}"',
-                    'Content-Length': str(resume.file_size)
+                    'Content-Length': str(len(pdf_bytes))
                 }
             )
             
@@ -2863,10 +2931,10 @@ class BatchParseDebug(Resource):
                 try:
                     debug_info['service_has_active_jobs_attr'] = hasattr(batch_resume_parser_service, 'active_jobs')
                     if hasattr(batch_resume_parser_service, 'active_jobs'):
-                        active_jobs = getattr(batch_resume_parser_service, 'active_jobs', {})
+                        active_jobs = batch_resume_parser_service.get_tracked_jobs()
                         debug_info['active_jobs_count'] = len(active_jobs)
                         debug_info['active_jobs_keys'] = list(active_jobs.keys())
-                        debug_info['active_jobs_type'] = type(active_jobs).__name__
+                        debug_info['active_jobs_type'] = type(batch_resume_parser_service.active_jobs).__name__
                     else:
                         debug_info['service_errors'].append('Service missing active_jobs attribute')
                         
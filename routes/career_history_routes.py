@@ -79,8 +79,7 @@ class CareerHistoryList(Resource):
                     career_history_ns.abort(400, f'{field} is required')
             
             # Validate candidate exists
-            candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-            if not candidate:
+            if not CandidateMasterProfile.exists(data['candidate_id']):
                 career_history_ns.abort(404, 'Candidate not found')
             
             # Parse dates
@@ -193,8 +192,13 @@ class CandidateCareerHistoryList(Resource):
     def get(self, candidate_id):
         """Get all career history for a specific candidate"""
         try:
-            # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get_or_404(candidate_id)
+            # Verify candidate exists, loading only the name needed for the response
+            candidate = db.session.get(
+                CandidateMasterProfile, candidate_id,
+                options=[db.load_only(CandidateMasterProfile.first_name, CandidateMasterProfile.last_name)]
+            )
+            if not candidate:
+                career_history_ns.abort(404, 'Candidate not found')
             
             # Get career history
             career_records = CandidateCareerHistory.query.filter_by(
@@ -103,8 +103,7 @@ class EducationList(Resource):
                 education_ns.abort(400, 'school is required')
             
             # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-            if not candidate:
+            if not CandidateMasterProfile.exists(data['candidate_id']):
                 education_ns.abort(404, 'Candidate not found')
             
             # Parse dates if provided
@@ -166,8 +165,7 @@ class Education(Resource):
             
             # Verify candidate exists if being changed
             if 'candidate_id' in data:
-                candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-                if not candidate:
+                if not CandidateMasterProfile.exists(data['candidate_id']):
                     education_ns.abort(404, 'Candidate not found')
             
             # Parse dates if provided
@@ -246,7 +244,8 @@ class CandidateEducationList(Resource):
         """Get all education records for a specific candidate"""
         try:
             # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get_or_404(candidate_id)
+            if not CandidateMasterProfile.exists(candidate_id):
+                education_ns.abort(404, 'Candidate not found')
             
             is_active = request.args.get('is_active', type=bool)
             
@@ -93,8 +93,7 @@ class LanguagesList(Resource):
                 languages_ns.abort(400, 'language is required')
             
             # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-            if not candidate:
+            if not CandidateMasterProfile.exists(data['candidate_id']):
                 languages_ns.abort(404, 'Candidate not found')
             
             # Check for duplicate language for the same candidate
@@ -146,8 +145,7 @@ class Language(Resource):
             
             # Verify candidate exists if being changed
             if 'candidate_id' in data:
-                candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-                if not candidate:
+                if not CandidateMasterProfile.exists(data['candidate_id']):
                     languages_ns.abort(404, 'Candidate not found')
             
             # Check for duplicate language if language is being changed
@@ -224,7 +222,8 @@ class CandidateLanguagesList(Resource):
         """Get all language records for a specific candidate"""
         try:
             # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get_or_404(candidate_id)
+            if not CandidateMasterProfile.exists(candidate_id):
+                languages_ns.abort(404, 'Candidate not found')
             
             is_active = request.args.get('is_active', type=bool)
             proficiency_level = request.args.get('proficiency_level')
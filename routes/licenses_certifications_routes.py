@@ -101,8 +101,7 @@ class LicensesCertificationsList(Resource):
                 licenses_certifications_ns.abort(400, 'license_certification_name is required')
             
             # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-            if not candidate:
+            if not CandidateMasterProfile.exists(data['candidate_id']):
                 licenses_certifications_ns.abort(404, 'Candidate not found')
             
             # Parse dates if provided
@@ -167,8 +166,7 @@ class LicenseCertification(Resource):
             
             # Verify candidate exists if being changed
             if 'candidate_id' in data:
-                candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-                if not candidate:
+                if not CandidateMasterProfile.exists(data['candidate_id']):
                     licenses_certifications_ns.abort(404, 'Candidate not found')
             
             # Parse dates if provided
@@ -248,7 +246,8 @@ class CandidateLicensesCertificationsList(Resource):
         """Get all licenses and certifications for a specific candidate"""
         try:
             # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get_or_404(candidate_id)
+            if not CandidateMasterProfile.exists(candidate_id):
+                licenses_certifications_ns.abort(404, 'Candidate not found')
             
             is_active = request.args.get('is_active', type=bool)
             expired = request.args.get('expired', type=bool)
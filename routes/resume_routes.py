@@ -1,14 +1,67 @@
-from flask import request, Response
+from flask import request, Response, stream_with_context, current_app
 from flask_restx import Namespace, Resource, fields
 from database import db
+from cache import cache
 from models import CandidateResume, CandidateMasterProfile
-from datetime import datetime
+from pdf_storage import b64decode_pdf, encode_pdf, decode_pdf_stream, PDF_ENCODING_ZSTD, PDF_ENCODING_BASE64
+from services.resume_upload_service import resume_upload_service, UPLOAD_STATUS_PENDING, UPLOAD_STATUS_READY
+from datetime import datetime, date, timedelta
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
 from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import HTTPException
 import urllib.parse
 import logging
+import hashlib
+import json
+import re
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 resume_ns = Namespace('resumes', description='Resume operations')
 
+# Whitespace is ignored by the lenient base64 decoder
+_BASE64_WHITESPACE = re.compile(r'\s').search
+
+def _normalize_base64(value):
+    """Drop whitespace (e.g. MIME line breaks) so the encoded length maps exactly to the decoded size"""
+    if _BASE64_WHITESPACE(value):
+        return ''.join(value.split())
+    return value
+
+def _base64_decoded_size(value):
+    """Decoded length of whitespace-free base64, computed without decoding it (an upper bound for invalid input)"""
+    return (len(value) // 4) * 3 - value.count('=', -2)
+
+class UploadTooLargeError(ValueError):
+    """Raised when an uploaded PDF exceeds MAX_UPLOAD_BYTES"""
+
+def _check_upload_size(size):
+    """Raise UploadTooLargeError when a (decoded) PDF size exceeds the configured per-resume limit"""
+    max_size = current_app.config['MAX_UPLOAD_BYTES']
+    if size > max_size:
+        raise UploadTooLargeError(f'PDF data exceeds the {max_size // (1024 * 1024)}MB limit')
+
+# Accepted resume file name suffix, matched case-insensitively without lower-casing the name
+_PDF_SUFFIX_RE = re.compile(r'\.pdf\Z', re.IGNORECASE).search
+
+def _escape_like(value):
+    """Escape LIKE/ILIKE wildcards in a user-supplied search term"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+# Query string values treated as true for boolean filters
+_TRUE_VALUES = frozenset(('1', 'true', 'yes', 'y', 't'))
+
+def _parse_bool_arg(value):
+    """Parse a boolean query parameter; returns None when it was not supplied"""
+    if value is None:
+        return None
+    return value.strip().lower() in _TRUE_VALUES
+
 # Define Swagger models
 resume_model = resume_ns.model('Resume', {
     'id': fields.Integer(readonly=True, description='Resume ID'),
@@ -16,6 +69,7 @@ resume_model = resume_ns.model('Resume', {
     'file_name': fields.String(required=True, description='Original file name'),
     'file_size': fields.Integer(required=True, description='File size in bytes'),
     'content_type': fields.String(description='MIME type of the file'),
+    'upload_status': fields.String(readonly=True, description='ready, or pending/failed for asynchronous uploads'),
     'upload_date': fields.DateTime(description='Upload date'),
     'is_active': fields.Boolean(description='Is active'),
     'created_date': fields.DateTime(readonly=True, description='Creation date'),
@@ -32,8 +86,8 @@ resume_input_model = resume_ns.model('ResumeInput', {
 
 resume_list_model = resume_ns.model('ResumeList', {
     'resumes': fields.List(fields.Nested(resume_model)),
-    'total': fields.Integer(description='Total number of resume records'),
-    'pages': fields.Integer(description='Total number of pages'),
+    'has_next': fields.Boolean(description='Whether more resume records are available'),
+    'next_after_id': fields.Integer(description='Value to pass as after_id to fetch the next page'),
     'current_page': fields.Integer(description='Current page number'),
     'per_page': fields.Integer(description='Items per page')
 })
@@ -67,11 +121,198 @@ candidate_resume_list_model = resume_ns.model('CandidateResumeList', {
     'total': fields.Integer(description='Total number of resumes')
 })
 
+def _execute_or_abort_missing_candidate(statement, params=None):
+    """Execute a write statement, turning a candidate_id foreign key violation into a 404"""
+    try:
+        return db.session.execute(statement, params)
+    except IntegrityError as e:
+        db.session.rollback()
+        if 'candidate_id' in str(e.orig):
+            resume_ns.abort(404, 'Candidate not found')
+        raise
+
+def _commit_or_abort_missing_candidate():
+    """Commit the session, turning a candidate_id foreign key violation into a 404"""
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if 'candidate_id' in str(e.orig):
+            resume_ns.abort(404, 'Candidate not found')
+        raise
+
+def _validate_resume_input(data):
+    """
+    Validate a resume input payload without decoding its PDF data
+    
+    Returns:
+        tuple: (whitespace-free base64 text, stripped file name)
+    
+    Raises:
+        UploadTooLargeError: when the PDF exceeds MAX_UPLOAD_BYTES
+        ValueError: with a client-facing message when the payload is invalid
+    """
+    # Validate required fields
+    if not data.get('candidate_id'):
+        raise ValueError('candidate_id is required')
+    if not data.get('pdf_data_base64'):
+        raise ValueError('pdf_data_base64 is required')
+    if not data.get('file_name'):
+        raise ValueError('file_name is required')
+    if not data.get('file_size'):
+        raise ValueError('file_size is required')
+    
+    # Validate file size
+    file_size = data['file_size']
+    if file_size <= 0:
+        raise ValueError('file_size must be a positive number')
+    
+    # Reject oversized payloads and size mismatches from the encoded length before paying for the decode
+    pdf_data_base64 = _normalize_base64(data['pdf_data_base64'])
+    declared_size = _base64_decoded_size(pdf_data_base64)
+    _check_upload_size(declared_size)
+    if abs(declared_size - file_size) > 100:
+        raise ValueError(f'File size mismatch. Expected: {file_size}, Actual: {declared_size}')
+    
+    # Validate file name
+    file_name = data['file_name'].strip()
+    if not _PDF_SUFFIX_RE(file_name):
+        raise ValueError('Only PDF files are supported')
+    
+    return pdf_data_base64, file_name
+
+def _decode_resume_input(data):
+    """
+    Validate a resume input payload and decode its PDF data
+    
+    Returns:
+        tuple: (pdf_data bytes, stripped file name)
+    
+    Raises:
+        UploadTooLargeError: when the PDF exceeds MAX_UPLOAD_BYTES
+        ValueError: with a client-facing message when the payload is invalid
+    """
+    pdf_data_base64, file_name = _validate_resume_input(data)
+    file_size = data['file_size']
+    
+    # Decode PDF data
+    try:
+        pdf_data = b64decode_pdf(pdf_data_base64)
+    except Exception as e:
+        raise ValueError(f'Invalid base64 PDF data: {str(e)}')
+    pdf_size = len(pdf_data)
+    if pdf_size == 0:
+        raise ValueError('PDF data is empty')
+    
+    # Verify file size matches actual data size
+    if abs(pdf_size - file_size) > 100:  # Allow small variance
+        raise ValueError(f'File size mismatch. Expected: {file_size}, Actual: {pdf_size}')
+    
+    return pdf_data, file_name
+
+def _resume_stats_version():
+    """Latest resume modification time, used to key cached statistics"""
+    return db.session.query(db.func.max(CandidateResume.last_modified_date)).scalar()
+
+@cache.memoize(timeout=60)
+def _get_resume_stats(version):
+    """Compute resume statistics; cached per version so unchanged data skips the aggregate scans"""
+    # One scan and one round-trip: group by (is_active, extension) and fold the small result in Python
+    groups = db.session.query(
+        CandidateResume.is_active,
+        CandidateResume.file_extension,
+        db.func.count().label('resume_count'),
+        db.func.coalesce(db.func.sum(CandidateResume.file_size), 0).label('total_size')
+    ).group_by(CandidateResume.is_active, CandidateResume.file_extension).all()
+
+    total_resumes = 0
+    active_resumes = 0
+    total_file_size = 0
+    extension_counts = {}
+    for group in groups:
+        total_resumes += group.resume_count
+        if group.is_active:
+            active_resumes += group.resume_count
+            # sum(bigint) comes back as Decimal; keep the payload plain-JSON serializable
+            total_file_size += int(group.total_size)
+            if group.file_extension:
+                extension_counts[group.file_extension] = group.resume_count
+    inactive_resumes = total_resumes - active_resumes
+    file_extensions = list(extension_counts.items())
+
+    return {
+        'total_resumes': total_resumes,
+        'active_resumes': active_resumes,
+        'inactive_resumes': inactive_resumes,
+        'total_file_size_bytes': int(total_file_size),
+        'total_file_size_mb': round(total_file_size / (1024 * 1024), 2) if total_file_size else 0,
+        'file_extensions': [
+            {'extension': ext[0], 'count': ext[1]} 
+            for ext in file_extensions if ext[0]
+        ]
+    }
+
+def _invalidate_resume_stats():
+    """Drop cached resume statistics after a write"""
+    cache.delete_memoized(_get_resume_stats)
+
+# Metadata columns returned by the list endpoint; pdf_data is never loaded there
+_RESUME_LIST_COLUMNS = (
+    CandidateResume.id,
+    CandidateResume.candidate_id,
+    CandidateResume.file_name,
+    CandidateResume.file_size,
+    CandidateResume.content_type,
+    CandidateResume.upload_status,
+    CandidateResume.upload_date,
+    CandidateResume.is_active,
+    CandidateResume.created_date,
+    CandidateResume.last_modified_date
+)
+
+# Pages larger than this are read through a server-side cursor in chunks of _LIST_YIELD_PER rows
+_LIST_STREAM_THRESHOLD = 100
+_LIST_YIELD_PER = 200
+
+# Row keys resolved once at import; rows are zipped against them instead of per-attribute lookups
+_RESUME_LIST_KEYS = tuple(column.key for column in _RESUME_LIST_COLUMNS)
+_RESUME_DATETIME_KEYS = ('upload_date', 'created_date', 'last_modified_date')
+
+def _resume_row_to_dict(row):
+    """Serialize a resume metadata row the same way as CandidateResume.to_dict()"""
+    data = dict(zip(_RESUME_LIST_KEYS, row))
+    for key in _RESUME_DATETIME_KEYS:
+        value = data[key]
+        data[key] = value.isoformat() if value else None
+    return data
+
+# Seconds clients may reuse rarely-changing GET responses (resume info, stats)
+_HTTP_CACHE_MAX_AGE = 30
+
+def _conditional_json_response(payload, etag):
+    """Return 304 when If-None-Match matches etag, otherwise the JSON payload; both carry caching headers"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = orjson.dumps(payload) if ORJSON_AVAILABLE else json.dumps(payload)
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = _HTTP_CACHE_MAX_AGE
+    return response
+
+def _json_response(payload, status=200):
+    """Encode a hot-path GET payload with orjson, bypassing Flask-RESTX's stdlib JSON encoding"""
+    if ORJSON_AVAILABLE:
+        return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+    return payload, status
+
 @resume_ns.route('/')
 class ResumeList(Resource):
     @resume_ns.doc('get_all_resumes')
     @resume_ns.param('page', 'Page number', type=int, default=1)
     @resume_ns.param('per_page', 'Items per page', type=int, default=10)
+    @resume_ns.param('after_id', 'Return records with an ID lower than this (keyset pagination, overrides page)', type=int)
     @resume_ns.param('candidate_id', 'Filter by candidate ID', type=int)
     @resume_ns.param('file_name', 'Filter by file name')
     @resume_ns.param('is_active', 'Filter by active status', type=bool)
@@ -81,51 +322,70 @@ class ResumeList(Resource):
         """Get all resume records with optional filtering"""
         try:
             # Query parameters
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            page = max(request.args.get('page', 1, type=int), 1)
+            per_page = max(request.args.get('per_page', 10, type=int), 1)
+            after_id = request.args.get('after_id', type=int)
             candidate_id = request.args.get('candidate_id', type=int)
             file_name = request.args.get('file_name')
-            is_active = request.args.get('is_active', type=bool)
+            is_active = request.args.get('is_active', type=_parse_bool_arg)
             upload_date_from = request.args.get('upload_date_from')
             upload_date_to = request.args.get('upload_date_to')
             
-            # Build query
-            query = CandidateResume.query
+            # Build query over metadata columns only
+            query = select(*_RESUME_LIST_COLUMNS)
             
             if candidate_id:
                 query = query.filter(CandidateResume.candidate_id == candidate_id)
             if file_name:
-                query = query.filter(CandidateResume.file_name.ilike(f'%{file_name}%'))
+                # Escape LIKE wildcards so user input stays a literal substring match for the trigram index
+                query = query.filter(CandidateResume.file_name.ilike(f'%{_escape_like(file_name)}%', escape='\\'))
             if is_active is not None:
                 query = query.filter(CandidateResume.is_active == is_active)
             
-            # Date filtering
+            # Date filtering as a half-open range on the timestamp column [from, to + 1 day)
             if upload_date_from:
                 try:
-                    from_date = datetime.strptime(upload_date_from, '%Y-%m-%d').date()
-                    query = query.filter(CandidateResume.upload_date >= from_date)
+                    from_datetime = datetime.combine(date.fromisoformat(upload_date_from), datetime.min.time())
+                    query = query.filter(CandidateResume.upload_date >= from_datetime)
                 except ValueError:
                     resume_ns.abort(400, 'upload_date_from must be in YYYY-MM-DD format')
             
             if upload_date_to:
                 try:
-                    to_date = datetime.strptime(upload_date_to, '%Y-%m-%d').date()
-                    query = query.filter(CandidateResume.upload_date <= to_date)
+                    to_datetime = datetime.combine(date.fromisoformat(upload_date_to) + timedelta(days=1), datetime.min.time())
+                    query = query.filter(CandidateResume.upload_date < to_datetime)
                 except ValueError:
                     resume_ns.abort(400, 'upload_date_to must be in YYYY-MM-DD format')
             
-            # Pagination
-            resume_records = query.paginate(
-                page=page, per_page=per_page, error_out=False
-            )
-            
-            return {
-                'resumes': [resume.to_dict() for resume in resume_records.items],
-                'total': resume_records.total,
-                'pages': resume_records.pages,
+            # Pagination - fetch one extra row to detect a next page instead of running COUNT(*)
+            query = query.order_by(CandidateResume.id.desc())
+            if after_id:
+                query = query.filter(CandidateResume.id < after_id)
+            else:
+                query = query.offset((page - 1) * per_page)
+            
+            query = query.limit(per_page + 1)
+            if per_page > _LIST_STREAM_THRESHOLD:
+                # Large pages: stream rows from a server-side cursor instead of buffering the whole result
+                query = query.execution_options(yield_per=_LIST_YIELD_PER)
+            
+            resumes = []
+            has_next = False
+            result = db.session.execute(query)
+            for row in result:
+                if len(resumes) == per_page:
+                    has_next = True
+                    break
+                resumes.append(_resume_row_to_dict(row))
+            result.close()
+            
+            return _json_response({
+                'resumes': resumes,
+                'has_next': has_next,
+                'next_after_id': resumes[-1]['id'] if has_next else None,
                 'current_page': page,
                 'per_page': per_page
-            }, 200
+            })
             
         except Exception as e:
             logging.error(f"Failed to get resume list: {str(e)}")
@@ -138,63 +398,149 @@ class ResumeList(Resource):
         try:
             data = request.get_json()
             
-            # Validate required fields
-            if not data.get('candidate_id'):
-                resume_ns.abort(400, 'candidate_id is required')
-            if not data.get('pdf_data_base64'):
-                resume_ns.abort(400, 'pdf_data_base64 is required')
-            if not data.get('file_name'):
-                resume_ns.abort(400, 'file_name is required')
-            if not data.get('file_size'):
-                resume_ns.abort(400, 'file_size is required')
+            # Validate fields and decode PDF data
+            try:
+                pdf_data, file_name = _decode_resume_input(data)
+            except UploadTooLargeError as e:
+                resume_ns.abort(413, str(e))
+            except ValueError as e:
+                resume_ns.abort(400, str(e))
+            
+            # Create new resume record (pdf_data stored compressed when worthwhile)
+            stored_pdf_data, pdf_data_encoding = encode_pdf(pdf_data)
+            resume_record = CandidateResume(
+                candidate_id=data['candidate_id'],
+                pdf_data=stored_pdf_data,
+                pdf_data_encoding=pdf_data_encoding,
+                file_name=file_name,
+                file_size=len(pdf_data),  # Use actual data size
+                content_type=data.get('content_type', 'application/pdf')
+            )
             
-            # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-            if not candidate:
-                resume_ns.abort(404, 'Candidate not found')
+            db.session.add(resume_record)
+            # Candidate existence is enforced by the candidate_id foreign key
+            _commit_or_abort_missing_candidate()
+            _invalidate_resume_stats()
             
-            # Validate file size
-            file_size = data.get('file_size')
-            if file_size <= 0:
-                resume_ns.abort(400, 'file_size must be a positive number')
+            return resume_record.to_dict(), 201
             
-            # Validate and decode PDF data
-            try:
-                import base64
-                pdf_data = base64.b64decode(data['pdf_data_base64'])
-                if len(pdf_data) == 0:
-                    resume_ns.abort(400, 'PDF data is empty')
+        except HTTPException:
+            raise
+        except Exception as e:
+            db.session.rollback()
+            resume_ns.abort(500, str(e))
+
+@resume_ns.route('/bulk')
+class ResumeBulk(Resource):
+    @resume_ns.doc('create_resumes_bulk')
+    @resume_ns.expect([resume_input_model])
+    def post(self):
+        """Create multiple resume records in one batch (the whole batch is rejected if any item is invalid)"""
+        try:
+            data = request.get_json()
+            
+            if not isinstance(data, list) or not data:
+                resume_ns.abort(400, 'Request body must be a non-empty JSON array of resumes')
+            
+            # Validate every item before inserting anything
+            rows = []
+            for index, item in enumerate(data):
+                if not isinstance(item, dict):
+                    resume_ns.abort(400, f'Resume at index {index} must be a JSON object')
+                try:
+                    pdf_data, file_name = _decode_resume_input(item)
+                except UploadTooLargeError as e:
+                    resume_ns.abort(413, f'Resume at index {index}: {str(e)}')
+                except ValueError as e:
+                    resume_ns.abort(400, f'Resume at index {index}: {str(e)}')
                 
-                # Verify file size matches actual data size
-                if abs(len(pdf_data) - file_size) > 100:  # Allow small variance
-                    resume_ns.abort(400, f'File size mismatch. Expected: {file_size}, Actual: {len(pdf_data)}')
-                    
-            except Exception as e:
-                resume_ns.abort(400, f'Invalid base64 PDF data: {str(e)}')
+                stored_pdf_data, pdf_data_encoding = encode_pdf(pdf_data)
+                rows.append({
+                    'candidate_id': item['candidate_id'],
+                    'pdf_data': stored_pdf_data,
+                    'pdf_data_encoding': pdf_data_encoding,
+                    'file_name': file_name,
+                    'file_size': len(pdf_data),  # Use actual data size
+                    'content_type': item.get('content_type', 'application/pdf')
+                })
+            
+            # Single multi-row INSERT instead of one INSERT per resume; it runs immediately, so a
+            # missing candidate surfaces here rather than at commit
+            _execute_or_abort_missing_candidate(insert(CandidateResume), rows)
+            _commit_or_abort_missing_candidate()
+            _invalidate_resume_stats()
+            
+            return {
+                'message': f'{len(rows)} resume records created successfully',
+                'created': len(rows)
+            }, 201
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            db.session.rollback()
+            resume_ns.abort(500, str(e))
+
+@resume_ns.route('/async')
+class ResumeAsync(Resource):
+    @resume_ns.doc('create_resume_async')
+    @resume_ns.expect(resume_input_model)
+    def post(self):
+        """Accept a base64 encoded PDF and decode/validate it in the background (poll the returned resume for upload_status)"""
+        try:
+            data = request.get_json()
             
-            # Validate file name
-            file_name = data['file_name'].strip()
-            if not file_name.lower().endswith('.pdf'):
-                resume_ns.abort(400, 'Only PDF files are supported')
+            # Cheap checks stay synchronous; decoding and the PDF header check run in resume_upload_service
+            try:
+                pdf_data_base64, file_name = _validate_resume_input(data)
+            except UploadTooLargeError as e:
+                resume_ns.abort(413, str(e))
+            except ValueError as e:
+                resume_ns.abort(400, str(e))
             
-            # Create new resume record
+            # Stage the base64 text in the row itself so any worker process can report its status
             resume_record = CandidateResume(
                 candidate_id=data['candidate_id'],
-                pdf_data=pdf_data,
+                pdf_data=pdf_data_base64.encode('ascii'),
+                pdf_data_encoding=PDF_ENCODING_BASE64,
+                upload_status=UPLOAD_STATUS_PENDING,
                 file_name=file_name,
-                file_size=len(pdf_data),  # Use actual data size
+                file_size=data['file_size'],
                 content_type=data.get('content_type', 'application/pdf')
             )
             
             db.session.add(resume_record)
-            db.session.commit()
+            # Candidate existence is enforced by the candidate_id foreign key
+            _commit_or_abort_missing_candidate()
+            _invalidate_resume_stats()
             
-            return resume_record.to_dict(), 201
+            resume_upload_service.submit(resume_record.id)
+            
+            return resume_record.to_dict(), 202, {'Location': f'/api/resumes/{resume_record.id}'}
             
+        except HTTPException:
+            raise
         except Exception as e:
             db.session.rollback()
             resume_ns.abort(500, str(e))
 
+# Chunk size used when copying multipart uploads out of Werkzeug's spooled temporary file
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def _read_upload(file_storage, max_size):
+    """
+    Copy an uploaded file into a single bytearray in fixed-size chunks.
+    Returns None as soon as the file exceeds max_size, so oversized uploads are never fully buffered.
+    """
+    buffer = bytearray()
+    while True:
+        chunk = file_storage.stream.read(_UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return buffer
+        if len(buffer) + len(chunk) > max_size:
+            return None
+        buffer += chunk
+
 # Add multipart parser for PDF upload
 upload_parser = resume_ns.parser()
 upload_parser.add_argument('pdf_file', 
@@ -223,33 +569,40 @@ class ResumeUpload(Resource):
             if not pdf_file or pdf_file.filename == '':
                 resume_ns.abort(400, 'No PDF file provided')
             
-            if not pdf_file.filename.lower().endswith('.pdf'):
+            if not _PDF_SUFFIX_RE(pdf_file.filename):
                 resume_ns.abort(400, 'Only PDF files are allowed')
             
-            # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get(candidate_id)
-            if not candidate:
+            # Verify candidate exists before reading the upload
+            if not CandidateMasterProfile.exists(candidate_id):
                 resume_ns.abort(404, 'Candidate not found')
             
-            # Read PDF file data
-            pdf_data = pdf_file.read()
+            # Read PDF file data in chunks, giving up as soon as it exceeds the per-file limit
+            max_file_size = current_app.config['MAX_UPLOAD_BYTES']
+            pdf_data = _read_upload(pdf_file, max_file_size)
+            if pdf_data is None:
+                resume_ns.abort(413, f'PDF file exceeds the {max_file_size // (1024 * 1024)}MB limit')
             if not pdf_data:
                 resume_ns.abort(400, 'PDF file is empty')
             
-            # Create new resume record
+            # Create new resume record (pdf_data stored compressed when worthwhile)
+            stored_pdf_data, pdf_data_encoding = encode_pdf(pdf_data)
             resume_record = CandidateResume(
                 candidate_id=candidate_id,
-                pdf_data=pdf_data,
+                pdf_data=stored_pdf_data,
+                pdf_data_encoding=pdf_data_encoding,
                 file_name=pdf_file.filename,
                 file_size=len(pdf_data),
                 content_type=pdf_file.content_type or 'application/pdf'
             )
             
             db.session.add(resume_record)
-            db.session.commit()
+            _commit_or_abort_missing_candidate()
+            _invalidate_resume_stats()
             
             return resume_record.to_dict(), 201
             
+        except HTTPException:
+            raise
         except Exception as e:
             db.session.rollback()
             resume_ns.abort(500, str(e))
@@ -261,7 +614,7 @@ class Resume(Resource):
     def get(self, resume_id):
         """Get a specific resume record by ID"""
         try:
-            resume_record = CandidateResume.query.get_or_404(resume_id)
+            resume_record = db.get_or_404(CandidateResume, resume_id)
             return resume_record.to_dict(), 200
             
         except Exception as e:
@@ -273,25 +626,25 @@ class Resume(Resource):
     def put(self, resume_id):
         """Update an existing resume record"""
         try:
-            resume_record = CandidateResume.query.get_or_404(resume_id)
             data = request.get_json()
-            
-            # Verify candidate exists if being changed
-            if 'candidate_id' in data:
-                candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-                if not candidate:
-                    resume_ns.abort(404, 'Candidate not found')
+            changes = {}
             
             # Handle PDF data update if provided
             if 'pdf_data_base64' in data:
+                pdf_data_base64 = _normalize_base64(data['pdf_data_base64'])
+                try:
+                    _check_upload_size(_base64_decoded_size(pdf_data_base64))
+                except UploadTooLargeError as e:
+                    resume_ns.abort(413, str(e))
                 try:
-                    import base64
-                    pdf_data = base64.b64decode(data['pdf_data_base64'])
-                    if len(pdf_data) == 0:
+                    pdf_data = b64decode_pdf(pdf_data_base64)
+                    pdf_size = len(pdf_data)
+                    if pdf_size == 0:
                         resume_ns.abort(400, 'PDF data is empty')
                     
-                    resume_record.pdf_data = pdf_data
-                    resume_record.file_size = len(pdf_data)  # Update file size to match actual data
+                    changes['pdf_data'], changes['pdf_data_encoding'] = encode_pdf(pdf_data)
+                    changes['file_size'] = pdf_size  # Update file size to match actual data
+                    changes['upload_status'] = UPLOAD_STATUS_READY  # Supersedes any pending async upload
                     
                 except Exception as e:
                     resume_ns.abort(400, f'Invalid base64 PDF data: {str(e)}')
@@ -304,7 +657,7 @@ class Resume(Resource):
             # Validate file name if provided
             if 'file_name' in data:
                 file_name = data['file_name'].strip()
-                if not file_name.lower().endswith('.pdf'):
+                if not _PDF_SUFFIX_RE(file_name):
                     resume_ns.abort(400, 'Only PDF files are supported')
             
             # Update fields (excluding pdf_data_base64 as it's handled above)
@@ -318,13 +671,27 @@ class Resume(Resource):
             
             for field in updatable_fields:
                 if field in data:
-                    setattr(resume_record, field, data[field])
-            
-            resume_record.last_modified_date = datetime.utcnow()
+                    changes[field] = data[field]
+            
+            changes['last_modified_date'] = datetime.utcnow()
+            
+            # Single UPDATE ... RETURNING instead of SELECT then UPDATE;
+            # candidate existence (if changed) is enforced by the candidate_id foreign key
+            resume_row = _execute_or_abort_missing_candidate(
+                update(CandidateResume)
+                .where(CandidateResume.id == resume_id)
+                .values(**changes)
+                .returning(*_RESUME_LIST_COLUMNS)
+            ).first()
+            if resume_row is None:
+                resume_ns.abort(404, 'Resume not found')
             db.session.commit()
+            _invalidate_resume_stats()
             
-            return resume_record.to_dict(), 200
+            return _resume_row_to_dict(resume_row), 200
             
+        except HTTPException:
+            raise
         except Exception as e:
             db.session.rollback()
             logging.error(f"Failed to update resume {resume_id}: {str(e)}")
@@ -334,12 +701,17 @@ class Resume(Resource):
     def delete(self, resume_id):
         """Delete a resume record (soft delete)"""
         try:
-            resume_record = CandidateResume.query.get_or_404(resume_id)
-            
-            # Soft delete
-            resume_record.is_active = False
-            resume_record.last_modified_date = datetime.utcnow()
+            # Soft delete in a single UPDATE ... RETURNING round-trip
+            deleted_id = db.session.execute(
+                update(CandidateResume)
+                .where(CandidateResume.id == resume_id)
+                .values(is_active=False, last_modified_date=datetime.utcnow())
+                .returning(CandidateResume.id)
+            ).scalar()
+            if deleted_id is None:
+                resume_ns.abort(404, 'Resume not found')
             db.session.commit()
+            _invalidate_resume_stats()
             
             return {'message': 'Resume record deleted successfully'}, 200
             
@@ -355,10 +727,16 @@ class ResumeHardDelete(Resource):
     def delete(self, resume_id):
         """Permanently delete a resume record"""
         try:
-            resume_record = CandidateResume.query.get_or_404(resume_id)
-            
-            db.session.delete(resume_record)
+            # Delete in a single DELETE ... RETURNING round-trip
+            deleted_id = db.session.execute(
+                delete(CandidateResume)
+                .where(CandidateResume.id == resume_id)
+                .returning(CandidateResume.id)
+            ).scalar()
+            if deleted_id is None:
+                resume_ns.abort(404, 'Resume not found')
             db.session.commit()
+            _invalidate_resume_stats()
             
             return {'message': 'Resume record permanently deleted'}, 200
             
@@ -377,33 +755,56 @@ class CandidateResumeList(Resource):
         """Get all resume records for a specific candidate"""
         try:
             # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get_or_404(candidate_id)
+            if not CandidateMasterProfile.exists(candidate_id):
+                resume_ns.abort(404, 'Candidate not found')
             
-            is_active = request.args.get('is_active', type=bool)
-            latest_only = request.args.get('latest_only', 'false').lower() == 'true'
+            is_active = request.args.get('is_active', type=_parse_bool_arg)
+            latest_only = _parse_bool_arg(request.args.get('latest_only')) or False
             
-            query = CandidateResume.query.filter(CandidateResume.candidate_id == candidate_id)
+            query = select(*_RESUME_LIST_COLUMNS).where(CandidateResume.candidate_id == candidate_id)
             
             if is_active is not None:
-                query = query.filter(CandidateResume.is_active == is_active)
+                query = query.where(CandidateResume.is_active == is_active)
+            
+            query = query.order_by(CandidateResume.upload_date.desc(), CandidateResume.id.desc())
             
             if latest_only:
-                query = query.order_by(CandidateResume.upload_date.desc()).limit(1)
+                # Single row fetch; no list materialization
+                latest = db.session.execute(query.limit(1)).first()
+                resumes = [_resume_row_to_dict(latest)] if latest else []
             else:
-                query = query.order_by(CandidateResume.upload_date.desc())
-            
-            resume_records = query.all()
+                # Every row is returned, so the total is the length of the result itself
+                resumes = [_resume_row_to_dict(row) for row in db.session.execute(query)]
             
-            return {
+            return _json_response({
                 'candidate_id': candidate_id,
-                'resumes': [resume.to_dict() for resume in resume_records],
-                'total': len(resume_records)
-            }, 200
+                'resumes': resumes,
+                'total': len(resumes)
+            })
             
         except Exception as e:
             logging.error(f"Failed to get candidate resumes for candidate {candidate_id}: {str(e)}")
             resume_ns.abort(500, str(e))
 
+# Size of each pdf_data slice read from PostgreSQL while streaming a download
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Downloads may be stored privately but must be revalidated (ETag / Last-Modified) on every use
+_DOWNLOAD_CACHE_CONTROL = 'private, max-age=0, must-revalidate'
+
+def _stream_resume_pdf(resume_id, length):
+    """Yield a resume's pdf_data in fixed-size slices so the whole blob is never held in memory"""
+    offset = 0
+    while offset < length:
+        chunk = db.session.execute(
+            select(db.func.substring(CandidateResume.pdf_data, offset + 1, _DOWNLOAD_CHUNK_SIZE))
+            .where(CandidateResume.id == resume_id)
+        ).scalar()
+        if not chunk:
+            break
+        offset += len(chunk)
+        yield bytes(chunk)
+
 @resume_ns.route('/<int:resume_id>/download')
 @resume_ns.param('resume_id', 'Resume ID')
 class ResumeDownload(Resource):
@@ -411,30 +812,77 @@ class ResumeDownload(Resource):
     def get(self, resume_id):
         """Returns the PDF file as binary data with appropriate headers."""
         try:
-            resume_record = CandidateResume.query.get_or_404(resume_id)
+            # Load metadata and the stored byte length only; the PDF itself is streamed below
+            resume_record = db.session.execute(
+                select(
+                    CandidateResume.file_name,
+                    CandidateResume.content_type,
+                    CandidateResume.is_active,
+                    CandidateResume.last_modified_date,
+                    CandidateResume.pdf_data_encoding,
+                    CandidateResume.upload_status,
+                    db.func.octet_length(CandidateResume.pdf_data).label('pdf_length')
+                ).where(CandidateResume.id == resume_id)
+            ).one_or_none()
+            if resume_record is None:
+                resume_ns.abort(404, 'Resume not found')
             
             if not resume_record.is_active:
                 resume_ns.abort(410, 'Resume is no longer active')
             
-            if not resume_record.pdf_data:
+            if resume_record.upload_status != UPLOAD_STATUS_READY:
+                resume_ns.abort(409, f'Resume upload is {resume_record.upload_status}')
+            
+            if not resume_record.pdf_length:
                 resume_ns.abort(404, 'PDF data not found')
             
+            # Revalidation: the PDF only changes together with last_modified_date
+            last_modified = resume_record.last_modified_date
+            etag = f'{resume_id}-{int(last_modified.timestamp()) if last_modified else 0}-{resume_record.pdf_length}'
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(
+                    last_modified and request.if_modified_since
+                    and last_modified.replace(microsecond=0, tzinfo=None) <= request.if_modified_since.replace(tzinfo=None)
+                )
+            if not_modified:
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                response.headers['Cache-Control'] = _DOWNLOAD_CACHE_CONTROL
+                response.headers['Vary'] = 'Accept-Encoding'
+                return response
+            
             # Handle filename encoding for special characters
             safe_filename = urllib.parse.quote(resume_record.file_name)
             
-            # Return PDF as binary response with proper headers
+            headers = {
+                'Content-Type': resume_record.content_type or 'application/pdf',
+                'Content-Disposition': f'attachment; filename="{safe_filename}"; filename*=UTF-8\'\'{safe_filename}',
+                'Cache-Control': _DOWNLOAD_CACHE_CONTROL,
+                'Vary': 'Accept-Encoding'
+            }
+            chunks = _stream_resume_pdf(resume_id, resume_record.pdf_length)
+            if resume_record.pdf_data_encoding != PDF_ENCODING_ZSTD:
+                headers['Content-Length'] = str(resume_record.pdf_length)
+            elif request.accept_encodings['zstd']:
+                # Client decodes zstd itself: pass the stored bytes through unchanged
+                headers['Content-Encoding'] = 'zstd'
+                headers['Content-Length'] = str(resume_record.pdf_length)
+            else:
+                # Decompress on the fly; the decoded length is not stored, so the body is sent chunked
+                chunks = decode_pdf_stream(chunks, resume_record.pdf_data_encoding)
+            
+            # Stream PDF as binary response with proper headers
             response = Response(
-                resume_record.pdf_data,
+                stream_with_context(chunks),
                 mimetype=resume_record.content_type or 'application/pdf',
-                headers={
-                    'Content-Type': resume_record.content_type or 'application/pdf',
-                    'Content-Disposition': f'attachment; filename="{safe_filename}"; filename*=UTF-8\'\'{safe_filename}',
-                    'Content-Length': str(resume_record.file_size),
-                    'Cache-Control': 'no-cache, no-store, must-revalidate',
-                    'Pragma': 'no-cache',
-                    'Expires': '0'
-                }
+                direct_passthrough=True,
+                headers=headers
             )
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
             
             return response
             
@@ -449,19 +897,25 @@ class ResumeInfo(Resource):
     def get(self, resume_id):
         """Get resume information without downloading the file"""
         try:
-            resume_record = CandidateResume.query.get_or_404(resume_id)
+            # Metadata only; the PDF blob is not needed to describe the file
+            resume_record = db.session.execute(
+                select(*_RESUME_LIST_COLUMNS).where(CandidateResume.id == resume_id)
+            ).one_or_none()
+            if resume_record is None:
+                resume_ns.abort(404, 'Resume not found')
             
             if not resume_record.is_active:
                 resume_ns.abort(410, 'Resume is no longer active')
             
-            return {
+            etag = hashlib.md5(f'{resume_id}:{resume_record.last_modified_date}'.encode()).hexdigest()
+            return _conditional_json_response({
                 'resume_id': resume_id,
                 'file_name': resume_record.file_name,
                 'file_size': resume_record.file_size,
                 'content_type': resume_record.content_type,
                 'upload_date': resume_record.upload_date.isoformat() if resume_record.upload_date else None,
                 'download_url': f'/api/resumes/{resume_id}/download'
-            }, 200
+            }, etag)
             
         except Exception as e:
             logging.error(f"Failed to get resume info for resume {resume_id}: {str(e)}")
@@ -473,40 +927,10 @@ class ResumeStats(Resource):
     def get(self):
         """Get resume statistics and file information"""
         try:
-            total_resumes = CandidateResume.query.count()
-            active_resumes = CandidateResume.query.filter_by(is_active=True).count()
-            inactive_resumes = total_resumes - active_resumes
-            
-            # Get total file size
-            total_size_result = db.session.query(
-                db.func.sum(CandidateResume.file_size)
-            ).filter(CandidateResume.is_active == True).first()
-            total_file_size = total_size_result[0] if total_size_result[0] else 0
-            
-            # Get file count by extension
-            file_extensions = db.session.query(
-                db.func.substr(CandidateResume.file_name, 
-                              db.func.position('.' in CandidateResume.file_name) + 1),
-                db.func.count(CandidateResume.id)
-            ).filter(
-                CandidateResume.is_active == True,
-                CandidateResume.file_name.contains('.')
-            ).group_by(
-                db.func.substr(CandidateResume.file_name, 
-                              db.func.position('.' in CandidateResume.file_name) + 1)
-            ).all()
-            
-            return {
-                'total_resumes': total_resumes,
-                'active_resumes': active_resumes,
-                'inactive_resumes': inactive_resumes,
-                'total_file_size_bytes': int(total_file_size),
-                'total_file_size_mb': round(total_file_size / (1024 * 1024), 2) if total_file_size else 0,
-                'file_extensions': [
-                    {'extension': ext[0], 'count': ext[1]} 
-                    for ext in file_extensions if ext[0]
-                ]
-            }, 200
+            stats = _get_resume_stats(_resume_stats_version())
+            # Hash the statistics themselves so hard deletes (which leave no modification time) change the ETag
+            etag = hashlib.md5(json.dumps(stats, sort_keys=True).encode()).hexdigest()
+            return _conditional_json_response(stats, etag)
             
         except Exception as e:
             logging.error(f"Failed to get resume stats: {str(e)}")
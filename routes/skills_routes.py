@@ -1,8 +1,11 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
+from sqlalchemy import select, insert, update, delete, and_
 from database import db
+from cache import cache, skills_cache_generation, invalidate_skills_cache
 from models import CandidateSkills, CandidateMasterProfile, CandidateCareerHistory
-from datetime import datetime
+import math
+import urllib.parse
 
 skills_ns = Namespace('skills', description='Skills operations')
 
@@ -23,53 +26,140 @@ skill_input_model = skills_ns.model('SkillInput', {
     'skills': fields.String(required=True, description='Skills description')
 })
 
+skill_bulk_input_model = skills_ns.model('SkillBulkInput', {
+    'candidate_id': fields.Integer(required=True, description='Candidate ID'),
+    'career_history_id': fields.Integer(description='Career history ID (optional)'),
+    'skills': fields.List(fields.String, required=True, description='Skills descriptions')
+})
+
 skill_list_model = skills_ns.model('SkillList', {
     'skills': fields.List(fields.Nested(skill_model)),
     'total': fields.Integer(description='Total number of skills'),
     'pages': fields.Integer(description='Total number of pages'),
     'current_page': fields.Integer(description='Current page number'),
-    'per_page': fields.Integer(description='Items per page')
+    'per_page': fields.Integer(description='Items per page'),
+    'next_after_id': fields.Integer(description='Value to pass as after_id to fetch the next page')
 })
 
+# Columns returned by the skill list endpoints, read as plain rows instead of ORM objects
+_SKILL_COLUMNS = (
+    CandidateSkills.id,
+    CandidateSkills.candidate_id,
+    CandidateSkills.career_history_id,
+    CandidateSkills.skills,
+    CandidateSkills.is_active,
+    CandidateSkills.created_date,
+    CandidateSkills.last_modified_date
+)
+
+# Row keys resolved once at import; rows are zipped against them instead of per-attribute lookups
+_SKILL_KEYS = tuple(column.key for column in _SKILL_COLUMNS)
+
+def _skill_row_to_dict(row):
+    """Serialize a skill row the same way as CandidateSkills.to_dict()"""
+    data = dict(zip(_SKILL_KEYS, row))
+    data['created_date'] = data['created_date'].isoformat() if data['created_date'] else None
+    data['last_modified_date'] = data['last_modified_date'].isoformat() if data['last_modified_date'] else None
+    return data
+
+# Seconds the popular skills aggregation is reused before it is recomputed
+_POPULAR_SKILLS_TTL = 120
+
+@cache.memoize(timeout=_POPULAR_SKILLS_TTL)
+def _get_popular_skills(limit, generation):
+    """Most common active skill values, cached per limit and skills cache generation"""
+    rows = db.session.execute(
+        select(CandidateSkills.skills, db.func.count().label('skill_count'))
+        .where(CandidateSkills.is_active == True)
+        .group_by(CandidateSkills.skills)
+        .order_by(db.func.count().desc(), CandidateSkills.skills)
+        .limit(limit)
+    )
+    return [{'skills': row.skills, 'count': row.skill_count} for row in rows]
+
+# Seconds a cached skill list response is served before the query is re-run
+_SKILLS_LIST_TTL = 60
+
+def _skills_list_cache_key():
+    """Cache key for a skill list response: current generation + path + normalized query string"""
+    query_string = urllib.parse.urlencode(sorted(request.args.items(multi=True)))
+    return f'skills:{skills_cache_generation()}:{request.path}?{query_string}'
+
+def _lookup_skill_references(candidate_id, career_history_id):
+    """
+    Check a candidate and a career history record in a single round-trip
+    
+    Returns:
+        tuple: (whether the candidate exists, candidate_id owning the career history or None when it does not exist)
+    """
+    return db.session.execute(
+        select(
+            select(CandidateMasterProfile.id).where(CandidateMasterProfile.id == candidate_id).exists(),
+            select(CandidateCareerHistory.candidate_id)
+            .where(CandidateCareerHistory.id == career_history_id)
+            .scalar_subquery()
+        )
+    ).one()
+
 @skills_ns.route('/')
 class SkillsList(Resource):
     @skills_ns.doc('get_all_skills')
     @skills_ns.param('page', 'Page number', type=int, default=1)
     @skills_ns.param('per_page', 'Items per page', type=int, default=10)
+    @skills_ns.param('after_id', 'Return skills with an ID greater than this (keyset pagination, overrides page)', type=int)
     @skills_ns.param('candidate_id', 'Filter by candidate ID', type=int)
     @skills_ns.param('career_history_id', 'Filter by career history ID', type=int)
     @skills_ns.param('is_active', 'Filter by active status', type=bool)
+    @cache.cached(timeout=_SKILLS_LIST_TTL, key_prefix=_skills_list_cache_key)
     def get(self):
         """Get all skills with optional filtering"""
         try:
             # Query parameters
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            page = max(request.args.get('page', 1, type=int), 1)
+            per_page = max(request.args.get('per_page', 10, type=int), 1)
+            after_id = request.args.get('after_id', type=int)
             candidate_id = request.args.get('candidate_id', type=int)
             career_history_id = request.args.get('career_history_id', type=int)
             is_active = request.args.get('is_active', type=bool)
             
-            # Build query
-            query = CandidateSkills.query
-            
+            # Build filter conditions shared by the count and page queries
+            conditions = []
             if candidate_id:
-                query = query.filter(CandidateSkills.candidate_id == candidate_id)
+                conditions.append(CandidateSkills.candidate_id == candidate_id)
             if career_history_id:
-                query = query.filter(CandidateSkills.career_history_id == career_history_id)
+                conditions.append(CandidateSkills.career_history_id == career_history_id)
             if is_active is not None:
-                query = query.filter(CandidateSkills.is_active == is_active)
+                conditions.append(CandidateSkills.is_active == is_active)
             
-            # Pagination
-            skills = query.paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            # Pagination over a column projection; seek past after_id instead of OFFSET when given
+            query = select(*_SKILL_COLUMNS).where(*conditions).order_by(CandidateSkills.id)
+            if after_id:
+                rows = db.session.execute(query.where(CandidateSkills.id > after_id).limit(per_page)).all()
+                total = None
+            else:
+                # The window count is computed before OFFSET/LIMIT, so the page and the total share one round-trip
+                rows = db.session.execute(
+                    query.add_columns(db.func.count().over().label('total_count'))
+                    .offset((page - 1) * per_page)
+                    .limit(per_page)
+                ).all()
+                total = rows[0].total_count if rows else None
+            
+            if total is None:
+                # Keyset pages and pages past the end still need the standalone count (without ORDER BY)
+                total = db.session.execute(
+                    select(db.func.count()).select_from(CandidateSkills).where(*conditions)
+                ).scalar()
+            
+            skills = [_skill_row_to_dict(row) for row in rows]
             
             return {
-                'skills': [skill.to_dict() for skill in skills.items],
-                'total': skills.total,
-                'pages': skills.pages,
+                'skills': skills,
+                'total': total,
+                'pages': math.ceil(total / per_page),
                 'current_page': page,
-                'per_page': per_page
+                'per_page': per_page,
+                'next_after_id': skills[-1]['id'] if len(skills) == per_page else None
             }, 200
             
         except Exception as e:
@@ -88,30 +178,87 @@ class SkillsList(Resource):
             if not data.get('skills'):
                 skills_ns.abort(400, 'skills is required')
             
-            # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-            if not candidate:
+            # Verify candidate exists, and career history exists and belongs to it if provided
+            candidate_exists, career_candidate_id = _lookup_skill_references(
+                data['candidate_id'], data.get('career_history_id')
+            )
+            if not candidate_exists:
                 skills_ns.abort(404, 'Candidate not found')
-            
-            # Verify career history exists if provided
             if data.get('career_history_id'):
-                career_history = CandidateCareerHistory.query.get(data['career_history_id'])
-                if not career_history:
+                if career_candidate_id is None:
                     skills_ns.abort(404, 'Career history not found')
-                if career_history.candidate_id != data['candidate_id']:
+                if career_candidate_id != data['candidate_id']:
                     skills_ns.abort(400, 'Career history does not belong to the specified candidate')
             
-            # Create new skill
-            skill = CandidateSkills(
-                candidate_id=data['candidate_id'],
-                career_history_id=data.get('career_history_id'),
-                skills=data['skills']
+            # Single INSERT ... RETURNING; the response is built from the returned row without a re-SELECT
+            skill_row = db.session.execute(
+                insert(CandidateSkills)
+                .values(
+                    candidate_id=data['candidate_id'],
+                    career_history_id=data.get('career_history_id'),
+                    skills=data['skills']
+                )
+                .returning(*_SKILL_COLUMNS)
+            ).one()
+            db.session.commit()
+            invalidate_skills_cache()
+            
+            return _skill_row_to_dict(skill_row), 201
+            
+        except Exception as e:
+            db.session.rollback()
+            skills_ns.abort(500, str(e))
+
+@skills_ns.route('/bulk')
+class SkillsBulk(Resource):
+    @skills_ns.doc('create_bulk_skills')
+    @skills_ns.expect(skill_bulk_input_model)
+    def post(self):
+        """Create multiple skill records for a candidate in one INSERT"""
+        try:
+            data = request.get_json()
+            
+            # Validate required fields
+            if not data.get('candidate_id'):
+                skills_ns.abort(400, 'candidate_id is required')
+            if not isinstance(data.get('skills'), list):
+                skills_ns.abort(400, 'skills must be a list')
+            
+            # Verify candidate exists, and career history exists and belongs to it if provided
+            candidate_exists, career_candidate_id = _lookup_skill_references(
+                data['candidate_id'], data.get('career_history_id')
             )
+            if not candidate_exists:
+                skills_ns.abort(404, 'Candidate not found')
+            if data.get('career_history_id'):
+                if career_candidate_id is None:
+                    skills_ns.abort(404, 'Career history not found')
+                if career_candidate_id != data['candidate_id']:
+                    skills_ns.abort(400, 'Career history does not belong to the specified candidate')
+            
+            rows = [
+                {
+                    'candidate_id': data['candidate_id'],
+                    'career_history_id': data.get('career_history_id'),
+                    'skills': skill.strip()
+                }
+                for skill in data['skills']
+                if isinstance(skill, str) and skill.strip()
+            ]
+            if not rows:
+                skills_ns.abort(400, 'skills must contain at least one non-empty value')
             
-            db.session.add(skill)
+            # Single multi-row INSERT ... RETURNING instead of one INSERT per skill
+            created = db.session.execute(insert(CandidateSkills).returning(*_SKILL_COLUMNS), rows)
+            skills = [_skill_row_to_dict(row) for row in created]
             db.session.commit()
+            invalidate_skills_cache()
             
-            return skill.to_dict(), 201
+            return {
+                'candidate_id': data['candidate_id'],
+                'skills': skills,
+                'total': len(skills)
+            }, 201
             
         except Exception as e:
             db.session.rollback()
@@ -135,34 +282,46 @@ class Skill(Resource):
     def put(self, skill_id):
         """Update an existing skill"""
         try:
-            skill = CandidateSkills.query.get_or_404(skill_id)
             data = request.get_json()
+            conditions = [CandidateSkills.id == skill_id]
             
-            # Verify candidate exists if being changed
-            if 'candidate_id' in data:
-                candidate = CandidateMasterProfile.query.get(data['candidate_id'])
-                if not candidate:
+            # Verify candidate exists if being changed, and career history exists if provided, in one query
+            career_history_id = data.get('career_history_id')
+            if 'candidate_id' in data or career_history_id:
+                candidate_exists, career_candidate_id = _lookup_skill_references(
+                    data.get('candidate_id'), career_history_id
+                )
+                if 'candidate_id' in data and not candidate_exists:
                     skills_ns.abort(404, 'Candidate not found')
-            
-            # Verify career history exists if provided
-            if 'career_history_id' in data and data['career_history_id']:
-                career_history = CandidateCareerHistory.query.get(data['career_history_id'])
-                if not career_history:
-                    skills_ns.abort(404, 'Career history not found')
-                candidate_id = data.get('candidate_id', skill.candidate_id)
-                if career_history.candidate_id != candidate_id:
-                    skills_ns.abort(400, 'Career history does not belong to the specified candidate')
+                if career_history_id:
+                    if career_candidate_id is None:
+                        skills_ns.abort(404, 'Career history not found')
+                    if 'candidate_id' in data:
+                        if career_candidate_id != data['candidate_id']:
+                            skills_ns.abort(400, 'Career history does not belong to the specified candidate')
+                    else:
+                        # Check ownership against the stored candidate inside the UPDATE itself
+                        conditions.append(CandidateSkills.candidate_id == career_candidate_id)
             
             # Update fields
             updatable_fields = ['candidate_id', 'career_history_id', 'skills', 'is_active']
-            for field in updatable_fields:
-                if field in data:
-                    setattr(skill, field, data[field])
+            changes = {field: data[field] for field in updatable_fields if field in data}
+            if not changes:
+                # Nothing to change: a no-op assignment still lets the trigger bump last_modified_date
+                changes['is_active'] = CandidateSkills.is_active
             
-            skill.last_modified_date = datetime.utcnow()
+            # Single UPDATE ... RETURNING instead of SELECT then UPDATE
+            skill_row = db.session.execute(
+                update(CandidateSkills).where(*conditions).values(**changes).returning(*_SKILL_COLUMNS)
+            ).first()
+            if skill_row is None:
+                if len(conditions) > 1 and db.session.get(CandidateSkills, skill_id) is not None:
+                    skills_ns.abort(400, 'Career history does not belong to the specified candidate')
+                skills_ns.abort(404, 'Skill not found')
             db.session.commit()
+            invalidate_skills_cache()
             
-            return skill.to_dict(), 200
+            return _skill_row_to_dict(skill_row), 200
             
         except Exception as e:
             db.session.rollback()
@@ -172,12 +331,17 @@ class Skill(Resource):
     def delete(self, skill_id):
         """Delete a skill (soft delete)"""
         try:
-            skill = CandidateSkills.query.get_or_404(skill_id)
-            
-            # Soft delete
-            skill.is_active = False
-            skill.last_modified_date = datetime.utcnow()
+            # Soft delete in a single UPDATE ... RETURNING round-trip
+            deleted_id = db.session.execute(
+                update(CandidateSkills)
+                .where(CandidateSkills.id == skill_id)
+                .values(is_active=False)
+                .returning(CandidateSkills.id)
+            ).scalar()
+            if deleted_id is None:
+                skills_ns.abort(404, 'Skill not found')
             db.session.commit()
+            invalidate_skills_cache()
             
             return {'message': 'Skill deleted successfully'}, 200
             
@@ -192,10 +356,14 @@ class SkillHardDelete(Resource):
     def delete(self, skill_id):
         """Permanently delete a skill"""
         try:
-            skill = CandidateSkills.query.get_or_404(skill_id)
-            
-            db.session.delete(skill)
+            # Single DELETE ... RETURNING instead of loading the row first
+            deleted_id = db.session.execute(
+                delete(CandidateSkills).where(CandidateSkills.id == skill_id).returning(CandidateSkills.id)
+            ).scalar()
+            if deleted_id is None:
+                skills_ns.abort(404, 'Skill not found')
             db.session.commit()
+            invalidate_skills_cache()
             
             return {'message': 'Skill permanently deleted'}, 200
             
@@ -203,29 +371,55 @@ class SkillHardDelete(Resource):
             db.session.rollback()
             skills_ns.abort(500, str(e))
 
+@skills_ns.route('/popular')
+class PopularSkills(Resource):
+    @skills_ns.doc('get_popular_skills')
+    @skills_ns.param('limit', 'Number of skills to return', type=int, default=20)
+    def get(self):
+        """Get the most common skills across active skill records"""
+        try:
+            limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+            
+            return {
+                'skills': _get_popular_skills(limit, skills_cache_generation()),
+                'limit': limit
+            }, 200
+            
+        except Exception as e:
+            skills_ns.abort(500, str(e))
+
 @skills_ns.route('/candidate/<int:candidate_id>')
 @skills_ns.param('candidate_id', 'Candidate ID')
 class CandidateSkillsList(Resource):
     @skills_ns.doc('get_candidate_skills')
     @skills_ns.param('is_active', 'Filter by active status', type=bool)
+    @cache.cached(timeout=_SKILLS_LIST_TTL, key_prefix=_skills_list_cache_key)
     def get(self, candidate_id):
         """Get all skills for a specific candidate"""
         try:
-            # Verify candidate exists
-            candidate = CandidateMasterProfile.query.get_or_404(candidate_id)
-            
             is_active = request.args.get('is_active', type=bool)
             
-            query = CandidateSkills.query.filter(CandidateSkills.candidate_id == candidate_id)
-            
+            # One round-trip: the candidate row outer-joined to its skills doubles as the existence check
+            join_condition = CandidateSkills.candidate_id == CandidateMasterProfile.id
             if is_active is not None:
-                query = query.filter(CandidateSkills.is_active == is_active)
+                join_condition = and_(join_condition, CandidateSkills.is_active == is_active)
+            query = (
+                select(*_SKILL_COLUMNS)
+                .select_from(CandidateMasterProfile)
+                .outerjoin(CandidateSkills, join_condition)
+                .where(CandidateMasterProfile.id == candidate_id)
+            )
+            
+            rows = db.session.execute(query).all()
+            if not rows:
+                skills_ns.abort(404, 'Candidate not found')
             
-            skills = query.all()
+            # A candidate without matching skills yields a single row of NULLs
+            skills = [_skill_row_to_dict(row) for row in rows if row.id is not None]
             
             return {
                 'candidate_id': candidate_id,
-                'skills': [skill.to_dict() for skill in skills],
+                'skills': skills,
                 'total': len(skills)
             }, 200
             
@@ -0,0 +1,12 @@
+"""
+Development server entry point: python run.py
+
+The batch resume parser's process pool uses the spawn start method, and spawned processes re-import
+the launching script. Started from app.py, every parse process would build a second copy of the
+Flask app with its engine, services and executors; this script only imports the app when run
+directly, so those processes import nothing beyond the resume parser.
+"""
+
+if __name__ == '__main__':
+    from app import run_development_server
+    run_development_server()
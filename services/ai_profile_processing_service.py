@@ -0,0 +1,84 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+from database import db
+from models import CandidateMasterProfile
+from services.ai_summary_service import ai_summary_service, apply_ai_processing_result
+
+# Load environment variables
+load_dotenv()
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Relationship lists of CandidateMasterProfile.to_dict(include_relationships=True) filtered to active rows
+PROFILE_RELATIONSHIP_KEYS = ('career_history', 'skills', 'education', 'licenses_certifications', 'languages', 'resumes')
+
+def filter_active_relationships(candidate_dict):
+    """Drop inactive items from a candidate dict's relationship lists (in place) before AI processing"""
+    for relationship_key in PROFILE_RELATIONSHIP_KEYS:
+        if relationship_key in candidate_dict:
+            candidate_dict[relationship_key] = [
+                item for item in candidate_dict[relationship_key]
+                if item.get('is_active', True)
+            ]
+    return candidate_dict
+
+class AIProfileProcessingService:
+    """
+    Runs AI summary + embedding generation for single candidate profiles off the request thread.
+    The result is written straight to candidate_master_profile, so clients poll the candidate itself.
+    """
+
+    def __init__(self):
+        """Initialize the AI profile processing service"""
+        self.max_workers = int(os.getenv('AI_PROFILE_PROCESSING_WORKERS', 2))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ai-profile')
+
+        # Store Flask app reference for context management
+        self.app = None
+
+        logger.info(f"AI Profile Processing Service initialized with {self.max_workers} workers")
+
+    def set_app(self, app):
+        """Set the Flask app instance for database operations"""
+        self.app = app
+        logger.info("Flask app context set for AI profile processing service")
+
+    def submit(self, candidate_id: int):
+        """Queue AI summary and embedding generation for a candidate"""
+        if not self.app:
+            raise Exception("Flask app not set. Call set_app() before submitting profiles.")
+        self.executor.submit(self._process_profile, candidate_id)
+
+    def _process_profile(self, candidate_id: int):
+        """Generate and store the AI summary and embedding for one candidate"""
+        with self.app.app_context():
+            try:
+                candidate = db.session.get(CandidateMasterProfile, candidate_id)
+                if candidate is None:
+                    logger.warning(f"Candidate {candidate_id} no longer exists; skipping AI processing")
+                    return
+
+                candidate_dict = filter_active_relationships(candidate.to_dict(include_relationships=True))
+                result = asyncio.run(
+                    ai_summary_service.process_candidate_profile(candidate_dict, candidate.ai_summary_hash)
+                )
+                if not result.get('processing_success'):
+                    logger.error(f"AI processing failed for candidate {candidate_id}: {result.get('error')}")
+                    return
+
+                apply_ai_processing_result(candidate, result)
+                candidate.last_modified_date = datetime.utcnow()
+                db.session.commit()
+                logger.info(f"AI summary and embedding saved for candidate {candidate_id}")
+
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"AI processing error for candidate {candidate_id}: {str(e)}")
+
+# Global instance
+ai_profile_processing_service = AIProfileProcessingService()
@@ -1,15 +1,127 @@
 import os
 import asyncio
+import hashlib
+import itertools
+import re
+import threading
+import time
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from langchain_core.prompts import PromptTemplate
 from langchain_core.documents import Document
 import json
+import logging
+import httpx
 
 # Load environment variables
 load_dotenv()
 
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Dimension of text-embedding-3-small vectors (and of the zero-vector fallback)
+EMBEDDING_DIMENSIONS = 1536
+
+# Texts sent per embeddings request when embedding several summaries at once
+EMBEDDING_BATCH_SIZE = int(os.getenv('AI_EMBEDDING_BATCH_SIZE', 64))
+# Embeddings requests allowed in flight at the same time
+EMBEDDING_MAX_CONCURRENT_BATCHES = 4
+
+# Connection pool and timeout shared by the Azure OpenAI chat and embeddings clients
+AI_HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+AI_HTTP_MAX_CONNECTIONS = 64
+AI_HTTP_TIMEOUT_SECONDS = float(os.getenv('AI_HTTP_TIMEOUT_SECONDS', 60))
+
+# Seconds the active prompt template is reused before it is read from the database again
+PROMPT_TEMPLATE_CACHE_TTL = int(os.getenv('AI_PROMPT_TEMPLATE_CACHE_TTL', 60))
+
+# Embed the stored summary concurrently with regeneration (costs an extra embeddings call when the summary changes)
+AI_SPECULATIVE_EMBEDDING = os.getenv('AI_SPECULATIVE_EMBEDDING', 'false').lower() == 'true'
+
+# Generated summaries are cut after this many words
+SUMMARY_WORD_LIMIT = 200
+_WORD_PATTERN = re.compile(r'\S+')
+
+# (label, candidate key) pairs listed under BASIC INFORMATION after the candidate's name
+_BASIC_INFO_FIELDS = (
+    ('Email', 'email'),
+    ('Phone', 'phone_number'),
+    ('Location', 'location'),
+    ('Personal Summary', 'personal_summary'),
+    ('Salary Expectation', 'salary_expectation'),
+    ('Availability (weeks)', 'availability_weeks'),
+    ('Preferred Work Types', 'preferred_work_types'),
+    ('Right to Work', 'right_to_work'),
+    ('Classification Interest', 'classification_of_interest'),
+    ('Sub-classification Interest', 'sub_classification_of_interest')
+)
+
+# Used when no prompt template is active (or the lookup fails); built once since it never changes
+_FALLBACK_PROMPT_TEMPLATE = PromptTemplate(
+    input_variables=["candidate_profile_data"],
+    template="""
+            You are an AI assistant specializing in creating professional candidate profile summaries for recruitment purposes.
+            
+            Given the candidate profile data below, create a concise professional summary in exactly 200 words or less following this format:
+            
+            "[X] years of experience in [position] in [domain field].
+            Graduated from [university/education].
+            Strengths: [key skills and strengths]
+            Looking for: [salary expectation and work preferences]
+            Open to work status: [availability and notice period]
+            Other remarks: [additional relevant information]"
+            
+            Candidate Profile Data:
+            {candidate_profile_data}
+            
+            Please ensure the summary is:
+            - Professional and concise
+            - Highlights key qualifications and experience
+            - Includes relevant education background
+            - Mentions salary expectations if available
+            - Notes work availability and preferences
+            - Under 200 words total
+            
+            Summary:"""
+)
+
+def summary_hash(summary: str) -> str:
+    """SHA-256 hex digest of an AI summary, stored as candidate_master_profile.ai_summary_hash"""
+    return hashlib.sha256(summary.encode('utf-8')).hexdigest()
+
+def summary_prompt_hash(prompt: str) -> str:
+    """SHA-256 hex digest of a summary prompt, stored as candidate_master_profile.ai_summary_source_hash"""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def ai_processing_values(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    CandidateMasterProfile column values for a successful process_candidate_profile result.
+    The embedding columns are left out when the result reports the summary as unchanged.
+    """
+    values = {'ai_short_summary': result['ai_summary']}
+    if not result.get('embedding_unchanged'):
+        embedding_vector = result['embedding_vector']
+        values['embedding_vector'] = embedding_vector
+        # A zero-vector fallback (failed embedding call) must not be reused for this summary later
+        values['ai_summary_hash'] = result.get('ai_summary_hash') if embedding_vector and any(embedding_vector) else None
+    return values
+
+def apply_ai_processing_result(candidate, result: Dict[str, Any]):
+    """
+    Copy a successful process_candidate_profile result onto a CandidateMasterProfile (caller commits).
+    The stored embedding is kept when the result reports the summary as unchanged.
+    """
+    for column, value in ai_processing_values(result).items():
+        setattr(candidate, column, value)
+
+# Section headers of the formatted candidate profile sent to the LLM
+_PROFILE_HEADER = "CANDIDATE PROFILE:\n\n"
+_BASIC_INFORMATION_HEADER = "BASIC INFORMATION:\n"
+_CAREER_HISTORY_HEADER = "\nCAREER HISTORY:\n"
+_EDUCATION_HEADER = "\nEDUCATION:\n"
+_CERTIFICATIONS_HEADER = "\nCERTIFICATIONS & LICENSES:\n"
+
 class CandidateAISummaryService:
     """
     Service for generating AI summaries and embeddings for candidate profiles
@@ -18,6 +130,10 @@ class CandidateAISummaryService:
     
     def __init__(self):
         """Initialize the AI service with Azure OpenAI configurations"""
+        # (expires_at, PromptTemplate) for the active template; see get_active_prompt_template
+        self._prompt_template_cache = None
+        self._prompt_template_lock = threading.Lock()
+        
         try:
             # Check for required environment variables
             required_env_vars = ['AZURE_OPENAI_ENDPOINT', 'AZURE_OPENAI_API_KEY']
@@ -26,41 +142,117 @@ class CandidateAISummaryService:
             if missing_vars:
                 raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
             
-            print("Initializing Azure OpenAI LLM...")
+            # One keep-alive pool per process shared by the chat and embeddings clients (same Azure host),
+            # so bursts of calls reuse TCP/TLS connections instead of handshaking per request
+            http_limits = httpx.Limits(
+                max_keepalive_connections=AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=AI_HTTP_MAX_CONNECTIONS
+            )
+            http_timeout = httpx.Timeout(AI_HTTP_TIMEOUT_SECONDS)
+            self.http_client = httpx.Client(limits=http_limits, timeout=http_timeout)
+            self.http_async_client = httpx.AsyncClient(limits=http_limits, timeout=http_timeout)
+            
+            # Async connections belong to the event loop that opened them, while callers run on many
+            # loops (per request, per job, the bulk service's loop). So the async client is only used
+            # on this service's own long-lived loop, which every async API call is handed to; see
+            # _on_service_loop
+            self._loop = None
+            self._loop_lock = threading.Lock()
+            
+            logger.debug("Initializing Azure OpenAI LLM")
             self.llm = AzureChatOpenAI(
                 azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
                 api_version=os.getenv('AZURE_API_VERSION', '2024-02-15-preview'),
                 azure_deployment=os.getenv('AZURE_OPENAI_DEPLOYMENT_NAME', 'gpt-4o-mini'),
                 api_key=os.getenv('AZURE_OPENAI_API_KEY'),
                 temperature=0.3,
-                max_tokens=300
+                max_tokens=300,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client
             )
-            print("LLM initialized successfully")
+            logger.debug("LLM initialized successfully")
             
-            print("Initializing Azure OpenAI Embeddings...")
+            logger.debug("Initializing Azure OpenAI Embeddings")
             self.embeddings = AzureOpenAIEmbeddings(
                 azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
                 api_version=os.getenv('AZURE_API_VERSION', '2024-02-15-preview'),
                 azure_deployment=os.getenv('AZURE_OPENAI_EMBEDDING_DEPLOYMENT', 'text-embedding-3-small'),
                 api_key=os.getenv('AZURE_OPENAI_API_KEY'),
-                dimensions=1536  # Standard dimension for text-embedding-3-small
+                dimensions=EMBEDDING_DIMENSIONS,  # Standard dimension for text-embedding-3-small
+                http_client=self.http_client,
+                http_async_client=self.http_async_client
             )
-            print("Embeddings initialized successfully")
+            logger.debug("Embeddings initialized successfully")
             
         except Exception as init_error:
-            print(f"Failed to initialize AI service: {str(init_error)}")
+            logger.error("Failed to initialize AI service: %s", init_error)
             raise init_error
         
         # Note: Prompt templates are now managed in the database
         # This service will fetch the active template from AiPromptTemplate model
     
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the service's event loop, starting its thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._run_loop, args=(self._loop,), name='ai-summary-loop', daemon=True
+                ).start()
+            return self._loop
+    
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+        loop.close()
+    
+    async def _on_service_loop(self, coro):
+        """Await an Azure OpenAI call on the service's loop, whichever loop the caller is running on"""
+        loop = self._get_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+    
+    def shutdown(self):
+        """Close the async connection pool and stop the service's event loop"""
+        with self._loop_lock:
+            if self._loop is not None:
+                asyncio.run_coroutine_threadsafe(self.http_async_client.aclose(), self._loop).result()
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+    
     def get_active_prompt_template(self):
         """
-        Get the active prompt template from the database
+        Get the active prompt template, cached for PROMPT_TEMPLATE_CACHE_TTL seconds
         
         Returns:
             PromptTemplate: LangChain PromptTemplate object
         """
+        cached = self._prompt_template_cache
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        with self._prompt_template_lock:
+            cached = self._prompt_template_cache
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            prompt_template, cacheable = self._load_active_prompt_template()
+            if cacheable:
+                self._prompt_template_cache = (time.monotonic() + PROMPT_TEMPLATE_CACHE_TTL, prompt_template)
+            return prompt_template
+    
+    def clear_prompt_template_cache(self):
+        """Drop the cached active prompt template after a template is created, edited or activated"""
+        self._prompt_template_cache = None
+    
+    def _load_active_prompt_template(self):
+        """
+        Get the active prompt template from the database
+        
+        Returns:
+            tuple: (PromptTemplate, whether it may be cached; False when the lookup itself failed)
+        """
         try:
             # Import here to avoid circular imports
             from models import AiPromptTemplate
@@ -69,72 +261,17 @@ class CandidateAISummaryService:
             
             if not active_template:
                 # Fallback to a detailed template if no active template found
-                fallback_template = """
-            You are an AI assistant specializing in creating professional candidate profile summaries for recruitment purposes.
-            
-            Given the candidate profile data below, create a concise professional summary in exactly 200 words or less following this format:
-            
-            "[X] years of experience in [position] in [domain field].
-            Graduated from [university/education].
-            Strengths: [key skills and strengths]
-            Looking for: [salary expectation and work preferences]
-            Open to work status: [availability and notice period]
-            Other remarks: [additional relevant information]"
-            
-            Candidate Profile Data:
-            {candidate_profile_data}
-            
-            Please ensure the summary is:
-            - Professional and concise
-            - Highlights key qualifications and experience
-            - Includes relevant education background
-            - Mentions salary expectations if available
-            - Notes work availability and preferences
-            - Under 200 words total
-            
-            Summary:"""
-                print("Warning: No active prompt template found, using fallback template")
-                return PromptTemplate(
-                    input_variables=["candidate_profile_data"],
-                    template=fallback_template
-                )
+                logger.warning("No active prompt template found, using fallback template")
+                return _FALLBACK_PROMPT_TEMPLATE, True
             
             return PromptTemplate(
                 input_variables=["candidate_profile_data"],
                 template=active_template.template_content
-            )
+            ), True
             
         except Exception as e:
-            print(f"Error fetching active prompt template: {str(e)}")
-            # Fallback template
-            fallback_template = """
-            You are an AI assistant specializing in creating professional candidate profile summaries for recruitment purposes.
-            
-            Given the candidate profile data below, create a concise professional summary in exactly 200 words or less following this format:
-            
-            "[X] years of experience in [position] in [domain field].
-            Graduated from [university/education].
-            Strengths: [key skills and strengths]
-            Looking for: [salary expectation and work preferences]
-            Open to work status: [availability and notice period]
-            Other remarks: [additional relevant information]"
-            
-            Candidate Profile Data:
-            {candidate_profile_data}
-            
-            Please ensure the summary is:
-            - Professional and concise
-            - Highlights key qualifications and experience
-            - Includes relevant education background
-            - Mentions salary expectations if available
-            - Notes work availability and preferences
-            - Under 200 words total
-            
-            Summary:"""
-            return PromptTemplate(
-                input_variables=["candidate_profile_data"],
-                template=fallback_template
-            )
+            logger.error("Error fetching active prompt template: %s", e)
+            return _FALLBACK_PROMPT_TEMPLATE, False
     
     def format_candidate_data(self, candidate_dict: Dict[str, Any]) -> str:
         """
@@ -147,136 +284,147 @@ class CandidateAISummaryService:
             str: Formatted candidate data string
         """
         try:
+            get = candidate_dict.get
+            
             # Extract basic information
-            basic_info = {
-                'Name': f"{candidate_dict.get('first_name', '')} {candidate_dict.get('last_name', '')}".strip(),
-                'Email': candidate_dict.get('email', ''),
-                'Phone': candidate_dict.get('phone_number', ''),
-                'Location': candidate_dict.get('location', ''),
-                'Personal Summary': candidate_dict.get('personal_summary', ''),
-                'Salary Expectation': candidate_dict.get('salary_expectation', ''),
-                'Availability (weeks)': candidate_dict.get('availability_weeks', ''),
-                'Preferred Work Types': candidate_dict.get('preferred_work_types', ''),
-                'Right to Work': candidate_dict.get('right_to_work', ''),
-                'Classification Interest': candidate_dict.get('classification_of_interest', ''),
-                'Sub-classification Interest': candidate_dict.get('sub_classification_of_interest', '')
-            }
+            name = f"{get('first_name', '')} {get('last_name', '')}".strip()
+            basic_info = [f"Name: {name}\n"] if name else []
+            for label, key in _BASIC_INFO_FIELDS:
+                value = get(key, '')
+                if value:
+                    basic_info.append(f"{label}: {value}\n")
             
             # Format career history
             career_history = []
-            for career in candidate_dict.get('career_history', []):
-                if career.get('is_active', True):  # Only include active records
-                    career_str = f"- {career.get('job_title', '')} at {career.get('company_name', '')}"
-                    if career.get('start_date'):
-                        career_str += f" ({career.get('start_date')} to {career.get('end_date', 'Present')})"
-                    if career.get('description'):
-                        career_str += f": {career.get('description')}"
-                    career_history.append(career_str)
+            for career in get('career_history', []):
+                g = career.get
+                if g('is_active', True):  # Only include active records
+                    career_parts = [f"- {g('job_title', '')} at {g('company_name', '')}"]
+                    if g('start_date'):
+                        career_parts.append(f" ({g('start_date')} to {g('end_date', 'Present')})")
+                    if g('description'):
+                        career_parts.append(f": {g('description')}")
+                    career_history.append(''.join(career_parts))
             
             # Format education
             education = []
-            for edu in candidate_dict.get('education', []):
-                if edu.get('is_active', True):
-                    edu_str = f"- {edu.get('degree', '')} in {edu.get('field_of_study', '')} from {edu.get('school', '')}"
-                    if edu.get('start_date') or edu.get('end_date'):
-                        edu_str += f" ({edu.get('start_date', '')} - {edu.get('end_date', '')})"
-                    if edu.get('grade'):
-                        edu_str += f", Grade: {edu.get('grade')}"
-                    education.append(edu_str)
+            for edu in get('education', []):
+                g = edu.get
+                if g('is_active', True):
+                    edu_parts = [f"- {g('degree', '')} in {g('field_of_study', '')} from {g('school', '')}"]
+                    if g('start_date') or g('end_date'):
+                        edu_parts.append(f" ({g('start_date', '')} - {g('end_date', '')})")
+                    if g('grade'):
+                        edu_parts.append(f", Grade: {g('grade')}")
+                    education.append(''.join(edu_parts))
             
             # Format skills
-            skills = [skill.get('skills', '') for skill in candidate_dict.get('skills', []) 
-                     if skill.get('is_active', True) and skill.get('skills')]
+            skills = [skill['skills'] for skill in get('skills', [])
+                      if skill.get('is_active', True) and skill.get('skills')]
             
             # Format languages
             languages = []
-            for lang in candidate_dict.get('languages', []):
-                if lang.get('is_active', True):
-                    lang_str = f"{lang.get('language', '')}"
-                    if lang.get('proficiency_level'):
-                        lang_str += f" ({lang.get('proficiency_level')})"
-                    languages.append(lang_str)
+            for lang in get('languages', []):
+                g = lang.get
+                if g('is_active', True):
+                    if g('proficiency_level'):
+                        languages.append(f"{g('language', '')} ({g('proficiency_level')})")
+                    else:
+                        languages.append(f"{g('language', '')}")
             
             # Format certifications
             certifications = []
-            for cert in candidate_dict.get('licenses_certifications', []):
-                if cert.get('is_active', True):
-                    cert_str = f"- {cert.get('name', '')}"
-                    if cert.get('issuing_organization'):
-                        cert_str += f" from {cert.get('issuing_organization')}"
-                    if cert.get('issue_date'):
-                        cert_str += f" ({cert.get('issue_date')})"
-                    certifications.append(cert_str)
-            
-            # Compile formatted data
-            formatted_data = "CANDIDATE PROFILE:\n\n"
+            for cert in get('licenses_certifications', []):
+                g = cert.get
+                if g('is_active', True):
+                    cert_parts = [f"- {g('name', '')}"]
+                    if g('issuing_organization'):
+                        cert_parts.append(f" from {g('issuing_organization')}")
+                    if g('issue_date'):
+                        cert_parts.append(f" ({g('issue_date')})")
+                    certifications.append(''.join(cert_parts))
+            
+            # Compile formatted data as a list of parts joined once at the end
+            parts = [_PROFILE_HEADER]
             
             # Basic Information
-            formatted_data += "BASIC INFORMATION:\n"
-            for key, value in basic_info.items():
-                if value:
-                    formatted_data += f"{key}: {value}\n"
+            parts.append(_BASIC_INFORMATION_HEADER)
+            parts.extend(basic_info)
             
             # Career History
             if career_history:
-                formatted_data += "\nCAREER HISTORY:\n"
-                formatted_data += "\n".join(career_history) + "\n"
+                parts.append(_CAREER_HISTORY_HEADER)
+                parts.append("\n".join(career_history))
+                parts.append("\n")
             
             # Education
             if education:
-                formatted_data += "\nEDUCATION:\n"
-                formatted_data += "\n".join(education) + "\n"
+                parts.append(_EDUCATION_HEADER)
+                parts.append("\n".join(education))
+                parts.append("\n")
             
             # Skills
             if skills:
-                formatted_data += f"\nSKILLS:\n{', '.join(skills)}\n"
+                parts.append(f"\nSKILLS:\n{', '.join(skills)}\n")
             
             # Languages
             if languages:
-                formatted_data += f"\nLANGUAGES:\n{', '.join(languages)}\n"
+                parts.append(f"\nLANGUAGES:\n{', '.join(languages)}\n")
             
             # Certifications
             if certifications:
-                formatted_data += "\nCERTIFICATIONS & LICENSES:\n"
-                formatted_data += "\n".join(certifications) + "\n"
+                parts.append(_CERTIFICATIONS_HEADER)
+                parts.append("\n".join(certifications))
+                parts.append("\n")
             
+            formatted_data = "".join(parts)
             return formatted_data
             
         except Exception as e:
-            print(f"Error formatting candidate data: {str(e)}")
+            logger.error("Error formatting candidate data: %s", e)
             return str(candidate_dict)  # Fallback to string representation
     
-    async def generate_ai_summary(self, candidate_dict: Dict[str, Any]) -> str:
+    def build_summary_prompt(self, candidate_dict: Dict[str, Any]) -> str:
+        """
+        Build the LLM prompt for a candidate profile from the active prompt template
+        
+        Args:
+            candidate_dict (Dict): Complete candidate profile with relationships
+            
+        Returns:
+            str: Prompt text
+        """
+        # Format the candidate data
+        formatted_data = self.format_candidate_data(candidate_dict)
+        logger.debug("Formatted data length: %d characters", len(formatted_data))
+        
+        # Get the active prompt template from database
+        prompt_template = self.get_active_prompt_template()
+        
+        # Create the prompt
+        prompt = prompt_template.format(candidate_profile_data=formatted_data)
+        logger.debug("Prompt created, length: %d characters", len(prompt))
+        return prompt
+    
+    async def generate_ai_summary(self, candidate_dict: Dict[str, Any], prompt: Optional[str] = None,
+                                  fallback_on_error: bool = True) -> str:
         """
         Generate AI summary for a candidate profile
         
         Args:
             candidate_dict (Dict): Complete candidate profile with relationships
+            prompt (str, optional): Prompt already built with build_summary_prompt
+            fallback_on_error (bool): Return a generic summary when generation fails; raise when False
             
         Returns:
             str: Generated AI summary
         """
         try:
-            print("Starting AI summary generation...")
-            
-            # Format the candidate data
-            print("Formatting candidate data...")
-            formatted_data = self.format_candidate_data(candidate_dict)
-            print(f"Formatted data length: {len(formatted_data)} characters")
-            
-            # Get the active prompt template from database
-            print("Fetching active prompt template...")
-            prompt_template = self.get_active_prompt_template()
-            
-            # Create the prompt
-            print("Creating prompt from template...")
-            prompt = prompt_template.format(candidate_profile_data=formatted_data)
-            print(f"Prompt created, length: {len(prompt)} characters")
+            if prompt is None:
+                prompt = self.build_summary_prompt(candidate_dict)
             
             # Generate summary using LangChain
-            print("Calling Azure OpenAI LLM...")
-            response = await self.llm.ainvoke(prompt)
-            print(f"LLM response received: {type(response)}")
+            response = await self._on_service_loop(self.llm.ainvoke(prompt))
             
             # Extract content from response
             if hasattr(response, 'content'):
@@ -284,26 +432,38 @@ class CandidateAISummaryService:
             else:
                 summary = str(response).strip()
             
-            print(f"Generated summary length: {len(summary)} characters")
+            logger.debug("Generated summary length: %d characters", len(summary))
             
-            # Ensure summary is within word limit (approximately)
-            words = summary.split()
-            if len(words) > 200:
-                summary = ' '.join(words[:200]) + '...'
-                print(f"Summary truncated to 200 words")
+            # Ensure summary is within word limit (approximately); max_tokens already bounds it, so
+            # only scan as far as word 201 and cut after word 200, keeping the original line breaks
+            words = _WORD_PATTERN.finditer(summary)
+            last_kept = next(itertools.islice(words, SUMMARY_WORD_LIMIT - 1, None), None)
+            if last_kept is not None and next(words, None) is not None:
+                summary = summary[:last_kept.end()] + '...'
+                logger.debug("Summary truncated to %d words", SUMMARY_WORD_LIMIT)
             
             return summary
             
         except Exception as e:
-            import traceback
-            error_traceback = traceback.format_exc()
-            print(f"Error generating AI summary: {str(e)}")
-            print(f"AI summary error traceback: {error_traceback}")
-            # Return a basic fallback summary
-            name = f"{candidate_dict.get('first_name', '')} {candidate_dict.get('last_name', '')}".strip()
-            fallback_summary = f"Professional candidate {name} with experience in {candidate_dict.get('classification_of_interest', 'various fields')}. See full profile for detailed information."
-            print(f"Returning fallback summary: {fallback_summary}")
-            return fallback_summary
+            logger.exception("Error generating AI summary: %s", e)
+            if not fallback_on_error:
+                raise
+            logger.warning("Returning fallback summary")
+            return self._fallback_summary(candidate_dict)
+    
+    @staticmethod
+    def _fallback_summary(candidate_dict: Dict[str, Any]) -> str:
+        """Basic summary used when the LLM call fails"""
+        name = f"{candidate_dict.get('first_name', '')} {candidate_dict.get('last_name', '')}".strip()
+        return f"Professional candidate {name} with experience in {candidate_dict.get('classification_of_interest', 'various fields')}. See full profile for detailed information."
+    
+    async def _generate_summary_or_fallback(self, candidate_dict: Dict[str, Any]):
+        """generate_ai_summary, also returning whether the LLM call failed and the fallback was used"""
+        try:
+            return await self.generate_ai_summary(candidate_dict, fallback_on_error=False), False
+        except Exception:
+            logger.warning("Returning fallback summary")
+            return self._fallback_summary(candidate_dict), True
     
     async def generate_embedding(self, text: str) -> List[float]:
         """
@@ -316,48 +476,149 @@ class CandidateAISummaryService:
             List[float]: Embedding vector
         """
         try:
-            print(f"Starting embedding generation for text length: {len(text)}")
+            logger.debug("Starting embedding generation for text length: %d", len(text))
             
             # Generate embedding using LangChain
-            print("Calling Azure OpenAI Embeddings...")
-            embedding = await self.embeddings.aembed_query(text)
-            print(f"Embedding generated successfully, dimension: {len(embedding)}")
+            embedding = await self._on_service_loop(self.embeddings.aembed_query(text))
+            logger.debug("Embedding generated, dimension: %d", len(embedding))
             return embedding
             
         except Exception as e:
-            import traceback
-            error_traceback = traceback.format_exc()
-            print(f"Error generating embedding: {str(e)}")
-            print(f"Embedding error traceback: {error_traceback}")
+            logger.exception("Error generating embedding: %s", e)
             # Return zero vector as fallback
-            print("Returning zero vector as fallback")
-            return [0.0] * 1536
+            logger.warning("Returning zero vector as fallback")
+            return [0.0] * EMBEDDING_DIMENSIONS
+    
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embedding vectors for many texts, EMBEDDING_BATCH_SIZE texts per HTTP request
+        
+        Args:
+            texts (List[str]): Texts to generate embeddings for
+            
+        Returns:
+            List[List[float]]: Embedding vectors in the same order as texts
+        """
+        if not texts:
+            return []
+        
+        semaphore = asyncio.Semaphore(EMBEDDING_MAX_CONCURRENT_BATCHES)
+        
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                try:
+                    return await self._on_service_loop(self.embeddings.aembed_documents(batch))
+                except Exception as e:
+                    logger.error("Error generating embeddings for a batch of %d texts: %s", len(batch), e)
+                    # Same zero-vector fallback as generate_embedding
+                    return [[0.0] * EMBEDDING_DIMENSIONS for _ in batch]
+        
+        batches = [texts[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)]
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return [vector for batch_vectors in results for vector in batch_vectors]
     
-    async def process_candidate_profile(self, candidate_dict: Dict[str, Any]) -> Dict[str, Any]:
+    async def process_candidate_profiles(self, candidate_dicts: List[Dict[str, Any]],
+                                         max_concurrent_summaries: int = 5) -> List[Dict[str, Any]]:
+        """
+        Generate AI summaries for several profiles, then embed all summaries in batched requests
+        
+        Args:
+            candidate_dicts (List[Dict]): Complete candidate profiles with relationships
+            max_concurrent_summaries (int): LLM calls allowed in flight at the same time
+            
+        Returns:
+            List[Dict]: One process_candidate_profile-style result per input, in order
+        """
+        semaphore = asyncio.Semaphore(max_concurrent_summaries)
+        
+        async def summarize(candidate_dict: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self.generate_ai_summary(candidate_dict)
+        
+        summaries = await asyncio.gather(
+            *(summarize(candidate_dict) for candidate_dict in candidate_dicts),
+            return_exceptions=True
+        )
+        
+        # Only successful summaries are embedded; failures keep their position with an error result
+        embedded_indexes = [i for i, summary in enumerate(summaries) if not isinstance(summary, BaseException)]
+        vectors = await self.generate_embeddings([summaries[i] for i in embedded_indexes])
+        vector_by_index = dict(zip(embedded_indexes, vectors))
+        
+        results = []
+        for i, summary in enumerate(summaries):
+            if isinstance(summary, BaseException):
+                results.append({
+                    'ai_summary': None,
+                    'embedding_vector': None,
+                    'processing_success': False,
+                    'error': str(summary)
+                })
+            else:
+                results.append({
+                    'ai_summary': summary,
+                    'ai_summary_hash': summary_hash(summary),
+                    'embedding_vector': vector_by_index[i],
+                    'processing_success': True
+                })
+        return results
+    
+    async def process_candidate_profile(self, candidate_dict: Dict[str, Any],
+                                        stored_summary_hash: Optional[str] = None) -> Dict[str, Any]:
         """
         Complete processing: generate AI summary and embedding
         
         Args:
             candidate_dict (Dict): Complete candidate profile with relationships
+            stored_summary_hash (str, optional): ai_summary_hash of the stored embedding; when the new
+                summary hashes the same, the embedding call is skipped and 'embedding_unchanged' is set
             
         Returns:
-            Dict: Contains 'ai_summary' and 'embedding_vector'
+            Dict: Contains 'ai_summary', 'ai_summary_hash' and 'embedding_vector'; 'used_fallback' is set
+                when a failed API call (e.g. throttling) was replaced by the fallback summary or zero vector
         """
         try:
-            # Generate AI summary
-            ai_summary = await self.generate_ai_summary(candidate_dict)
-            
-            # Generate embedding from the AI summary
-            embedding_vector = await self.generate_embedding(ai_summary)
+            prior_summary = candidate_dict.get('ai_short_summary')
+            if AI_SPECULATIVE_EMBEDDING and prior_summary and not stored_summary_hash:
+                # Embed the stored summary while the new one is generated; the vector is only
+                # used when the regenerated summary comes back identical
+                (ai_summary, used_fallback), prior_embedding = await asyncio.gather(
+                    self._generate_summary_or_fallback(candidate_dict),
+                    self.generate_embedding(prior_summary)
+                )
+                if ai_summary == prior_summary:
+                    embedding_vector = prior_embedding
+                else:
+                    embedding_vector = await self.generate_embedding(ai_summary)
+            else:
+                # Generate AI summary
+                ai_summary, used_fallback = await self._generate_summary_or_fallback(candidate_dict)
+                
+                # An identical summary already has its embedding stored
+                if stored_summary_hash and summary_hash(ai_summary) == stored_summary_hash:
+                    logger.debug("Summary unchanged, skipping embedding generation")
+                    return {
+                        'ai_summary': ai_summary,
+                        'ai_summary_hash': stored_summary_hash,
+                        'embedding_vector': None,
+                        'embedding_unchanged': True,
+                        'used_fallback': used_fallback,
+                        'processing_success': True
+                    }
+                
+                # Generate embedding from the AI summary
+                embedding_vector = await self.generate_embedding(ai_summary)
             
             return {
                 'ai_summary': ai_summary,
+                'ai_summary_hash': summary_hash(ai_summary),
                 'embedding_vector': embedding_vector,
+                'used_fallback': used_fallback or not any(embedding_vector),
                 'processing_success': True
             }
             
         except Exception as e:
-            print(f"Error processing candidate profile: {str(e)}")
+            logger.error("Error processing candidate profile: %s", e)
             return {
                 'ai_summary': None,
                 'embedding_vector': None,
@@ -1,20 +1,28 @@
+import io
+import itertools
+import multiprocessing
 import os
 import threading
 import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime, date
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
+from sqlalchemy import insert
 from database import db
+from cache import invalidate_skills_cache
 from models import (
     CandidateMasterProfile, CandidateCareerHistory, CandidateSkills,
     CandidateEducation, CandidateLicensesCertifications, CandidateLanguages,
     CandidateResume, BatchJobStatus, BatchJobFailedFile
 )
-from services.resume_parser import get_resume_parser
-from services.ai_summary_service import ai_summary_service
+from services.resume_parser import get_resume_parser, parse_resume_files
+from services.ai_summary_service import ai_summary_service, ai_processing_values
 from services.candidate_classification_service import candidate_classification_service
+from services.rate_limiter import TokenBucket, AdaptiveConcurrencyLimiter
+from pdf_storage import encode_pdf
 import json
 import asyncio
 from flask import current_app
@@ -28,6 +36,35 @@ load_dotenv()
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Date formats accepted for parsed resume dates, grouped by the separator that must be present.
+# Within each group the order is the precedence used for ambiguous values (e.g. 01/02/2020 is month-first).
+_ISO_DATE_FORMATS = ('%Y-%m-%d', '%Y-%m')
+_SLASH_DATE_FORMATS = ('%m/%d/%Y', '%d/%m/%Y')
+_MONTH_NAME_DATE_FORMATS = ('%B %Y', '%b %Y')
+_ALL_DATE_FORMATS = _ISO_DATE_FORMATS + ('%Y',) + _SLASH_DATE_FORMATS + _MONTH_NAME_DATE_FORMATS
+
+def _candidate_date_formats(date_string: str):
+    """Pick the date formats that could match date_string, so most values parse on the first strptime call"""
+    if '-' in date_string:
+        return _ISO_DATE_FORMATS
+    if '/' in date_string:
+        return _SLASH_DATE_FORMATS
+    if any(char.isalpha() for char in date_string):
+        return _MONTH_NAME_DATE_FORMATS
+    return _ALL_DATE_FORMATS
+
+# Finished jobs kept in the in-process active_jobs map (job state itself lives in batch_job_status)
+MAX_TRACKED_JOBS = 100
+
+# Relationship key (as in CandidateMasterProfile.to_dict) -> model for rows built from parsed resumes
+RELATED_MODELS = (
+    ('career_history', CandidateCareerHistory),
+    ('skills', CandidateSkills),
+    ('education', CandidateEducation),
+    ('licenses_certifications', CandidateLicensesCertifications),
+    ('languages', CandidateLanguages)
+)
+
 class BatchResumeParserService:
     """
     Service for batch parsing of resumes and creating candidate profiles in parallel
@@ -40,9 +77,38 @@ class BatchResumeParserService:
         self.max_concurrent_workers = int(os.getenv('AI_BULK_MAX_CONCURRENT_WORKERS', 5))
         self.rate_limit_delay = float(os.getenv('AI_BULK_RATE_LIMIT_DELAY_SECONDS', 1.0))
         
-        # Job tracking
-        self.active_jobs = {}
-        self.job_counter = 0
+        # Shared by all jobs: caps AI API calls at one per rate_limit_delay on average (bursts up to worker count)
+        self.rate_limiter = TokenBucket.from_delay(self.rate_limit_delay, capacity=self.max_concurrent_workers)
+        
+        # How many workers may be inside AI calls at once; backs off when the API slows down or errors
+        self.ai_concurrency = AdaptiveConcurrencyLimiter(max_limit=self.max_concurrent_workers)
+        
+        # Parsed profiles written per INSERT ... RETURNING chunk (and per transaction)
+        self.insert_chunk_size = int(os.getenv('BATCH_RESUME_INSERT_CHUNK_SIZE', 50))
+        
+        # Files above this size are spooled to a temp file instead of being parsed from memory
+        self.temp_file_threshold = int(os.getenv('BATCH_RESUME_TEMP_FILE_THRESHOLD_BYTES', 20 * 1024 * 1024))
+        
+        # Worker processes for CPU-bound (spaCy) resume parsing; created on first use. 0 parses in the worker threads.
+        self.parse_processes = int(os.getenv('BATCH_RESUME_PARSE_PROCESSES', os.cpu_count() or 1))
+        self._parse_pool = None
+        # Files handed to a parsing process per task
+        self.parse_batch_size = max(1, int(os.getenv('BATCH_RESUME_PARSE_BATCH_SIZE', 8)))
+        self._parse_pool_lock = threading.Lock()
+        
+        # Job tracking: job_id -> status for jobs started by this process, oldest first.
+        # Guarded by _jobs_lock since requests and job threads update it concurrently.
+        self.active_jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._job_counter = itertools.count(1)
+        
+        # Thread pool shared by all jobs in this process for blocking work (thread-side parsing and
+        # database writes). Threads start on first use (after set_app), each with its own app context
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_workers,
+            thread_name_prefix='batch-parse',
+            initializer=self._init_worker
+        )
         
         # Store Flask app reference for context management
         self.app = None
@@ -74,9 +140,9 @@ class BatchResumeParserService:
         with self.app.app_context():
             # Generate unique job ID and batch metadata
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            self.job_counter += 1
-            job_id = f"batch_parse_{timestamp}_{self.job_counter}"
-            batch_number = f"BATCH_{timestamp}_{self.job_counter}"
+            job_number = next(self._job_counter)
+            job_id = f"batch_parse_{timestamp}_{job_number}"
+            batch_number = f"BATCH_{timestamp}_{job_number}"
             
             # Create database record for the job
             job_record = BatchJobStatus.create_new_job(
@@ -87,6 +153,7 @@ class BatchResumeParserService:
             )
             
             logger.info(f"Created database record for batch job {job_id} with {len(validated_files)} files")
+            self._track_job(job_id, 'queued')
             
             # Start processing in background thread
             thread = threading.Thread(
@@ -99,6 +166,22 @@ class BatchResumeParserService:
             logger.info(f"Started batch parsing job {job_id} with {len(validated_files)} files")
             return job_id
     
+    def _track_job(self, job_id: str, status: str):
+        """Record a job's status in active_jobs, evicting the oldest finished jobs beyond MAX_TRACKED_JOBS"""
+        with self._jobs_lock:
+            self.active_jobs[job_id] = status
+            finished_job_ids = [
+                tracked_job_id for tracked_job_id, tracked_status in self.active_jobs.items()
+                if tracked_status not in ('queued', 'processing')
+            ]
+            for tracked_job_id in finished_job_ids[:max(0, len(finished_job_ids) - MAX_TRACKED_JOBS)]:
+                del self.active_jobs[tracked_job_id]
+    
+    def get_tracked_jobs(self) -> Dict[str, str]:
+        """Snapshot of active_jobs (job_id -> status) taken under the lock"""
+        with self._jobs_lock:
+            return dict(self.active_jobs)
+    
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get the status of a batch parsing job from database"""
         try:
@@ -176,6 +259,7 @@ class BatchResumeParserService:
                 
                 logger.info(f"Starting batch resume parsing job: {job_id}")
                 job_record.update_status('processing')
+                self._track_job(job_id, 'processing')
                 
                 # Process files with rate limiting
                 self._process_files_with_rate_limiting(job_id, validated_files)
@@ -184,6 +268,7 @@ class BatchResumeParserService:
                 fresh_job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
                 if fresh_job_record:
                     fresh_job_record.update_status('completed', progress_percentage=100.0)
+                    self._track_job(job_id, 'completed')
                     
                     logger.info(f"Batch parsing job {job_id} completed:")
                     logger.info(f"  Total files: {fresh_job_record.total_files}")
@@ -203,6 +288,7 @@ class BatchResumeParserService:
                         error_msg = f"Batch parsing job failed: {str(e)}"
                         fresh_job_record.add_error(error_msg)
                         fresh_job_record.update_status('failed')
+                        self._track_job(job_id, 'failed')
                         logger.error(f"ERROR in batch parsing job {job_id}: {error_msg}")
                 except Exception as db_error:
                     logger.error(f"Failed to update job status in database: {str(db_error)}")
@@ -210,142 +296,295 @@ class BatchResumeParserService:
     
     def _process_files_with_rate_limiting(self, job_id: str, validated_files: List[Dict[str, Any]]):
         """
-        Process resume files using ThreadPoolExecutor with rate limiting and database persistence
+        Process resume files concurrently with rate limiting and database persistence
         """
         start_time = time.time()
         
         # Get job details from database
-        with self.app.app_context():
-            job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
-            if not job_record:
-                logger.error(f"Job {job_id} not found in database")
-                return
-            batch_number = job_record.batch_number
-            batch_upload_datetime = job_record.batch_upload_datetime
-        
-        # Create temporary files from validated file data
-        temp_files = []
-        for file_data in validated_files:
+        job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
+        if not job_record:
+            logger.error(f"Job {job_id} not found in database")
+            return
+        batch_number = job_record.batch_number
+        batch_upload_datetime = job_record.batch_upload_datetime
+        
+        # Keep uploaded bytes in memory; only oversized files go through a temp file
+        file_infos = [self._prepare_file_info(file_data) for file_data in validated_files]
+        
+        # Resolve the parser once for the whole job and share it with every worker
+        parser = get_resume_parser()
+        
+        # spaCy parsing is CPU-bound and serialised by the GIL in threads, so run it in worker processes.
+        # All files are submitted up front in groups of parse_batch_size (one task and one round of
+        # pickling per group); each file's coroutine awaits its group's result and continues with the AI calls.
+        # Azure DI / LangExtract parsing is remote I/O and stays in the worker threads.
+        if parser.parsing_method == 'spacy' and self.parse_processes > 0:
+            parse_pool = self._get_parse_pool()
+            for start in range(0, len(file_infos), self.parse_batch_size):
+                parse_group = file_infos[start:start + self.parse_batch_size]
+                parse_future = parse_pool.submit(
+                    parse_resume_files,
+                    [(file_info.get('content'), file_info.get('temp_path')) for file_info in parse_group]
+                )
+                for parse_index, file_info in enumerate(parse_group):
+                    file_info['parse_future'] = parse_future
+                    file_info['parse_index'] = parse_index
+        
+        # Drive the whole job from one event loop: the AI calls are network I/O, so they run as
+        # coroutines; thread-side parsing and the database writes go to the service's worker pool
+        asyncio.run(self._process_files_async(job_id, file_infos, batch_number, batch_upload_datetime, parser))
+        
+        processing_time = time.time() - start_time
+        # Get fresh job record from database for final update
+        fresh_job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
+        if fresh_job_record:
+            fresh_job_record.processing_time_seconds = round(processing_time, 2)
+            db.session.commit()
+        
+        logger.info(f"Batch processing completed in {processing_time:.2f} seconds")
+    
+    async def _process_files_async(self, job_id: str, file_infos: List[Dict[str, Any]],
+                                   batch_number: str, batch_upload_datetime: str, parser):
+        """
+        Process a job's files with at most max_concurrent_workers in flight, recording results
+        as they complete; parsed profiles are buffered and written insert_chunk_size at a time
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_workers)
+        
+        async def process_bounded(file_info):
+            async with semaphore:
+                try:
+                    outcome = await self._process_single_resume(
+                        job_id, file_info, batch_number, batch_upload_datetime, parser
+                    )
+                    return file_info, outcome, None
+                except Exception as e:
+                    return file_info, None, e
+        
+        tasks = [asyncio.ensure_future(process_bounded(file_info)) for file_info in file_infos]
+        pending = []
+        for next_completed in asyncio.as_completed(tasks):
+            file_info, outcome, error = await next_completed
+            
+            if error is not None:
+                await self._run_db_task(self._record_processing_error, job_id, file_info, error)
+                self._cleanup_temp_file(file_info)
+                continue
+            
+            result, payload = outcome
+            if payload is None:
+                await self._run_db_task(self._record_results, job_id, [(file_info, result)])
+                self._cleanup_temp_file(file_info)
+                continue
+            
+            pending.append((result, payload))
+            if len(pending) >= self.insert_chunk_size:
+                await self._run_db_task(self._flush_candidate_chunk, job_id, pending)
+                pending = []
+        
+        if pending:
+            await self._run_db_task(self._flush_candidate_chunk, job_id, pending)
+    
+    async def _run_db_task(self, func, *args):
+        """
+        Run blocking database work on a worker pool thread (which holds an app context) so the
+        event loop keeps serving AI calls; the thread's session is ended afterwards
+        """
+        def run():
+            try:
+                return func(*args)
+            finally:
+                db.session.remove()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, run)
+    
+    def _parse_in_thread(self, parser, file_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse a resume on a worker pool thread (parsers not run in the process pool)"""
+        with self._open_resume_file(file_info) as resume_file:
+            return parser.parse_resume(resume_file)
+    
+    def _init_worker(self):
+        """ThreadPoolExecutor initializer: push one Flask app context for the worker thread's lifetime"""
+        self.app.app_context().push()
+    
+    def shutdown(self):
+        """Stop the worker and parsing pools, waiting for queued work"""
+        self.executor.shutdown(wait=True)
+        with self._parse_pool_lock:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown(wait=True)
+                self._parse_pool = None
+        logger.info("Batch resume parser pools shut down")
+    
+    async def _run_ai_tasks(self, parsed_data: Dict[str, Any], candidate_dict: Dict[str, Any]):
+        """
+        Classify the candidate and generate the AI summary/embedding concurrently
+
+        Returns:
+            Tuple of (classification result, AI processing result); either may be the raised exception
+        """
+        return await asyncio.gather(
+            candidate_classification_service.classify_candidate(parsed_data),
+            ai_summary_service.process_candidate_profile(candidate_dict),
+            return_exceptions=True
+        )
+    
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """
+        Create the resume parsing process pool on first use (spawned, so no DB connections or threads are forked).
+        Spawned processes re-import the launching script: fine under Gunicorn and run.py, but started
+        with python app.py each one would rebuild the whole app.
+        """
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_processes,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                logger.info(f"Started resume parsing process pool with {self.parse_processes} processes")
+            return self._parse_pool
+    
+    def _prepare_file_info(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the per-file work item from validated upload data.
+        PDFs are parsed straight from their in-memory bytes; files above
+        temp_file_threshold are spooled to disk so workers don't pin them in memory.
+        """
+        file_info = {
+            'original_filename': file_data['filename'],
+            'file_size': file_data['size']
+        }
+        if file_data['size'] > self.temp_file_threshold:
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
             temp_file.write(file_data['content'])
             temp_file.close()
-            temp_files.append({
-                'temp_path': temp_file.name,
-                'original_filename': file_data['filename'],
-                'file_size': file_data['size']
-            })
-        
-        # Use ThreadPoolExecutor for controlled concurrency
-        with ThreadPoolExecutor(max_workers=self.max_concurrent_workers) as executor:
-            # Submit all tasks
-            future_to_file = {}
-            for file_info in temp_files:
-                future = executor.submit(
-                    self._process_single_resume, 
-                    job_id, file_info, batch_number, batch_upload_datetime
-                )
-                future_to_file[future] = file_info
+            file_info['temp_path'] = temp_file.name
+        else:
+            file_info['content'] = file_data['content']
+        return file_info
+    
+    def _open_resume_file(self, file_info: Dict[str, Any]):
+        """Return a readable binary file object for a work item"""
+        if 'temp_path' in file_info:
+            return open(file_info['temp_path'], 'rb')
+        return io.BytesIO(file_info['content'])
+    
+    def _flush_candidate_chunk(self, job_id: str, pending: List[tuple]):
+        """
+        Write a chunk of parsed profiles, store their PDFs and record the outcomes on the job.
+        If the chunk insert fails (e.g. a duplicate email), each profile is retried on its own
+        so only the offending files are marked failed.
+        """
+        payloads = [payload for _, payload in pending]
+        try:
+            candidate_ids = self._insert_candidate_chunk(payloads)
+        except Exception as chunk_error:
+            db.session.rollback()
+            logger.warning(f"Inserting {len(payloads)} candidates as one chunk failed, retrying individually: {str(chunk_error)}")
+            candidate_ids = []
+            for result, payload in pending:
+                try:
+                    candidate_ids.extend(self._insert_candidate_chunk([payload]))
+                except Exception as db_error:
+                    db.session.rollback()
+                    candidate_ids.append(None)
+                    result['errors'].append(f"Database creation failed: {str(db_error)}")
+                    result['error_type'] = 'database_error'
+                    result['failure_stage'] = 'creation'
+        
+        file_results = []
+        for (result, payload), candidate_id in zip(pending, candidate_ids):
+            file_info = payload['file_info']
+            if candidate_id is not None:
+                # Store the original PDF file in its own transaction, off the candidate commit
+                self._store_resume_pdf(candidate_id, file_info)
+                
+                result['status'] = 'success'
+                result['candidate_id'] = candidate_id
+                logger.info(f"Successfully created candidate {candidate_id} from {file_info['original_filename']} (Status: {result['profile_status']})")
+            
+            self._cleanup_temp_file(file_info)
+            file_results.append((file_info, result))
+        
+        self._record_results(job_id, file_results)
+    
+    def _record_results(self, job_id: str, file_results: List[tuple]):
+        """Add finished files' results and counters to the job record"""
+        # Get fresh job record from database
+        fresh_job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
+        if not fresh_job_record:
+            logger.error(f"Job {job_id} not found during update")
+            return
+        
+        fresh_job_record.add_results([result for _, result in file_results])
+        for file_info, result in file_results:
+            fresh_job_record.processed_files += 1
             
-            # Process completed tasks with rate limiting
-            for future in as_completed(future_to_file):
-                file_info = future_to_file[future]
+            if result['status'] == 'success':
+                fresh_job_record.successful_profiles += 1
+                if result['profile_status'] == 'completed':
+                    fresh_job_record.completed_profiles += 1
+                else:
+                    fresh_job_record.incomplete_profiles += 1
                 
-                try:
-                    result = future.result()
-                    
-                    # Update job record in database - fetch fresh instance each time
-                    with self.app.app_context():
-                        # Get fresh job record from database
-                        fresh_job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
-                        if not fresh_job_record:
-                            logger.error(f"Job {job_id} not found during update")
-                            continue
-                        
-                        fresh_job_record.processed_files += 1
-                        fresh_job_record.add_result(result)
-                        
-                        if result['status'] == 'success':
-                            fresh_job_record.successful_profiles += 1
-                            if result['profile_status'] == 'completed':
-                                fresh_job_record.completed_profiles += 1
-                            else:
-                                fresh_job_record.incomplete_profiles += 1
-                            
-                            # Track AI summary statistics
-                            if result.get('ai_summary_generated', False):
-                                fresh_job_record.ai_summaries_generated += 1
-                            else:
-                                fresh_job_record.ai_summaries_failed += 1
-                            
-                            # Track AI classification statistics
-                            if result.get('classification_generated', False):
-                                fresh_job_record.classifications_generated += 1
-                            else:
-                                fresh_job_record.classifications_failed += 1
-                        else:
-                            fresh_job_record.failed_files += 1
-                            
-                            # Create failed file record for detailed tracking
-                            self._create_failed_file_record(
-                                fresh_job_record.id, file_info, result
-                            )
-                        
-                        # Update progress
-                        progress = (fresh_job_record.processed_files / fresh_job_record.total_files) * 100
-                        fresh_job_record.progress_percentage = round(progress, 1)
-                        db.session.commit()
-                        
-                        logger.info(f"Processed file {file_info['original_filename']}: {result['status']}")
-                    
-                except Exception as e:
-                    error_msg = f"Error processing {file_info['original_filename']}: {str(e)}"
-                    
-                    with self.app.app_context():
-                        # Get fresh job record from database
-                        fresh_job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
-                        if fresh_job_record:
-                            fresh_job_record.add_error(error_msg)
-                            fresh_job_record.failed_files += 1
-                            fresh_job_record.processed_files += 1
-                            
-                            # Create failed file record
-                            self._create_failed_file_record(
-                                fresh_job_record.id, file_info, {
-                                    'status': 'failed',
-                                    'errors': [str(e)],
-                                    'failure_stage': 'processing',
-                                    'error_type': 'processing_error'
-                                }
-                            )
-                            
-                            # Update progress
-                            progress = (fresh_job_record.processed_files / fresh_job_record.total_files) * 100
-                            fresh_job_record.progress_percentage = round(progress, 1)
-                            db.session.commit()
-                        
-                        logger.error(error_msg)
+                # Track AI summary statistics
+                if result.get('ai_summary_generated', False):
+                    fresh_job_record.ai_summaries_generated += 1
+                else:
+                    fresh_job_record.ai_summaries_failed += 1
                 
-                # Clean up temp file
-                try:
-                    os.unlink(file_info['temp_path'])
-                except:
-                    pass
+                # Track AI classification statistics
+                if result.get('classification_generated', False):
+                    fresh_job_record.classifications_generated += 1
+                else:
+                    fresh_job_record.classifications_failed += 1
+            else:
+                fresh_job_record.failed_files += 1
                 
-                # Apply rate limiting delay
-                time.sleep(self.rate_limit_delay)
+                # Create failed file record for detailed tracking
+                self._create_failed_file_record(
+                    fresh_job_record.id, file_info, result
+                )
+            
+            logger.info(f"Processed file {file_info['original_filename']}: {result['status']}")
         
-        processing_time = time.time() - start_time
-        with self.app.app_context():
-            # Get fresh job record from database for final update
-            fresh_job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
-            if fresh_job_record:
-                fresh_job_record.processing_time_seconds = round(processing_time, 2)
-                db.session.commit()
+        # One commit for the whole set; progress is derived from processed_files when read
+        db.session.commit()
+    
+    def _record_processing_error(self, job_id: str, file_info: Dict[str, Any], error: Exception):
+        """Record a file whose worker raised instead of returning a result"""
+        error_msg = f"Error processing {file_info['original_filename']}: {str(error)}"
+        
+        # Get fresh job record from database
+        fresh_job_record = BatchJobStatus.query.filter_by(job_id=job_id).first()
+        if fresh_job_record:
+            fresh_job_record.failed_files += 1
+            fresh_job_record.processed_files += 1
             
-        logger.info(f"Batch processing completed in {processing_time:.2f} seconds")
+            # Create failed file record
+            self._create_failed_file_record(
+                fresh_job_record.id, file_info, {
+                    'status': 'failed',
+                    'errors': [str(error)],
+                    'failure_stage': 'processing',
+                    'error_type': 'processing_error'
+                }
+            )
+            
+            # add_error commits the counters and failed file record too
+            fresh_job_record.add_error(error_msg)
+        
+        logger.error(error_msg)
+    
+    def _cleanup_temp_file(self, file_info: Dict[str, Any]):
+        """Remove a file's temp copy (large files only)"""
+        if 'temp_path' in file_info:
+            try:
+                os.unlink(file_info['temp_path'])
+            except:
+                pass
     
     def _create_failed_file_record(self, batch_job_id: int, file_info: Dict[str, Any], result: Dict[str, Any]):
-        """Create a detailed failed file record for tracking"""
+        """Create a detailed failed file record for tracking (committed with the job record update)"""
         try:
             failed_file = BatchJobFailedFile(
                 batch_job_id=batch_job_id,
@@ -358,18 +597,17 @@ class BatchResumeParserService:
                 attempted_at=datetime.utcnow()
             )
             db.session.add(failed_file)
-            db.session.commit()
             logger.info(f"Created failed file record for {file_info['original_filename']}")
         except Exception as e:
             logger.error(f"Failed to create failed file record: {str(e)}")
     
-    def _process_single_resume(self, job_id: str, file_info: Dict[str, Any], 
-                              batch_number: str, batch_upload_datetime: str) -> Dict[str, Any]:
+    async def _process_single_resume(self, job_id: str, file_info: Dict[str, Any], 
+                                     batch_number: str, batch_upload_datetime: str, parser) -> tuple:
         """
-        Process a single resume file and create candidate profile
+        Parse a single resume file and run AI processing; makes no database writes
         
         Returns:
-            Dict containing processing result and metadata
+            Tuple of (processing result dict, insert payload or None if the file failed)
         """
         result = {
             'filename': file_info['original_filename'],
@@ -381,314 +619,347 @@ class BatchResumeParserService:
             'parsing_method': None
         }
         
-        # Ensure we have Flask application context for database operations
-        # This is critical when running in separate threads
+        # Ensure we have a Flask app (the job thread running this coroutine holds its context)
         if not self.app:
             error_msg = "Flask app not set for worker thread"
             result['errors'].append(error_msg)
             logger.error(f"ERROR in worker thread: {error_msg}")
-            return result
+            return result, None
         
-        with self.app.app_context():
+        try:
+            # Parse the resume with the job's shared parser
+            result['parsing_method'] = parser.parsing_method
+            
             try:
-                # Parse the resume
-                parser = get_resume_parser()
-                result['parsing_method'] = parser.parsing_method
-                
-                try:
-                    with open(file_info['temp_path'], 'rb') as temp_file:
-                        parsed_data = parser.parse_resume(temp_file)
-                except Exception as parse_error:
-                    result['errors'].append(f"Resume parsing failed: {str(parse_error)}")
-                    result['error_type'] = 'parsing_error'
-                    result['failure_stage'] = 'parsing'
-                    return result
-                
-                # Check mandatory fields and fill with empty strings if missing
-                mandatory_fields = ['first_name', 'last_name', 'email']
-                missing_fields = []
-                
-                for field in mandatory_fields:
-                    if not parsed_data.get(field):
-                        parsed_data[field] = ""  # Fill with empty string
-                        missing_fields.append(field)
-                
-                # Determine profile status
-                profile_status = 'completed' if not missing_fields else 'incomplete'
-                result['profile_status'] = profile_status
-                
-                # Create metadata for tracking
-                metadata = {
-                    'batch_upload': True,
-                    'batch_number': batch_number,
-                    'batch_upload_datetime': batch_upload_datetime,
-                    'profile_status': profile_status,
-                    'missing_mandatory_fields': missing_fields,
-                    'parsing_method': parser.parsing_method,
-                    'original_filename': file_info['original_filename'],
-                    'file_size': file_info['file_size'],
-                    'processed_at': datetime.utcnow().isoformat()
-                }
-                
-                # Add metadata to parsed data
-                parsed_data['metadata_json'] = metadata
-                
-                # Perform AI classification for industry and role tags
-                try:
-                    logger.info(f"Starting AI classification for candidate")
-                    
-                    # Run AI classification in async context
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        classification_result = loop.run_until_complete(
-                            candidate_classification_service.classify_candidate(parsed_data)
-                        )
-                    finally:
-                        loop.close()
-                        asyncio.set_event_loop(None)
-                    
-                    if classification_result.get('classification_success'):
-                        # Update parsed data with AI classification
-                        if classification_result.get('classification_of_interest'):
-                            parsed_data['classification_of_interest'] = classification_result['classification_of_interest']
-                        if classification_result.get('sub_classification_of_interest'):
-                            parsed_data['sub_classification_of_interest'] = classification_result['sub_classification_of_interest']
-                        
-                        result['classification_generated'] = True
-                        result['classification_reasoning'] = classification_result.get('reasoning', '')
-                        logger.info(f"AI classification successful: {classification_result['classification_of_interest']} | {classification_result['sub_classification_of_interest']}")
-                    else:
-                        result['classification_generated'] = False
-                        result['classification_error'] = classification_result.get('error', 'Unknown error')
-                        logger.warning(f"AI classification failed: {classification_result.get('error')}")
-                        
-                except Exception as classification_error:
-                    result['classification_generated'] = False
-                    result['classification_error'] = str(classification_error)
-                    logger.warning(f"AI classification failed: {str(classification_error)}")
-                    # Don't fail the whole process if classification fails
-                
-                # Create candidate profile
-                try:
-                    candidate = CandidateMasterProfile(
-                        first_name=parsed_data.get('first_name', ''),
-                        last_name=parsed_data.get('last_name', ''),
-                        chinese_name=parsed_data.get('chinese_name'),
-                        email=parsed_data.get('email', ''),
-                        location=parsed_data.get('location'),
-                        phone_number=parsed_data.get('phone_number'),
-                        personal_summary=parsed_data.get('personal_summary'),
-                        availability_weeks=parsed_data.get('availability_weeks'),
-                        preferred_work_types=parsed_data.get('preferred_work_types'),
-                        right_to_work=parsed_data.get('right_to_work', False),
-                        salary_expectation=parsed_data.get('salary_expectation'),
-                        classification_of_interest=parsed_data.get('classification_of_interest'),
-                        sub_classification_of_interest=parsed_data.get('sub_classification_of_interest'),
-                        citizenship=parsed_data.get('citizenship'),
-                        is_active=True,
-                        remarks=f"Created via batch upload - Batch: {batch_number}",
-                        metadata_json=metadata
+                if 'parse_future' in file_info:
+                    parse_results = await asyncio.wrap_future(file_info['parse_future'])
+                    parsed_data = parse_results[file_info['parse_index']]
+                    if isinstance(parsed_data, Exception):
+                        raise parsed_data
+                else:
+                    parsed_data = await asyncio.get_running_loop().run_in_executor(
+                        self.executor, self._parse_in_thread, parser, file_info
                     )
-                    
-                    db.session.add(candidate)
-                    db.session.flush()  # Get the candidate ID
-                    
-                    # Create related records following the same pattern as create-from-parsed-data endpoint
-                    self._create_related_records(candidate.id, parsed_data, metadata)
-                    
-                    # Store the original PDF file
-                    try:
-                        with open(file_info['temp_path'], 'rb') as temp_file:
-                            pdf_content = temp_file.read()
-                        
-                        resume_record = CandidateResume(
-                            candidate_id=candidate.id,
-                            pdf_data=pdf_content,
-                            file_name=file_info['original_filename'],
-                            file_size=file_info['file_size'],
-                            content_type='application/pdf',
-                            is_active=True
-                        )
-                        db.session.add(resume_record)
-                    except Exception as resume_error:
-                        logger.warning(f"Could not store PDF data for candidate {candidate.id}: {resume_error}")
-                        # Don't fail the whole process if we can't store the PDF
-                    
-                    db.session.commit()
-                    
-                except Exception as db_error:
-                    db.session.rollback()
-                    result['errors'].append(f"Database creation failed: {str(db_error)}")
-                    result['error_type'] = 'database_error'
-                    result['failure_stage'] = 'creation'
-                    return result
-                
-                # Generate AI summary and embedding
+            except Exception as parse_error:
+                result['errors'].append(f"Resume parsing failed: {str(parse_error)}")
+                result['error_type'] = 'parsing_error'
+                result['failure_stage'] = 'parsing'
+                return result, None
+            
+            # Check mandatory fields and fill with empty strings if missing
+            mandatory_fields = ['first_name', 'last_name', 'email']
+            missing_fields = []
+            
+            for field in mandatory_fields:
+                if not parsed_data.get(field):
+                    parsed_data[field] = ""  # Fill with empty string
+                    missing_fields.append(field)
+            
+            # Determine profile status
+            profile_status = 'completed' if not missing_fields else 'incomplete'
+            result['profile_status'] = profile_status
+            
+            # Create metadata for tracking
+            metadata = {
+                'batch_upload': True,
+                'batch_number': batch_number,
+                'batch_upload_datetime': batch_upload_datetime,
+                'profile_status': profile_status,
+                'missing_mandatory_fields': missing_fields,
+                'parsing_method': parser.parsing_method,
+                'original_filename': file_info['original_filename'],
+                'file_size': file_info['file_size'],
+                'processed_at': datetime.utcnow().isoformat()
+            }
+            
+            # Add metadata to parsed data
+            parsed_data['metadata_json'] = metadata
+            
+            # Build candidate profile and related rows in memory as plain column dicts
+            # (every row has the same keys, as the chunked multi-row insert requires)
+            candidate_row = {
+                'first_name': parsed_data.get('first_name', ''),
+                'last_name': parsed_data.get('last_name', ''),
+                'chinese_name': parsed_data.get('chinese_name'),
+                'email': parsed_data.get('email', ''),
+                'location': parsed_data.get('location'),
+                'phone_number': parsed_data.get('phone_number'),
+                'personal_summary': parsed_data.get('personal_summary'),
+                'availability_weeks': parsed_data.get('availability_weeks'),
+                'preferred_work_types': parsed_data.get('preferred_work_types'),
+                'right_to_work': parsed_data.get('right_to_work', False),
+                'salary_expectation': parsed_data.get('salary_expectation'),
+                'classification_of_interest': parsed_data.get('classification_of_interest'),
+                'sub_classification_of_interest': parsed_data.get('sub_classification_of_interest'),
+                'citizenship': parsed_data.get('citizenship'),
+                'is_active': True,
+                'remarks': f"Created via batch upload - Batch: {batch_number}",
+                'metadata_json': metadata,
+                'ai_short_summary': None,
+                'embedding_vector': None,
+                'ai_summary_hash': None
+            }
+            related_rows = self._build_related_rows(parsed_data)
+            
+            # AI classification and AI summary/embedding are independent LLM calls, so run them
+            # concurrently; both finish before the insert so the profile is written in one transaction
+            logger.info(f"Starting AI classification and AI processing for {file_info['original_filename']}")
+            try:
+                candidate_with_relationships = self._build_ai_profile_dict(candidate_row, related_rows)
+            except Exception as build_error:
+                classification_result = ai_processing_result = build_error
+            else:
+                # One rate-limit token per AI call, then a slot under the adaptive concurrency limit
+                await self.rate_limiter.acquire_async()
+                await self.rate_limiter.acquire_async()
+                started_at = await self.ai_concurrency.acquire_async()
+                ai_calls_succeeded = False
                 try:
-                    logger.info(f"Starting AI processing for candidate {candidate.id}")
-                    
-                    # Get complete candidate data with relationships
-                    candidate_with_relationships = candidate.to_dict(include_relationships=True)
-                    
-                    # Run AI processing in async context
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        ai_processing_result = loop.run_until_complete(
-                            ai_summary_service.process_candidate_profile(candidate_with_relationships)
-                        )
-                    finally:
-                        loop.close()
-                        asyncio.set_event_loop(None)
-                    
-                    if ai_processing_result and ai_processing_result.get('processing_success'):
-                        # Update candidate with AI summary and embedding
-                        candidate.ai_short_summary = ai_processing_result['ai_summary']
-                        candidate.embedding_vector = ai_processing_result['embedding_vector']
-                        candidate.last_modified_date = datetime.utcnow()
-                        db.session.commit()
-                        
-                        result['ai_summary_generated'] = True
-                        logger.info(f"AI summary and embedding generated successfully for candidate {candidate.id}")
-                    else:
-                        result['ai_summary_generated'] = False
-                        result['ai_summary_error'] = ai_processing_result.get('error', 'Unknown error')
-                        logger.warning(f"AI processing failed for candidate {candidate.id}: {ai_processing_result.get('error')}")
-                        
-                except Exception as ai_error:
-                    result['ai_summary_generated'] = False
-                    result['ai_summary_error'] = str(ai_error)
-                    result['error_type'] = 'ai_processing_error'
-                    result['failure_stage'] = 'ai_processing'
-                    logger.warning(f"AI processing failed for candidate {candidate.id}: {str(ai_error)}")
-                    # Don't fail the whole process if AI processing fails
-                
-                result['status'] = 'success'
-                result['candidate_id'] = candidate.id
+                    classification_result, ai_processing_result = await self._run_ai_tasks(
+                        parsed_data, candidate_with_relationships
+                    )
+                    # The AI services turn API errors (including 429s) into fallback results rather than
+                    # raising, so those count as failures too for the limiter to back off
+                    ai_calls_succeeded = (
+                        not isinstance(classification_result, BaseException)
+                        and not classification_result.get('api_error')
+                        and not isinstance(ai_processing_result, BaseException)
+                        and ai_processing_result.get('processing_success', False)
+                        and not ai_processing_result.get('used_fallback')
+                    )
+                finally:
+                    self.ai_concurrency.release(started_at, ai_calls_succeeded)
+            
+            # Apply AI classification for industry and role tags
+            if isinstance(classification_result, BaseException):
+                result['classification_generated'] = False
+                result['classification_error'] = str(classification_result)
+                logger.warning(f"AI classification failed: {str(classification_result)}")
+                # Don't fail the whole process if classification fails
+            elif classification_result.get('classification_success'):
+                # Update candidate with AI classification
+                if classification_result.get('classification_of_interest'):
+                    candidate_row['classification_of_interest'] = classification_result['classification_of_interest']
+                if classification_result.get('sub_classification_of_interest'):
+                    candidate_row['sub_classification_of_interest'] = classification_result['sub_classification_of_interest']
                 
-                logger.info(f"Successfully created candidate {candidate.id} from {file_info['original_filename']} (Status: {profile_status})")
+                result['classification_generated'] = True
+                result['classification_reasoning'] = classification_result.get('reasoning', '')
+                logger.info(f"AI classification successful: {classification_result['classification_of_interest']} | {classification_result['sub_classification_of_interest']}")
+            else:
+                result['classification_generated'] = False
+                result['classification_error'] = classification_result.get('error', 'Unknown error')
+                logger.warning(f"AI classification failed: {classification_result.get('error')}")
+            
+            # Apply AI summary and embedding
+            if isinstance(ai_processing_result, BaseException):
+                result['ai_summary_generated'] = False
+                result['ai_summary_error'] = str(ai_processing_result)
+                result['error_type'] = 'ai_processing_error'
+                result['failure_stage'] = 'ai_processing'
+                logger.warning(f"AI processing failed for {file_info['original_filename']}: {str(ai_processing_result)}")
+                # Don't fail the whole process if AI processing fails
+            elif ai_processing_result and ai_processing_result.get('processing_success'):
+                # Set AI summary and embedding on the candidate before it is inserted
+                candidate_row.update(ai_processing_values(ai_processing_result))
                 
-            except Exception as e:
-                db.session.rollback()
-                error_msg = f"Failed to process {file_info['original_filename']}: {str(e)}"
-                result['errors'].append(error_msg)
-                result['error_type'] = 'general_error'
-                result['failure_stage'] = 'general_processing'
-                logger.error(error_msg)
-        
-        return result
+                result['ai_summary_generated'] = True
+                logger.info(f"AI summary and embedding generated successfully for {file_info['original_filename']}")
+            else:
+                result['ai_summary_generated'] = False
+                result['ai_summary_error'] = ai_processing_result.get('error', 'Unknown error')
+                logger.warning(f"AI processing failed for {file_info['original_filename']}: {ai_processing_result.get('error')}")
+            
+            # Hand the profile back for the job's chunked insert (see _flush_candidate_chunk)
+            payload = {
+                'candidate_row': candidate_row,
+                'related_rows': related_rows,
+                'file_info': file_info
+            }
+            return result, payload
+            
+        except Exception as e:
+            error_msg = f"Failed to process {file_info['original_filename']}: {str(e)}"
+            result['errors'].append(error_msg)
+            result['error_type'] = 'general_error'
+            result['failure_stage'] = 'general_processing'
+            logger.error(error_msg)
+        
+        return result, None
+    
+    def _store_resume_pdf(self, candidate_id: int, file_info: Dict[str, Any]):
+        """
+        Insert the candidate's original PDF (compressed via pdf_storage) as a separate transaction,
+        so the multi-megabyte row never holds up the candidate commit.
+        Failures are logged only; the profile is kept without a stored resume.
+        """
+        try:
+            if 'content' in file_info:
+                pdf_content = file_info['content']
+            else:
+                with open(file_info['temp_path'], 'rb') as temp_file:
+                    pdf_content = temp_file.read()
+            
+            stored_pdf_data, pdf_data_encoding = encode_pdf(pdf_content)
+            db.session.execute(
+                insert(CandidateResume).values(
+                    candidate_id=candidate_id,
+                    pdf_data=stored_pdf_data,
+                    pdf_data_encoding=pdf_data_encoding,
+                    file_name=file_info['original_filename'],
+                    file_size=file_info['file_size'],
+                    content_type='application/pdf',
+                    is_active=True
+                )
+            )
+            db.session.commit()
+        except Exception as resume_error:
+            db.session.rollback()
+            logger.warning(f"Could not store PDF data for candidate {candidate_id}: {resume_error}")
+            # Don't fail the whole process if we can't store the PDF
     
-    def _create_related_records(self, candidate_id: int, parsed_data: Dict[str, Any], metadata: Dict[str, Any]):
-        """Create related records for the candidate (career history, skills, education, etc.)"""
+    def _build_related_rows(self, parsed_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Build the related rows for a candidate (career history, skills, education, etc.) from parsed resume data
+
+        Returns:
+            Dict mapping each relationship key to a list of column dicts (without candidate_id)
+        """
         
         # Career History
-        career_history = parsed_data.get('career_history', [])
-        if career_history:
-            for experience in career_history:
-                career_record = CandidateCareerHistory(
-                     candidate_id=candidate_id,
-                     job_title=experience.get('job_title'),
-                     company_name=experience.get('company_name'),
-                     start_date=self._parse_date(experience.get('start_date')),
-                     end_date=self._parse_date(experience.get('end_date')),
-                     description=experience.get('job_description', experience.get('description')),
-                     is_active=True
-                 )
-                db.session.add(career_record)
+        career_rows = [
+            {
+                'job_title': experience.get('job_title'),
+                'company_name': experience.get('company_name'),
+                'start_date': self._parse_date(experience.get('start_date')),
+                'end_date': self._parse_date(experience.get('end_date')),
+                'description': experience.get('job_description', experience.get('description')),
+                'is_active': True
+            }
+            for experience in parsed_data.get('career_history') or []
+        ]
+        
         # Skills
-        skills = parsed_data.get('skills', [])
-        if skills:
-            for skill in skills:
-                if isinstance(skill, str):
-                    skill_record = CandidateSkills(
-                         candidate_id=candidate_id,
-                         skills=skill,
-                         is_active=True
-                    )
-                    db.session.add(skill_record)
-                elif isinstance(skill, dict):
-                    skill_name = skill.get('skill_name', skill.get('name', ''))
-                    if skill_name:
-                        skill_record = CandidateSkills(
-                             candidate_id=candidate_id,
-                             skills=skill_name,
-                             is_active=True
-                        )
-                        db.session.add(skill_record)
+        skill_rows = []
+        for skill in parsed_data.get('skills') or []:
+            if isinstance(skill, dict):
+                skill = skill.get('skill_name', skill.get('name', ''))
+                if not skill:
+                    continue
+            elif not isinstance(skill, str):
+                continue
+            skill_rows.append({'skills': skill, 'is_active': True})
+        
         # Education
-        education = parsed_data.get('education', [])
-        if education:
-            for edu in education:
-                edu_record = CandidateEducation(
-                     candidate_id=candidate_id,
-                     school=edu.get('institution_name', edu.get('school', '')),
-                     degree=edu.get('degree_title', edu.get('degree', '')),
-                     field_of_study=edu.get('field_of_study'),
-                     start_date=self._parse_date(edu.get('start_date')),
-                     end_date=self._parse_date(edu.get('end_date')),
-                     grade=edu.get('grade_score', edu.get('grade')),
-                     description=edu.get('description'),
-                     is_active=True
-                )
-                db.session.add(edu_record)
-
+        education_rows = [
+            {
+                'school': edu.get('institution_name', edu.get('school', '')),
+                'degree': edu.get('degree_title', edu.get('degree', '')),
+                'field_of_study': edu.get('field_of_study'),
+                'start_date': self._parse_date(edu.get('start_date')),
+                'end_date': self._parse_date(edu.get('end_date')),
+                'grade': edu.get('grade_score', edu.get('grade')),
+                'description': edu.get('description'),
+                'is_active': True
+            }
+            for edu in parsed_data.get('education') or []
+        ]
+        
         # Licenses & Certifications
-        certifications = parsed_data.get('certifications', [])
-        if certifications:
-            for cert in certifications:
-                cert_record = CandidateLicensesCertifications(
-                     candidate_id=candidate_id,
-                     license_certification_name=cert.get('name', cert.get('license_name', '')),
-                     issuing_organisation=cert.get('issuing_organization'),
-                     issue_date=self._parse_date(cert.get('issue_date')),
-                     expiry_date=self._parse_date(cert.get('expiration_date')),
-                     description=cert.get('description'),
-                     is_active=True
-                )
-                db.session.add(cert_record)
-         
+        certification_rows = [
+            {
+                'license_certification_name': cert.get('name', cert.get('license_name', '')),
+                'issuing_organisation': cert.get('issuing_organization'),
+                'issue_date': self._parse_date(cert.get('issue_date')),
+                'expiry_date': self._parse_date(cert.get('expiration_date')),
+                'description': cert.get('description'),
+                'is_active': True
+            }
+            for cert in parsed_data.get('certifications') or []
+        ]
+        
         # Languages
-        languages = parsed_data.get('languages', [])
-        if languages:
-            for lang in languages:
-                if isinstance(lang, str):
-                    lang_record = CandidateLanguages(
-                         candidate_id=candidate_id,
-                         language=lang,
-                         is_active=True
-                    )
-                    db.session.add(lang_record)
-                elif isinstance(lang, dict):
-                    lang_record = CandidateLanguages(
-                         candidate_id=candidate_id,
-                         language=lang.get('language', lang.get('name', '')),
-                         proficiency_level=lang.get('proficiency_level', lang.get('proficiency', '')),
-                         is_active=True
-                    )
-                    db.session.add(lang_record)
+        language_rows = []
+        for lang in parsed_data.get('languages') or []:
+            if isinstance(lang, str):
+                language_rows.append({'language': lang, 'is_active': True})
+            elif isinstance(lang, dict):
+                language_rows.append({
+                    'language': lang.get('language', lang.get('name', '')),
+                    'proficiency_level': lang.get('proficiency_level', lang.get('proficiency', '')),
+                    'is_active': True
+                })
+        
+        return {
+            'career_history': career_rows,
+            'skills': skill_rows,
+            'education': education_rows,
+            'licenses_certifications': certification_rows,
+            'languages': language_rows
+        }
+
+    def _insert_candidate_chunk(self, payloads: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert a chunk of candidate profiles and their related rows in one transaction:
+        one multi-row INSERT ... RETURNING id for the profiles, then one INSERT per related table
+
+        Returns:
+            Candidate ids in the same order as payloads
+        """
+        candidate_ids = db.session.scalars(
+            insert(CandidateMasterProfile).returning(CandidateMasterProfile.id, sort_by_parameter_order=True),
+            [payload['candidate_row'] for payload in payloads]
+        ).all()
+        
+        for relationship_key, model in RELATED_MODELS:
+            rows = [
+                dict(row, candidate_id=candidate_id)
+                for payload, candidate_id in zip(payloads, candidate_ids)
+                for row in payload['related_rows'][relationship_key]
+            ]
+            if rows:
+                db.session.bulk_insert_mappings(model, rows)
+        
+        db.session.commit()
+        if any(payload['related_rows']['skills'] for payload in payloads):
+            invalidate_skills_cache()
+        return candidate_ids
+
+    def _build_ai_profile_dict(self, candidate_row: Dict[str, Any],
+                               related_rows: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Shape a not-yet-inserted candidate like candidate.to_dict(include_relationships=True)
+        (dates as ISO strings, salary as float) so AI processing can run before anything is
+        written, without building ORM objects
+        """
+        candidate_dict = dict(candidate_row)
+        salary_expectation = candidate_dict.get('salary_expectation')
+        candidate_dict['salary_expectation'] = float(salary_expectation) if salary_expectation else None
+        for relationship_key, _ in RELATED_MODELS:
+            candidate_dict[relationship_key] = [
+                {key: value.isoformat() if isinstance(value, date) else value for key, value in row.items()}
+                for row in related_rows[relationship_key]
+            ]
+        return candidate_dict
 
     
-    def _parse_date(self, date_string: str) -> Optional[datetime]:
-        """Parse date string to datetime object"""
+    def _parse_date(self, date_string: str) -> Optional[date]:
+        """Parse date string to date object"""
         if not date_string:
             return None
         
         try:
-            # Try common date formats
-            date_formats = [
-                '%Y-%m-%d',
-                '%Y-%m',
-                '%Y',
-                '%m/%d/%Y',
-                '%d/%m/%Y',
-                '%B %Y',
-                '%b %Y'
-            ]
+            date_string = str(date_string)
+            
+            # Bare year: no strptime needed
+            if len(date_string) == 4 and date_string.isascii() and date_string.isdigit():
+                year = int(date_string)
+                return date(year, 1, 1) if year >= 1 else None
             
-            for fmt in date_formats:
+            # Only try the formats the string's separators allow, in the same precedence order
+            for fmt in _candidate_date_formats(date_string):
                 try:
-                    return datetime.strptime(str(date_string), fmt)
+                    return datetime.strptime(date_string, fmt).date()
                 except ValueError:
                     continue
             
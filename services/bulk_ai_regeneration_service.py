@@ -1,24 +1,87 @@
 import os
 import asyncio
+import itertools
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 from dotenv import load_dotenv
+import redis
+from sqlalchemy import update, values, column, cast
+from sqlalchemy.orm import selectinload
+from cache import cache
 from database import db
-from models import CandidateMasterProfile, AiPromptTemplate
-from services.ai_summary_service import ai_summary_service
+from models import (
+    CandidateMasterProfile, AiPromptTemplate, CandidateCareerHistory, CandidateSkills,
+    CandidateEducation, CandidateLicensesCertifications, CandidateLanguages, CandidateResume
+)
+from services.ai_summary_service import (
+    ai_summary_service, summary_hash, summary_prompt_hash, EMBEDDING_BATCH_SIZE
+)
+from services.rate_limiter import TokenBucket
 import json
+import logging
 from flask import current_app
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Job status is mirrored to the shared cache under these keys so any Gunicorn worker can read or
+# cancel a job (Redis when CACHE_REDIS_URL is set; otherwise per process, as before)
+JOB_CACHE_PREFIX = 'bulk_regen:'
+JOB_INDEX_CACHE_KEY = 'bulk_regen:jobs'
+JOB_CACHE_TIMEOUT = 24 * 3600
+MAX_INDEXED_JOBS = 100
+
+# With Redis, every status update is also published to this channel + job_id for progress streams
+JOB_PROGRESS_CHANNEL_PREFIX = 'bulk_regen:progress:'
+
+# Job status fields sent to progress streams
+PROGRESS_FIELDS = (
+    'job_id', 'status', 'total_profiles', 'processed_profiles', 'successful_updates',
+    'failed_updates', 'skipped_profiles', 'estimated_completion', 'completed_at'
+)
+
+# Without Redis, progress streams re-read the job status this often
+PROGRESS_POLL_SECONDS = 1.0
+
+# Finished jobs kept in active_jobs per process (oldest are evicted first)
+MAX_TRACKED_JOBS = 100
+
+# Statuses of jobs that are still running
+RUNNING_STATUSES = ('starting', 'fetching_profiles', 'processing')
+
+# Returned by _process_single_profile when the profile's summary inputs haven't changed
+PROFILE_UNCHANGED = object()
+
+# Profiles loaded per query while a job streams through the table
+PROFILE_PAGE_SIZE = 200
+
+# Eager loaders for the child relationships serialized into a profile's summary input: one
+# SELECT ... WHERE profile_id IN (...) per page and relationship, restricted to active rows so
+# inactive ones are never fetched
+ACTIVE_RELATIONSHIP_LOADERS = (
+    selectinload(CandidateMasterProfile.career_history.and_(CandidateCareerHistory.is_active == True)),
+    selectinload(CandidateMasterProfile.skills.and_(CandidateSkills.is_active == True)),
+    selectinload(CandidateMasterProfile.education.and_(CandidateEducation.is_active == True)),
+    selectinload(CandidateMasterProfile.licenses_certifications.and_(
+        CandidateLicensesCertifications.is_active == True)),
+    selectinload(CandidateMasterProfile.languages.and_(CandidateLanguages.is_active == True)),
+    selectinload(CandidateMasterProfile.resumes.and_(CandidateResume.is_active == True)),
+)
+
+def progress_event(job_status: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a job's status sent to progress streams"""
+    return {field: job_status.get(field) for field in PROGRESS_FIELDS}
+
 class BulkAIRegenerationService:
     """
     Service for bulk regeneration of AI summaries and embeddings for all candidate profiles
-    Handles rate limiting, multi-threading, and progress tracking
+    Handles rate limiting, concurrent AI processing, and progress tracking
     """
     
     def __init__(self):
@@ -27,43 +90,246 @@ class BulkAIRegenerationService:
         self.max_concurrent_workers = int(os.getenv('AI_BULK_MAX_CONCURRENT_WORKERS', 5))
         self.rate_limit_delay = float(os.getenv('AI_BULK_RATE_LIMIT_DELAY_SECONDS', 1.0))
         
-        # Job tracking
-        self.active_jobs = {}
-        self.job_counter = 0
+        # Caps AI calls at AI_BULK_RPS per second (default: one per rate_limit_delay) while letting
+        # up to AI_BULK_BURST start together, so the rate and the worker count both apply
+        rps = os.getenv('AI_BULK_RPS')
+        burst = int(os.getenv('AI_BULK_BURST', self.max_concurrent_workers))
+        if rps is not None:
+            self.rate_limiter = TokenBucket(float(rps), capacity=burst)
+        else:
+            self.rate_limiter = TokenBucket.from_delay(self.rate_limit_delay, capacity=burst)
+        
+        # Regenerated profiles written per UPDATE batch (and per transaction)
+        self.update_batch_size = int(os.getenv('AI_BULK_UPDATE_BATCH_SIZE', 50))
+        
+        # Job tracking: job_id -> status dict for jobs started by this process, oldest first.
+        # Guarded by _jobs_lock since requests read and cancel jobs while job threads update them;
+        # a job's counters are only updated by its coroutine or the database step it is awaiting, one at
+        # a time, so they need no lock of their own.
+        self.active_jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._job_counter = itertools.count(1)
+        
+        # Job runners for the service's lifetime; jobs beyond max_concurrent_workers queue as 'starting'
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_workers, thread_name_prefix='bulk-regen'
+        )
+        
+        # Event loop shared by all jobs in this process, on its own thread (started on first use)
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        
+        # Redis client for progress pub/sub (shares the cache's Redis; connects on first use)
+        redis_url = os.getenv('CACHE_REDIS_URL', '').strip()
+        self._redis = redis.Redis.from_url(redis_url) if redis_url else None
+        
+        # Longest a progress stream stays open; keep it below the Gunicorn worker timeout
+        self.progress_stream_seconds = float(os.getenv('AI_BULK_PROGRESS_STREAM_SECONDS', 90))
         
         # Store Flask app reference for context management
         self.app = None
         
-        print(f"Bulk AI Regeneration Service initialized:")
-        print(f"  Max concurrent workers: {self.max_concurrent_workers}")
-        print(f"  Rate limit delay: {self.rate_limit_delay} seconds")
+        logger.info(f"Bulk AI Regeneration Service initialized:")
+        logger.info(f"  Max concurrent workers: {self.max_concurrent_workers}")
+        logger.info(f"  Rate limit delay: {self.rate_limit_delay} seconds")
+        logger.info(f"  Rate limit: {self.rate_limiter.rate:.2f} calls/second (burst {self.rate_limiter.capacity})")
     
     def set_app(self, app):
         """Set Flask app instance for context management"""
         self.app = app
     
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the service's event loop, starting its thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._run_loop, args=(self._loop,), name='bulk-regen-loop', daemon=True
+                ).start()
+            return self._loop
+    
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+        loop.close()
+    
+    def shutdown(self):
+        """Cancel this process's running jobs, wait for their runners to stop, then stop the event loop"""
+        with self._jobs_lock:
+            job_ids = list(self.active_jobs)
+        if job_ids and self.app is not None:
+            # Runs at interpreter exit, outside any app context; cancelling publishes to the cache
+            with self.app.app_context():
+                for job_id in job_ids:
+                    self.cancel_job(job_id)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+    
     def generate_job_id(self) -> str:
-        """Generate a unique job ID"""
-        self.job_counter += 1
+        """Generate a unique job ID (the process ID keeps IDs unique across Gunicorn workers)"""
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        return f"bulk_regen_{timestamp}_{self.job_counter}"
+        return f"bulk_regen_{timestamp}_{os.getpid()}_{next(self._job_counter)}"
+    
+    def _snapshot_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of a tracked job's status taken under the lock, so readers never see it mid-update"""
+        with self._jobs_lock:
+            job_status = self.active_jobs.get(job_id)
+            if job_status is None:
+                return None
+            return dict(job_status, errors=list(job_status['errors']))
+    
+    def _track_job(self, job_id: str, job_status: Dict[str, Any]):
+        """Add a job to active_jobs, evicting the oldest finished jobs beyond MAX_TRACKED_JOBS"""
+        with self._jobs_lock:
+            self.active_jobs[job_id] = job_status
+            finished_job_ids = [
+                tracked_job_id for tracked_job_id, tracked_status in self.active_jobs.items()
+                if tracked_status['status'] not in RUNNING_STATUSES
+            ]
+            for tracked_job_id in finished_job_ids[:max(0, len(finished_job_ids) - MAX_TRACKED_JOBS)]:
+                del self.active_jobs[tracked_job_id]
+    
+    def _publish_job_status(self, job_id: str):
+        """Copy a job's status to the shared cache and notify its progress streams"""
+        job_status = self._snapshot_job(job_id)
+        if job_status is None:
+            return
+        try:
+            cache.set(JOB_CACHE_PREFIX + job_id, job_status, timeout=JOB_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to publish status of job {job_id}: {str(e)}")
+        self._publish_progress(job_status)
+    
+    def _publish_progress(self, job_status: Dict[str, Any]):
+        """Send a job's progress to the streams subscribed on Redis (no-op without Redis)"""
+        if self._redis is None:
+            return
+        try:
+            self._redis.publish(
+                JOB_PROGRESS_CHANNEL_PREFIX + job_status['job_id'], json.dumps(progress_event(job_status))
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish progress of job {job_status['job_id']}: {str(e)}")
+    
+    def _index_job(self, job_id: str):
+        """Add a job to the shared list of recent job IDs"""
+        try:
+            job_ids = [existing for existing in (cache.get(JOB_INDEX_CACHE_KEY) or []) if existing != job_id]
+            cache.set(JOB_INDEX_CACHE_KEY, (job_ids + [job_id])[-MAX_INDEXED_JOBS:], timeout=JOB_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to index job {job_id}: {str(e)}")
+    
+    def _is_cancelled(self, job_id: str) -> bool:
+        """Whether the job was cancelled, here or from another worker"""
+        job_status = self.active_jobs[job_id]
+        if job_status['status'] != 'cancelled':
+            try:
+                cached_status = cache.get(JOB_CACHE_PREFIX + job_id)
+            except Exception as e:
+                logger.warning(f"Failed to read cached status of job {job_id}: {str(e)}")
+                cached_status = None
+            if cached_status and cached_status.get('status') == 'cancelled':
+                with self._jobs_lock:
+                    job_status['status'] = 'cancelled'
+                    job_status['completed_at'] = cached_status.get('completed_at')
+        return job_status['status'] == 'cancelled'
+    
+    def _set_running_status(self, job_id: str, status: str) -> bool:
+        """Move a job to its next running status and publish it; False (unchanged) if it was cancelled"""
+        if self._is_cancelled(job_id):
+            return False
+        with self._jobs_lock:
+            job_status = self.active_jobs[job_id]
+            if job_status['status'] == 'cancelled':
+                return False
+            job_status['status'] = status
+        self._publish_job_status(job_id)
+        return True
     
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get the status of a specific job"""
-        return self.active_jobs.get(job_id)
+        """Get the status of a specific job (jobs running in other workers come from the shared cache)"""
+        return self._snapshot_job(job_id) or cache.get(JOB_CACHE_PREFIX + job_id)
+    
+    def stream_job_progress(self, job_id: str, heartbeat_seconds: float = 30.0,
+                            max_seconds: Optional[float] = None) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yield a job's progress (see PROGRESS_FIELDS) as it changes, starting with its current state and
+        ending once it has finished. Yields None when heartbeat_seconds pass without a change, and stops
+        after max_seconds (default: progress_stream_seconds) so a stream never outlives the worker
+        timeout (clients reconnect).
+        Updates arrive over Redis pub/sub when CACHE_REDIS_URL is set; otherwise the status is polled.
+        Nothing is yielded if the job doesn't exist.
+        """
+        pubsub = None
+        if self._redis is not None:
+            # Subscribe before reading the current state so no update falls in between
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(JOB_PROGRESS_CHANNEL_PREFIX + job_id)
+        try:
+            job_status = self.get_job_status(job_id)
+            if job_status is None:
+                return
+            event = progress_event(job_status)
+            yield event
+            
+            if max_seconds is None:
+                max_seconds = self.progress_stream_seconds
+            deadline = time.monotonic() + max_seconds
+            last_sent = time.monotonic()
+            while event['status'] in RUNNING_STATUSES:
+                now = time.monotonic()
+                if now >= deadline:
+                    return
+                if now - last_sent >= heartbeat_seconds:
+                    yield None
+                    last_sent = now
+                    continue
+                wait_seconds = min(deadline, last_sent + heartbeat_seconds) - now
+                
+                if pubsub is not None:
+                    message = pubsub.get_message(timeout=wait_seconds)
+                    next_event = json.loads(message['data']) if message else None
+                else:
+                    time.sleep(min(PROGRESS_POLL_SECONDS, wait_seconds))
+                    job_status = self.get_job_status(job_id)
+                    next_event = progress_event(job_status) if job_status else None
+                    if next_event == event:
+                        next_event = None
+                
+                if next_event is not None:
+                    event = next_event
+                    yield event
+                    last_sent = time.monotonic()
+        finally:
+            if pubsub is not None:
+                pubsub.close()
     
     def get_all_active_jobs(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all active jobs"""
-        return self.active_jobs.copy()
+        jobs = {}
+        for job_id in cache.get(JOB_INDEX_CACHE_KEY) or []:
+            job_status = cache.get(JOB_CACHE_PREFIX + job_id)
+            if job_status:
+                jobs[job_id] = job_status
+        with self._jobs_lock:
+            for job_id, job_status in self.active_jobs.items():
+                jobs[job_id] = dict(job_status, errors=list(job_status['errors']))
+        return jobs
     
     def start_bulk_regeneration(self, prompt_template_id: Optional[int] = None, 
-                              created_by: str = "system") -> str:
+                              created_by: str = "system", force: bool = False) -> str:
         """
         Start bulk regeneration of AI summaries for all candidate profiles
         
         Args:
             prompt_template_id (int, optional): Specific template ID to activate first
             created_by (str): User who initiated the job
+            force (bool): Regenerate every profile, including those whose summary prompt is unchanged
             
         Returns:
             str: Job ID for tracking
@@ -77,25 +343,24 @@ class BulkAIRegenerationService:
             'started_at': datetime.utcnow().isoformat(),
             'created_by': created_by,
             'prompt_template_id': prompt_template_id,
+            'force': force,
             'total_profiles': 0,
             'processed_profiles': 0,
             'successful_updates': 0,
             'failed_updates': 0,
+            'skipped_profiles': 0,
             'current_profile_id': None,
             'estimated_completion': None,
             'errors': [],
             'completed_at': None
         }
         
-        self.active_jobs[job_id] = job_status
+        self._track_job(job_id, job_status)
+        self._publish_job_status(job_id)
+        self._index_job(job_id)
         
-        # Start background thread
-        thread = threading.Thread(
-            target=self._run_bulk_regeneration,
-            args=(job_id, prompt_template_id),
-            daemon=True
-        )
-        thread.start()
+        # Run in the background on the service's job executor
+        self._executor.submit(self._run_bulk_regeneration, job_id, prompt_template_id)
         
         return job_id
     
@@ -110,52 +375,68 @@ class BulkAIRegenerationService:
             job_status['status'] = 'failed'
             job_status['completed_at'] = datetime.utcnow().isoformat()
             job_status['errors'].append(error_msg)
-            print(f"ERROR in bulk regeneration job {job_id}: {error_msg}")
+            self._publish_job_status(job_id)
+            logger.error(f"ERROR in bulk regeneration job {job_id}: {error_msg}")
             return
         
+        # Executor threads don't inherit the submitting request's app context, so push one for the job
         with self.app.app_context():
             job_status = self.active_jobs[job_id]
             
+            # Cancelled while queued for a free runner
+            if self._is_cancelled(job_id):
+                logger.info(f"Bulk regeneration job {job_id} cancelled before it started")
+                return
+            
             try:
-                print(f"Starting bulk AI regeneration job: {job_id}")
+                logger.info(f"Starting bulk AI regeneration job: {job_id}")
                 
                 # Step 1: Activate specific template if provided
                 if prompt_template_id:
                     self._activate_template(job_id, prompt_template_id)
                 
-                # Step 2: Get all candidate profiles
-                job_status['status'] = 'fetching_profiles'
-                profiles = self._get_all_profiles(job_id)
+                # Step 2: Count the candidate profiles (they are loaded page by page while processing)
+                if not self._set_running_status(job_id, 'fetching_profiles'):
+                    return
+                total_profiles = self._count_profiles(job_id)
                 
-                if not profiles:
+                if not total_profiles:
                     job_status['status'] = 'completed'
                     job_status['completed_at'] = datetime.utcnow().isoformat()
-                    print(f"No profiles found for regeneration. Job {job_id} completed.")
+                    self._publish_job_status(job_id)
+                    logger.info(f"No profiles found for regeneration. Job {job_id} completed.")
                     return
                 
-                job_status['total_profiles'] = len(profiles)
-                job_status['status'] = 'processing'
+                job_status['total_profiles'] = total_profiles
+                if not self._set_running_status(job_id, 'processing'):
+                    return
                 
-                print(f"Found {len(profiles)} profiles to process")
+                logger.info(f"Found {total_profiles} profiles to process")
                 
                 # Step 3: Process profiles with rate limiting
-                self._process_profiles_with_rate_limiting(job_id, profiles)
+                self._process_profiles_with_rate_limiting(job_id)
                 
-                # Step 4: Complete job
-                job_status['status'] = 'completed'
-                job_status['completed_at'] = datetime.utcnow().isoformat()
+                # Step 4: Complete job (unless it was cancelled part-way)
+                self._is_cancelled(job_id)
+                with self._jobs_lock:
+                    if job_status['status'] != 'cancelled':
+                        job_status['status'] = 'completed'
+                        job_status['completed_at'] = datetime.utcnow().isoformat()
+                self._publish_job_status(job_id)
                 
-                print(f"Bulk regeneration job {job_id} completed:")
-                print(f"  Total profiles: {job_status['total_profiles']}")
-                print(f"  Successful updates: {job_status['successful_updates']}")
-                print(f"  Failed updates: {job_status['failed_updates']}")
+                logger.info(f"Bulk regeneration job {job_id} {job_status['status']}:")
+                logger.info(f"  Total profiles: {job_status['total_profiles']}")
+                logger.info(f"  Successful updates: {job_status['successful_updates']}")
+                logger.info(f"  Failed updates: {job_status['failed_updates']}")
+                logger.info(f"  Skipped (unchanged): {job_status['skipped_profiles']}")
                 
             except Exception as e:
                 job_status['status'] = 'failed'
                 job_status['completed_at'] = datetime.utcnow().isoformat()
                 error_msg = f"Job failed with error: {str(e)}"
                 job_status['errors'].append(error_msg)
-                print(f"ERROR in bulk regeneration job {job_id}: {error_msg}")
+                self._publish_job_status(job_id)
+                logger.error(f"ERROR in bulk regeneration job {job_id}: {error_msg}")
     
     def _activate_template(self, job_id: str, template_id: int):
         """Activate a specific prompt template"""
@@ -167,307 +448,340 @@ class BulkAIRegenerationService:
                 raise ValueError(f"Template with ID {template_id} not found")
             
             template.activate()
-            print(f"Activated template: {template.name} (ID: {template_id})")
+            ai_summary_service.clear_prompt_template_cache()
+            logger.info(f"Activated template: {template.name} (ID: {template_id})")
             
         except Exception as e:
             error_msg = f"Failed to activate template {template_id}: {str(e)}"
             job_status['errors'].append(error_msg)
-            print(f"WARNING: {error_msg}")
+            logger.warning(error_msg)
     
-    def _get_all_profiles(self, job_id: str) -> List[CandidateMasterProfile]:
-        """Get all active candidate profiles"""
+    def _count_profiles(self, job_id: str) -> int:
+        """Count the active candidate profiles"""
         try:
-            profiles = CandidateMasterProfile.query.filter_by(is_active=True).all()
-            return profiles
+            return CandidateMasterProfile.query.filter_by(is_active=True).count()
+        except Exception as e:
+            job_status = self.active_jobs[job_id]
+            error_msg = f"Failed to count profiles: {str(e)}"
+            job_status['errors'].append(error_msg)
+            raise e
+    
+    def _load_profile_page(self, job_id: str, after_id: int) -> List[tuple]:
+        """
+        Load the next PROFILE_PAGE_SIZE active candidate profiles after after_id (keyset pagination on
+        id) and build each one's summary prompt, so only the profiles being processed are held in memory.
+        Pages are separate queries rather than one server-side cursor because the job commits its
+        updates while iterating.
+        Each page eager-loads the profiles' active child records with one SELECT per relationship,
+        instead of to_dict() lazy-loading every relationship of every profile. Inactive child records
+        are filtered out in SQL and are invisible to this code path: the loaded collections hold
+        only active rows, so the profiles must not be used to edit relationships.
+        
+        Returns:
+            list: (profile, candidate_dict, prompt, error) per profile; error is set (and the rest
+                None) when the profile's prompt could not be built
+        """
+        try:
+            page = (CandidateMasterProfile.query
+                    .options(*ACTIVE_RELATIONSHIP_LOADERS)
+                    .filter(CandidateMasterProfile.is_active == True, CandidateMasterProfile.id > after_id)
+                    .order_by(CandidateMasterProfile.id)
+                    .limit(PROFILE_PAGE_SIZE)
+                    .all())
         except Exception as e:
             job_status = self.active_jobs[job_id]
             error_msg = f"Failed to fetch profiles: {str(e)}"
             job_status['errors'].append(error_msg)
             raise e
+        
+        items = []
+        for profile in page:
+            try:
+                # The prompt holds everything the summary depends on (profile data and active template)
+                candidate_dict = profile.to_dict(include_relationships=True)
+                items.append((profile, candidate_dict, ai_summary_service.build_summary_prompt(candidate_dict), None))
+            except Exception as e:
+                logger.exception("Error preparing profile %s: %s", profile.id, e)
+                items.append((profile, None, None, e))
+        return items
     
-    def _process_profiles_with_rate_limiting(self, job_id: str, profiles: List[CandidateMasterProfile]):
+    async def _run_in_app_context(self, func, *args):
+        """
+        Run blocking database or cache work on a worker thread in its own app context (and so its own
+        session, closed when it returns), keeping the service loop free for every job's AI calls
         """
-        Process profiles using ThreadPoolExecutor with rate limiting
+        def call():
+            with self.app.app_context():
+                return func(*args)
+        return await asyncio.to_thread(call)
+    
+    def _process_profiles_with_rate_limiting(self, job_id: str):
+        """
+        Process profiles concurrently with rate limiting
+        """
+        # The work is AI API I/O, so every profile runs as a coroutine on the service's long-lived loop;
+        # jobs share that loop instead of each starting one
+        asyncio.run_coroutine_threadsafe(
+            self._process_profiles_async(job_id), self._get_loop()
+        ).result()
+    
+    async def _process_profiles_async(self, job_id: str):
+        """
+        Run the profiles as coroutines with at most max_concurrent_workers in flight: the next
+        profile is started as each one completes, and results are recorded as they complete.
+        Loading pages, saving updates and publishing progress run off the loop (see _run_in_app_context);
+        loaded profiles are only read, from their already-loaded attributes.
         """
         job_status = self.active_jobs[job_id]
         start_time = time.time()
+        queued = deque()
+        last_id = 0
+        exhausted = False
+        in_flight = set()
         
-        # Use ThreadPoolExecutor for controlled concurrency
-        with ThreadPoolExecutor(max_workers=self.max_concurrent_workers) as executor:
-            # Submit all tasks
-            future_to_profile = {}
-            for profile in profiles:
-                future = executor.submit(self._process_single_profile, job_id, profile)
-                future_to_profile[future] = profile
-            
-            # Process completed tasks with rate limiting
-            for future in as_completed(future_to_profile):
-                profile = future_to_profile[future]
-                job_status['current_profile_id'] = profile.id
-                
-                try:
-                    success = future.result()
-                    if success:
-                        job_status['successful_updates'] += 1
-                    else:
-                        job_status['failed_updates'] += 1
-                        
-                except Exception as e:
-                    job_status['failed_updates'] += 1
-                    error_msg = f"Profile {profile.id}: {str(e)}"
-                    job_status['errors'].append(error_msg)
-                    print(f"ERROR processing profile {profile.id}: {error_msg}")
-                
-                job_status['processed_profiles'] += 1
-                
-                # Calculate estimated completion
-                if job_status['processed_profiles'] > 0:
-                    elapsed_time = time.time() - start_time
-                    avg_time_per_profile = elapsed_time / job_status['processed_profiles']
-                    remaining_profiles = job_status['total_profiles'] - job_status['processed_profiles']
-                    estimated_seconds = remaining_profiles * avg_time_per_profile
-                    estimated_completion = datetime.utcnow().timestamp() + estimated_seconds
-                    job_status['estimated_completion'] = datetime.fromtimestamp(estimated_completion).isoformat()
-                
-                # Progress logging
+        async def process(profile, candidate_dict, prompt, error):
+            if error is not None:
+                return profile, None, error
+            try:
+                return profile, await self._process_single_profile(job_id, profile, candidate_dict, prompt), None
+            except Exception as e:
+                return profile, None, e
+        
+        async def fill_window():
+            nonlocal last_id, exhausted
+            # No further profiles are started once the job is cancelled
+            while len(in_flight) < self.max_concurrent_workers and job_status['status'] != 'cancelled':
+                if not queued:
+                    if exhausted:
+                        return
+                    page = await self._run_in_app_context(self._load_profile_page, job_id, last_id)
+                    if not page:
+                        exhausted = True
+                        return
+                    last_id = page[-1][0].id
+                    queued.extend(page)
+                in_flight.add(asyncio.ensure_future(process(*queued.popleft())))
+        
+        # Record results as they complete. Changed summaries are embedded EMBEDDING_BATCH_SIZE per
+        # request, and updates are written update_batch_size at a time
+        pending_embeddings = []
+        pending_updates = []
+        await fill_window()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for completed in done:
+                in_flight.discard(completed)
+                self._record_outcome(job_id, completed.result(), pending_embeddings, pending_updates, start_time)
+                # Progress logging; also publish progress and pick up cancellations from other workers
                 if job_status['processed_profiles'] % 10 == 0:
-                    print(f"Progress: {job_status['processed_profiles']}/{job_status['total_profiles']} profiles processed")
-                
-                # Rate limiting delay between processing
-                if self.rate_limit_delay > 0:
-                    time.sleep(self.rate_limit_delay)
+                    logger.info(f"Progress: {job_status['processed_profiles']}/{job_status['total_profiles']} profiles processed")
+                    await self._run_in_app_context(self._publish_progress_checkpoint, job_id)
+            if len(pending_embeddings) >= EMBEDDING_BATCH_SIZE:
+                await self._embed_summaries(pending_embeddings)
+                pending_updates.extend(pending_embeddings)
+                pending_embeddings.clear()
+            if len(pending_updates) >= self.update_batch_size:
+                await self._run_in_app_context(self._save_profile_updates, job_id, pending_updates)
+                pending_updates.clear()
+            await fill_window()
+        
+        if pending_embeddings:
+            await self._embed_summaries(pending_embeddings)
+            pending_updates.extend(pending_embeddings)
+        if pending_updates:
+            await self._run_in_app_context(self._save_profile_updates, job_id, pending_updates)
+    
+    def _publish_progress_checkpoint(self, job_id: str):
+        """Publish a running job's status, unless it has been cancelled here or from another worker"""
+        if not self._is_cancelled(job_id):
+            self._publish_job_status(job_id)
+    
+    def _record_outcome(self, job_id: str, outcome: tuple, pending_embeddings: List[Dict[str, Any]],
+                        pending_updates: List[Dict[str, Any]], start_time: float):
+        """Update the job's counters for one processed profile and queue its update row"""
+        job_status = self.active_jobs[job_id]
+        profile, update_row, error = outcome
+        job_status['current_profile_id'] = profile.id
+        
+        if error is not None:
+            job_status['failed_updates'] += 1
+            error_msg = f"Profile {profile.id}: {str(error)}"
+            job_status['errors'].append(error_msg)
+            logger.error(f"ERROR processing profile {profile.id}: {error_msg}")
+        elif update_row is None:
+            job_status['failed_updates'] += 1
+        elif update_row is PROFILE_UNCHANGED:
+            job_status['skipped_profiles'] += 1
+        elif 'ai_summary_hash' in update_row:
+            pending_embeddings.append(update_row)
+        else:
+            pending_updates.append(update_row)
+        
+        job_status['processed_profiles'] += 1
+        
+        # Calculate estimated completion
+        if job_status['processed_profiles'] > 0:
+            elapsed_time = time.time() - start_time
+            avg_time_per_profile = elapsed_time / job_status['processed_profiles']
+            remaining_profiles = job_status['total_profiles'] - job_status['processed_profiles']
+            estimated_seconds = remaining_profiles * avg_time_per_profile
+            estimated_completion = datetime.utcnow().timestamp() + estimated_seconds
+            job_status['estimated_completion'] = datetime.fromtimestamp(estimated_completion).isoformat()
+
+    
+    async def _embed_summaries(self, update_rows: List[Dict[str, Any]]):
+        """Fill in the embedding of each row's new summary, using batched embeddings requests"""
+        await self.rate_limiter.acquire_async()
+        vectors = await ai_summary_service.generate_embeddings([row['ai_short_summary'] for row in update_rows])
+        for row, vector in zip(update_rows, vectors):
+            row['embedding_vector'] = vector
+            # A zero-vector fallback (failed embedding call) must not be reused later, nor let later
+            # runs skip the profile
+            if not any(vector):
+                row['ai_summary_hash'] = None
+                row['ai_summary_source_hash'] = None
+    
+    def _save_profile_updates(self, job_id: str, update_rows: List[Dict[str, Any]]):
+        """
+        Write a batch of profile updates in one transaction; if it fails, the whole batch
+        is counted as failed and rolled back
+        """
+        job_status = self.active_jobs[job_id]
+        try:
+            self._bulk_apply_updates(update_rows)
+            db.session.commit()
+            job_status['successful_updates'] += len(update_rows)
+        except Exception as e:
+            db.session.rollback()
+            job_status['failed_updates'] += len(update_rows)
+            error_msg = f"Failed to save {len(update_rows)} profile updates: {str(e)}"
+            job_status['errors'].append(error_msg)
+            logger.error(f"ERROR in bulk regeneration job {job_id}: {error_msg}")
     
-    def _process_single_profile(self, job_id: str, profile: CandidateMasterProfile) -> bool:
+    def _bulk_apply_updates(self, update_rows: List[Dict[str, Any]]):
+        """
+        Apply profile updates as UPDATE ... FROM (VALUES ...): one statement per set of updated
+        columns (rows with and without a new embedding) instead of one UPDATE per row
+        """
+        table_columns = CandidateMasterProfile.__table__.c
+        rows_by_keys = {}
+        for row in update_rows:
+            rows_by_keys.setdefault(tuple(sorted(row)), []).append(row)
+        
+        for keys, rows in rows_by_keys.items():
+            updated = values(
+                *(column(key, table_columns[key].type) for key in keys), name='updated'
+            ).data([tuple(row[key] for key in keys) for row in rows])
+            # VALUES columns arrive untyped, so cast each back to its column type (e.g. the pgvector text form)
+            db.session.execute(
+                update(CandidateMasterProfile)
+                .where(CandidateMasterProfile.id == updated.c.id)
+                .values({key: cast(updated.c[key], table_columns[key].type) for key in keys if key != 'id'})
+                .execution_options(synchronize_session=False)
+            )
+    
+    async def _process_single_profile(self, job_id: str, profile: CandidateMasterProfile,
+                                      candidate_dict: Dict[str, Any], prompt: str) -> Optional[Dict[str, Any]]:
         """
         Process a single candidate profile - regenerate AI summary and embedding
         
         Args:
             job_id (str): The job ID for tracking
             profile (CandidateMasterProfile): The profile to process
+            candidate_dict (dict): The profile with its active relationships (see _load_profile_page)
+            prompt (str): The profile's summary prompt
             
         Returns:
-            bool: True if successful, False otherwise
+            dict: Column values to update for the profile (including its id), or None if processing failed.
+                Includes 'ai_summary_hash' when the summary changed and its embedding is still to be generated.
+                PROFILE_UNCHANGED when the stored summary was generated from the same prompt.
         """
-        # Each worker thread needs its own app context
-        with self.app.app_context():
-            try:
-                print(f"Processing profile {profile.id}: {profile.first_name} {profile.last_name}")
-                
-                # Verify database session is working
-                print(f"Database session info: {type(db.session)}")
-                print(f"Profile object type: {type(profile)}")
-                print(f"Profile ID: {profile.id}")
-                
-                # Check current values before update
-                print(f"Current ai_short_summary: {profile.ai_short_summary[:100] if profile.ai_short_summary else 'None'}...")
-                
-                # Handle pgvector field properly
-                if profile.embedding_vector is not None:
-                    try:
-                        current_embedding_length = len(profile.embedding_vector)
-                        print(f"Current embedding_vector length: {current_embedding_length}")
-                    except (TypeError, ValueError):
-                        try:
-                            current_embedding_length = profile.embedding_vector.size
-                            print(f"Current embedding_vector size: {current_embedding_length}")
-                        except:
-                            print(f"Current embedding_vector present but length unknown")
-                else:
-                    print(f"Current embedding_vector: None")
-                
-                # Get complete profile with relationships
-                candidate_dict = profile.to_dict(include_relationships=True)
-                print(f"Profile dict keys: {list(candidate_dict.keys())}")
-                
-                # Filter only active relationships
-                filtered_dict = self._filter_active_relationships(candidate_dict)
-                print(f"Filtered dict keys: {list(filtered_dict.keys())}")
-                
-                # Create async event loop for AI processing
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+        # Runs on the service loop, outside any app context: no database access here
+        try:
+            # The prompt holds everything the summary depends on, so if it hashes the same as when
+            # the stored summary was generated, that summary is current
+            source_hash = summary_prompt_hash(prompt)
+            if (not self.active_jobs[job_id]['force'] and source_hash == profile.ai_summary_source_hash
+                    and profile.ai_short_summary and profile.embedding_vector is not None):
+                return PROFILE_UNCHANGED
+            
+            # Generate the AI summary; its embedding is requested later in a batch with other profiles'.
+            # Failures raise rather than store a generic summary that later runs would then skip
+            await self.rate_limiter.acquire_async()
+            ai_summary = await ai_summary_service.generate_ai_summary(
+                candidate_dict, prompt=prompt, fallback_on_error=False
+            )
+            logger.debug("profile=%s summary_len=%s", profile.id, len(ai_summary or ''))
+            
+            # Check if we have valid data to update
+            if not ai_summary:
+                logger.warning("No AI summary generated for profile %s", profile.id)
+                return None
+            
+            # Collected by the caller and written with the rest of its batch
+            update_row = {
+                'id': profile.id,
+                'ai_short_summary': ai_summary,
+                'ai_summary_source_hash': source_hash,
+                'last_modified_date': datetime.utcnow()
+            }
+            
+            # An identical summary already has its embedding stored; otherwise the new hash marks the
+            # row as needing an embedding
+            new_summary_hash = summary_hash(ai_summary)
+            if new_summary_hash != profile.ai_summary_hash:
+                update_row['ai_summary_hash'] = new_summary_hash
+            
+            return update_row
                 
-                try:
-                    print(f"Starting AI processing for profile {profile.id}")
-                    
-                    # Generate AI summary and embedding
-                    result = loop.run_until_complete(
-                        ai_summary_service.process_candidate_profile(filtered_dict)
-                    )
-                    
-                    print(f"AI processing result for profile {profile.id}: success={result.get('processing_success')}")
-                    
-                    if result.get('processing_success', False):
-                        # Update the profile in database
-                        ai_summary = result.get('ai_summary')
-                        embedding_vector = result.get('embedding_vector')
-                        
-                        print(f"AI summary length: {len(ai_summary) if ai_summary else 0}")
-                        
-                        # Handle embedding vector length safely
-                        if embedding_vector:
-                            print(f"Embedding vector length: {len(embedding_vector)}")
-                        else:
-                            print(f"Embedding vector: None")
-                        
-                        # Check if we have valid data to update
-                        if not ai_summary and not embedding_vector:
-                            print(f"⚠️ No AI summary or embedding generated for profile {profile.id}")
-                            return False
-                        
-                        # Use a fresh database session for this update
-                        # Get a fresh reference to the profile
-                        fresh_profile = db.session.get(CandidateMasterProfile, profile.id)
-                        if not fresh_profile:
-                            print(f"❌ Could not get fresh profile {profile.id} from database")
-                            return False
-                        
-                        # Update the fresh profile object
-                        update_made = False
-                        
-                        if ai_summary:
-                            old_summary = fresh_profile.ai_short_summary
-                            fresh_profile.ai_short_summary = ai_summary
-                            print(f"Set ai_short_summary for profile {fresh_profile.id}")
-                            print(f"  Old: {old_summary[:100] if old_summary else 'None'}...")
-                            print(f"  New: {ai_summary[:100]}...")
-                            update_made = True
-                        
-                        if embedding_vector:
-                            old_embedding = fresh_profile.embedding_vector
-                            fresh_profile.embedding_vector = embedding_vector
-                            print(f"Set embedding_vector for profile {fresh_profile.id}")
-                            
-                            # Handle old embedding length safely
-                            if old_embedding is not None:
-                                try:
-                                    old_length = len(old_embedding)
-                                    print(f"  Old length: {old_length}")
-                                except (TypeError, ValueError):
-                                    try:
-                                        old_length = old_embedding.size
-                                        print(f"  Old size: {old_length}")
-                                    except:
-                                        print(f"  Old embedding present but length unknown")
-                            else:
-                                print(f"  Old embedding: None")
-                            
-                            print(f"  New length: {len(embedding_vector)}")
-                            update_made = True
-                        
-                        if update_made:
-                            # Update modification time
-                            fresh_profile.last_modified_date = datetime.utcnow()
-                            print(f"Updated last_modified_date for profile {fresh_profile.id}")
-                            
-                            # Check if SQLAlchemy detects changes
-                            print(f"SQLAlchemy dirty objects: {db.session.dirty}")
-                            print(f"SQLAlchemy new objects: {db.session.new}")
-                            
-                            # Commit changes
-                            try:
-                                db.session.commit()
-                                print(f"✅ Successfully committed changes for profile {fresh_profile.id}")
-                                
-                                # Verify the update by refreshing the object
-                                db.session.refresh(fresh_profile)
-                                print(f"✅ Verified update - ai_short_summary: {fresh_profile.ai_short_summary[:100] if fresh_profile.ai_short_summary else 'None'}...")
-                                
-                                # Handle pgvector field properly (it's a numpy array)
-                                if fresh_profile.embedding_vector is not None:
-                                    try:
-                                        embedding_length = len(fresh_profile.embedding_vector)
-                                        print(f"✅ Verified update - embedding_vector length: {embedding_length}")
-                                    except (TypeError, ValueError):
-                                        # If it's a numpy array, use .size or .shape
-                                        try:
-                                            embedding_length = fresh_profile.embedding_vector.size
-                                            print(f"✅ Verified update - embedding_vector size: {embedding_length}")
-                                        except:
-                                            print(f"✅ Verified update - embedding_vector present but length unknown")
-                                else:
-                                    print(f"✅ Verified update - embedding_vector: None")
-                                
-                                return True
-                            except Exception as commit_error:
-                                print(f"❌ Commit failed for profile {fresh_profile.id}: {str(commit_error)}")
-                                import traceback
-                                print(f"Commit error traceback: {traceback.format_exc()}")
-                                db.session.rollback()
-                                return False
-                        else:
-                            print(f"⚠️ No updates made for profile {fresh_profile.id}")
-                            return False
-                    else:
-                        error_msg = result.get('error', 'Unknown error')
-                        print(f"AI processing failed for profile {profile.id}: {error_msg}")
-                        return False
-                        
-                finally:
-                    loop.close()
-                    asyncio.set_event_loop(None)
-                    
-            except Exception as e:
-                import traceback
-                error_traceback = traceback.format_exc()
-                print(f"Error processing profile {profile.id}: {str(e)}")
-                print(f"Error traceback: {error_traceback}")
-                try:
-                    db.session.rollback()
-                    print(f"Rolled back database session for profile {profile.id}")
-                except:
-                    pass
-                return False
-    
-    def _filter_active_relationships(self, candidate_dict: Dict[str, Any]) -> Dict[str, Any]:
-        """Filter out inactive relationships from candidate data"""
-        filtered_dict = candidate_dict.copy()
-        
-        # Filter each relationship type to include only active records
-        relationship_fields = [
-            'career_history', 'skills', 'education', 
-            'licenses_certifications', 'languages', 'resumes'
-        ]
-        
-        for field in relationship_fields:
-            if field in filtered_dict and isinstance(filtered_dict[field], list):
-                filtered_dict[field] = [
-                    item for item in filtered_dict[field] 
-                    if item.get('is_active', True)
-                ]
-        
-        return filtered_dict
+        except Exception as e:
+            logger.exception("Error processing profile %s: %s", profile.id, e)
+            return None
     
     def cancel_job(self, job_id: str) -> bool:
         """
         Cancel a running job (if possible)
-        Note: Once threads are running, they can't be forcefully stopped,
-        but we can mark the job as cancelled
+        Note: Profiles already being processed finish, but no further profiles are started
         """
-        if job_id in self.active_jobs:
-            job_status = self.active_jobs[job_id]
-            if job_status['status'] in ['starting', 'fetching_profiles', 'processing']:
+        with self._jobs_lock:
+            job_status = self.active_jobs.get(job_id)
+            cancelled = job_status is not None and job_status['status'] in RUNNING_STATUSES
+            if cancelled:
                 job_status['status'] = 'cancelled'
                 job_status['completed_at'] = datetime.utcnow().isoformat()
-                return True
-        return False
+        
+        if job_status is None:
+            # Running in another worker: mark it in the shared cache, where that worker checks for it
+            job_status = cache.get(JOB_CACHE_PREFIX + job_id)
+            if not job_status or job_status['status'] not in RUNNING_STATUSES:
+                return False
+            job_status['status'] = 'cancelled'
+            job_status['completed_at'] = datetime.utcnow().isoformat()
+            cache.set(JOB_CACHE_PREFIX + job_id, job_status, timeout=JOB_CACHE_TIMEOUT)
+            self._publish_progress(job_status)
+            return True
+        
+        if cancelled:
+            self._publish_job_status(job_id)
+        return cancelled
     
     def cleanup_completed_jobs(self, max_age_hours: int = 24):
         """Clean up completed jobs older than specified hours"""
         cutoff_time = datetime.utcnow().timestamp() - (max_age_hours * 3600)
         
-        jobs_to_remove = []
-        for job_id, job_status in self.active_jobs.items():
-            if job_status['status'] in ['completed', 'failed', 'cancelled']:
-                if job_status.get('completed_at'):
-                    completed_time = datetime.fromisoformat(job_status['completed_at']).timestamp()
-                    if completed_time < cutoff_time:
-                        jobs_to_remove.append(job_id)
-        
-        for job_id in jobs_to_remove:
-            del self.active_jobs[job_id]
+        with self._jobs_lock:
+            jobs_to_remove = []
+            for job_id, job_status in self.active_jobs.items():
+                if job_status['status'] in ['completed', 'failed', 'cancelled']:
+                    if job_status.get('completed_at'):
+                        completed_time = datetime.fromisoformat(job_status['completed_at']).timestamp()
+                        if completed_time < cutoff_time:
+                            jobs_to_remove.append(job_id)
+            
+            for job_id in jobs_to_remove:
+                del self.active_jobs[job_id]
         
-        print(f"Cleaned up {len(jobs_to_remove)} old jobs")
+        logger.info(f"Cleaned up {len(jobs_to_remove)} old jobs")
 
 # Global instance
 bulk_ai_regeneration_service = BulkAIRegenerationService() 
\ No newline at end of file
@@ -278,6 +278,7 @@ Do not include any text outside the JSON response.
                 'sub_classification_of_interest': None,
                 'reasoning': 'Classification failed due to error',
                 'classification_success': False,
+                'api_error': True,
                 'error': str(e)
             }
     
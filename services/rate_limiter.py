@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for capping calls to rate-limited AI APIs.
+    Tokens refill continuously at `rate` per second up to `capacity`; acquire() blocks until one is available.
+    A rate of 0 (or less) disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (int): Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay_seconds: float, capacity: int = 1) -> 'TokenBucket':
+        """Build a bucket allowing one call every delay_seconds on average"""
+        return cls(1.0 / delay_seconds if delay_seconds > 0 else 0, capacity)
+
+    def _try_take(self) -> float:
+        """Take a token if one is available; returns 0, or the seconds until one will be"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Take one token, sleeping until the bucket has refilled enough"""
+        if self.rate <= 0:
+            return
+        while True:
+            wait_seconds = self._try_take()
+            if not wait_seconds:
+                return
+            time.sleep(wait_seconds)
+
+    async def acquire_async(self):
+        """Take one token from a coroutine, yielding to the event loop while waiting"""
+        if self.rate <= 0:
+            return
+        while True:
+            wait_seconds = self._try_take()
+            if not wait_seconds:
+                return
+            await asyncio.sleep(wait_seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Caps how many AI calls run at once and adapts the cap to how the API is coping (AIMD).
+    The limit grows by one while calls are saturating it and latency is steady, shrinks by one
+    when the short-term latency average rises above `latency_tolerance` times the long-term one,
+    and halves when a call fails.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, latency_tolerance: float = 2.0, smoothing: float = 0.2):
+        """
+        Args:
+            max_limit (int): Upper bound (and starting value) for concurrent calls
+            min_limit (int): Lower bound for concurrent calls
+            latency_tolerance (float): Short-term / long-term latency ratio above which the limit shrinks
+            smoothing (float): Weight of the newest sample in the short-term latency average
+                (the long-term average uses a tenth of it)
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self._inflight = 0
+        self._short_latency = None
+        self._long_latency = None
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass back to release()"""
+        with self._condition:
+            while self._inflight >= self.limit:
+                self._condition.wait()
+            self._inflight += 1
+        return time.monotonic()
+
+    async def acquire_async(self, poll_seconds: float = 0.05) -> float:
+        """acquire() for coroutines: polls for a free slot, yielding to the event loop in between"""
+        while True:
+            with self._condition:
+                if self._inflight < self.limit:
+                    self._inflight += 1
+                    return time.monotonic()
+            await asyncio.sleep(poll_seconds)
+
+    def release(self, started_at: float, success: bool = True):
+        """Free a slot and adjust the limit from the call's latency and outcome"""
+        latency = time.monotonic() - started_at
+        with self._condition:
+            saturated = self._inflight >= self.limit
+            self._inflight -= 1
+
+            if not success:
+                self.limit = max(self.min_limit, self.limit // 2)
+            else:
+                if self._short_latency is None:
+                    self._short_latency = self._long_latency = latency
+                else:
+                    self._short_latency += self.smoothing * (latency - self._short_latency)
+                    self._long_latency += self.smoothing / 10 * (latency - self._long_latency)
+                if self._short_latency > self._long_latency * self.latency_tolerance:
+                    self.limit = max(self.min_limit, self.limit - 1)
+                elif saturated:
+                    self.limit = min(self.max_limit, self.limit + 1)
+
+            self._condition.notify_all()
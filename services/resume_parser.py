@@ -2739,5 +2739,30 @@ def reset_resume_parser():
     global _resume_parser_instance
     _resume_parser_instance = None
 
+def parse_resume_file(content: Optional[bytes] = None, temp_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse a resume given its bytes or a path to it, using this process's parser.
+    Module-level so it can be the target of a ProcessPoolExecutor.
+    """
+    parser = get_resume_parser()
+    if temp_path:
+        with open(temp_path, 'rb') as pdf_file:
+            return parser.parse_resume(pdf_file)
+    return parser.parse_resume(BytesIO(content))
+
+def parse_resume_files(files: List[tuple]) -> List[Any]:
+    """
+    Parse several resumes in one call, e.g. one ProcessPoolExecutor task per group of files.
+    Each entry is (content, temp_path) as for parse_resume_file; a file that fails to parse
+    yields its exception in place of the result, so one bad file doesn't fail the group.
+    """
+    results = []
+    for content, temp_path in files:
+        try:
+            results.append(parse_resume_file(content, temp_path))
+        except Exception as parse_error:
+            results.append(parse_error)
+    return results
+
 # For backward compatibility
 resume_parser = get_resume_parser() 
\ No newline at end of file
@@ -0,0 +1,108 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+from sqlalchemy import select, update
+from database import db
+from models import CandidateResume
+from pdf_storage import b64decode_pdf, encode_pdf, PDF_MAGIC
+
+# Load environment variables
+load_dotenv()
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Values stored in candidate_resume.upload_status
+UPLOAD_STATUS_PENDING = 'pending'
+UPLOAD_STATUS_READY = 'ready'
+UPLOAD_STATUS_FAILED = 'failed'
+
+class ResumeUploadService:
+    """
+    Finishes asynchronous resume uploads off the request thread.
+    The API stores the client's base64 text in a pending candidate_resume row; a worker
+    decodes it, checks the PDF header, compresses it and marks the row ready (or failed).
+    Status lives in the database, so any gunicorn worker can answer polling requests.
+    """
+
+    def __init__(self):
+        """Initialize the resume upload service"""
+        self.max_workers = int(os.getenv('RESUME_UPLOAD_WORKERS', 2))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='resume-upload')
+
+        # Store Flask app reference for context management
+        self.app = None
+
+        logger.info(f"Resume Upload Service initialized with {self.max_workers} workers")
+
+    def set_app(self, app):
+        """Set the Flask app instance for database operations"""
+        self.app = app
+        logger.info("Flask app context set for resume upload service")
+
+    def submit(self, resume_id: int):
+        """Queue a pending resume for background processing"""
+        if not self.app:
+            raise Exception("Flask app not set. Call set_app() before submitting uploads.")
+        self.executor.submit(self._process_upload, resume_id)
+
+    def _process_upload(self, resume_id: int):
+        """Decode, validate and store the PDF for a pending resume"""
+        with self.app.app_context():
+            try:
+                pdf_data_base64 = db.session.execute(
+                    select(CandidateResume.pdf_data).where(
+                        CandidateResume.id == resume_id,
+                        CandidateResume.upload_status == UPLOAD_STATUS_PENDING
+                    )
+                ).scalar_one_or_none()
+                if pdf_data_base64 is None:
+                    logger.warning(f"Resume {resume_id} is no longer pending; skipping upload processing")
+                    return
+
+                pdf_data = b64decode_pdf(pdf_data_base64)
+                del pdf_data_base64
+                if not pdf_data.startswith(PDF_MAGIC):
+                    raise ValueError('Uploaded data is not a PDF file')
+
+                stored_pdf_data, pdf_data_encoding = encode_pdf(pdf_data)
+                db.session.execute(
+                    update(CandidateResume)
+                    .where(CandidateResume.id == resume_id)
+                    .values(
+                        pdf_data=stored_pdf_data,
+                        pdf_data_encoding=pdf_data_encoding,
+                        file_size=len(pdf_data),  # Use actual data size
+                        upload_status=UPLOAD_STATUS_READY,
+                        last_modified_date=datetime.utcnow()
+                    )
+                )
+                db.session.commit()
+                logger.info(f"Resume {resume_id} upload processed ({len(pdf_data)} bytes, {pdf_data_encoding})")
+
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Failed to process upload for resume {resume_id}: {str(e)}")
+                self._mark_failed(resume_id)
+
+    def _mark_failed(self, resume_id: int):
+        """Flag a pending resume as failed and hide it from active listings"""
+        try:
+            db.session.execute(
+                update(CandidateResume)
+                .where(CandidateResume.id == resume_id)
+                .values(
+                    upload_status=UPLOAD_STATUS_FAILED,
+                    is_active=False,
+                    last_modified_date=datetime.utcnow()
+                )
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to mark resume {resume_id} upload as failed: {str(e)}")
+
+# Global instance
+resume_upload_service = ResumeUploadService()
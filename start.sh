@@ -67,7 +67,7 @@ except OSError:
 echo "🌐 Starting Flask application on ${HOST}:${PORT}..."
 if [ "$FLASK_ENV" = "development" ]; then
     echo "🔧 Development mode - using Flask development server"
-    exec python app.py
+    exec python run.py
 else
     echo "🚀 Production mode - using Gunicorn with ${WORKERS} workers"
     exec gunicorn \